@@ -0,0 +1,3 @@
+"""AgenticAgile: agile project management on top of Trello and Slack."""
+
+__version__ = "0.1.0"
@@ -0,0 +1,22 @@
+"""Agent runtime: command fast path, tool execution and per-thread conversation memory."""
+
+from agenticagile.agent.memory import ConversationMemory, llm_summarizer, thread_key
+from agenticagile.agent.router import FastPath, Intent, IntentRouter, Reply, Rule
+from agenticagile.agent.tools import Tool, ToolCall, ToolExecutor, ToolResult, board_tools, tool
+
+__all__ = [
+    "ConversationMemory",
+    "FastPath",
+    "Intent",
+    "IntentRouter",
+    "Reply",
+    "Rule",
+    "Tool",
+    "ToolCall",
+    "ToolExecutor",
+    "ToolResult",
+    "board_tools",
+    "llm_summarizer",
+    "thread_key",
+    "tool",
+]
@@ -0,0 +1,253 @@
+"""Per-thread conversation memory with rolling summaries.
+
+Every Slack thread the agent takes part in is stored in SQLite: the turns
+since the last summary, plus one running summary of everything older. Once
+a thread's stored turns exceed ``threshold`` tokens, :meth:`ConversationMemory.compact`
+folds the oldest of them into the summary, keeping the newest ``keep_tokens``
+verbatim. A prompt therefore carries at most the summary and a bounded window
+however long the thread gets, and the rows of a thread stay bounded too:
+summarized turns are deleted. Turn contents are stored zlib-compressed.
+
+:meth:`~ConversationMemory.window` reads only the summary and the active
+turns. Compaction calls the model, so run it after the reply is posted.
+
+Usage::
+
+    memory = ConversationMemory("var/memory.sqlite", llm_summarizer(llm))
+    key = thread_key(team_id, channel, thread_ts)
+    memory.append(key, "user", text)
+    reply = await llm.complete([*system, *memory.window(key)])
+    memory.append(key, "assistant", reply)
+    await memory.compact(key)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+import zlib
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from agenticagile.llm.base import LLM, Message
+from agenticagile.llm.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL DEFAULT '',
+    summary_tokens INTEGER NOT NULL DEFAULT 0,
+    active_tokens INTEGER NOT NULL DEFAULT 0,
+    summarized_turns INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS threads_updated ON threads (updated);
+CREATE TABLE IF NOT EXISTS turns (
+    thread_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content BLOB NOT NULL,
+    tokens INTEGER NOT NULL,
+    PRIMARY KEY (thread_id, seq)
+) WITHOUT ROWID;
+"""
+
+#: ``(previous summary, turns to fold in, token limit) -> new summary``.
+Summarizer = Callable[[str, Sequence[Message], int], Awaitable[str]]
+
+SUMMARY_PROMPT = (
+    "You maintain the memory of a Slack thread between a team and its agile assistant. "
+    "Merge the earlier summary and the new messages into one summary of at most {limit} tokens. "
+    "Keep decisions, open questions, card names and ids, owners and dates; drop small talk."
+)
+
+
+def thread_key(team_id: str, channel: str, thread_ts: str) -> str:
+    return f"{team_id}:{channel}:{thread_ts}"
+
+
+def llm_summarizer(llm: LLM, **params: object) -> Summarizer:
+    """:data:`Summarizer` asking ``llm`` to merge the turns into the summary."""
+
+    async def summarize(previous: str, turns: Sequence[Message], limit: int) -> str:
+        transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+        messages = [
+            {"role": "system", "content": SUMMARY_PROMPT.format(limit=limit)},
+            {"role": "user", "content": f"Earlier summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"},
+        ]
+        return (await llm.complete(messages, **params)).strip()
+
+    return summarize
+
+
+@dataclass
+class ThreadInfo:
+    summary_tokens: int
+    active_tokens: int
+    active_turns: int
+    summarized_turns: int
+
+
+class ConversationMemory:
+    """SQLite store of thread turns with a bounded active window.
+
+    Args:
+        path: SQLite file, or ``":memory:"``.
+        summarizer: Folds old turns into the running summary.
+        threshold: Active tokens above which :meth:`compact` summarizes.
+        keep_tokens: Tokens of the newest turns kept verbatim by a compaction.
+        summary_tokens: Size limit asked of the summarizer.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = ":memory:",
+        summarizer: Summarizer | None = None,
+        *,
+        threshold: int = 3000,
+        keep_tokens: int = 1200,
+        summary_tokens: int = 400,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if keep_tokens >= threshold:
+            raise ValueError("keep_tokens must be smaller than threshold")
+        self.summarizer = summarizer
+        self.threshold = threshold
+        self.keep_tokens = keep_tokens
+        self.summary_tokens = summary_tokens
+        self._clock = clock
+        self.conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        if str(path) != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def append(self, thread: str, role: str, content: str) -> int:
+        """Store one turn; returns the thread's active token count."""
+        tokens = estimate_tokens(content)
+        now = self._clock()
+        with self._transaction() as conn:
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM turns WHERE thread_id = ?", (thread,)).fetchone()[0]
+            conn.execute(
+                "INSERT INTO turns (thread_id, seq, role, content, tokens) VALUES (?, ?, ?, ?, ?)",
+                (thread, seq, role, zlib.compress(content.encode()), tokens),
+            )
+            conn.execute(
+                "INSERT INTO threads (id, active_tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET active_tokens = active_tokens + excluded.active_tokens, "
+                "updated = excluded.updated",
+                (thread, tokens, now),
+            )
+            active = conn.execute("SELECT active_tokens FROM threads WHERE id = ?", (thread,)).fetchone()[0]
+        return active
+
+    def window(self, thread: str, *, budget: int | None = None) -> list[Message]:
+        """Messages to send for ``thread``: the summary, then the active turns.
+
+        With ``budget``, the oldest active turns are left out until the rest
+        fits; the newest turn is always kept.
+        """
+        row = self.conn.execute("SELECT summary FROM threads WHERE id = ?", (thread,)).fetchone()
+        turns = self.conn.execute(
+            "SELECT role, content, tokens FROM turns WHERE thread_id = ? ORDER BY seq DESC", (thread,)
+        ).fetchall()
+        messages: list[Message] = []
+        used = 0
+        for role, content, tokens in turns:
+            if budget is not None and messages and used + tokens > budget:
+                break
+            used += tokens
+            messages.append({"role": role, "content": zlib.decompress(content).decode()})
+        messages.reverse()
+        if row is not None and row[0]:
+            messages.insert(0, {"role": "system", "content": f"Summary of the earlier conversation:\n{row[0]}"})
+        return messages
+
+    def info(self, thread: str) -> ThreadInfo | None:
+        row = self.conn.execute(
+            "SELECT summary_tokens, active_tokens, summarized_turns, "
+            "(SELECT COUNT(*) FROM turns WHERE thread_id = threads.id) FROM threads WHERE id = ?",
+            (thread,),
+        ).fetchone()
+        if row is None:
+            return None
+        return ThreadInfo(summary_tokens=row[0], active_tokens=row[1], summarized_turns=row[2], active_turns=row[3])
+
+    def needs_compaction(self, thread: str) -> bool:
+        row = self.conn.execute("SELECT active_tokens FROM threads WHERE id = ?", (thread,)).fetchone()
+        return row is not None and row[0] > self.threshold
+
+    async def compact(self, thread: str, *, force: bool = False) -> bool:
+        """Fold the oldest turns of ``thread`` into its summary if it is over threshold.
+
+        Turns appended while the summarizer runs are kept. Returns whether a
+        compaction happened.
+        """
+        if self.summarizer is None or not (force or self.needs_compaction(thread)):
+            return False
+        lock = self._locks.setdefault(thread, asyncio.Lock())
+        async with lock:
+            if not (force or self.needs_compaction(thread)):
+                return False
+            summary = self.conn.execute("SELECT summary FROM threads WHERE id = ?", (thread,)).fetchone()[0]
+            turns = self.conn.execute(
+                "SELECT seq, role, content, tokens FROM turns WHERE thread_id = ? ORDER BY seq DESC", (thread,)
+            ).fetchall()
+            kept = 0
+            split = len(turns)
+            for index, (_, _, _, tokens) in enumerate(turns):
+                if kept + tokens > self.keep_tokens and index > 0:
+                    split = index
+                    break
+                kept += tokens
+            rolled = turns[split:][::-1]
+            if not rolled:
+                return False
+            new_summary = await self.summarizer(
+                summary,
+                [{"role": role, "content": zlib.decompress(content).decode()} for _, role, content, _ in rolled],
+                self.summary_tokens,
+            )
+            last_seq = rolled[-1][0]
+            rolled_tokens = sum(turn[3] for turn in rolled)
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM turns WHERE thread_id = ? AND seq <= ?", (thread, last_seq))
+                conn.execute(
+                    "UPDATE threads SET summary = ?, summary_tokens = ?, active_tokens = active_tokens - ?, "
+                    "summarized_turns = summarized_turns + ? WHERE id = ?",
+                    (new_summary, estimate_tokens(new_summary), rolled_tokens, len(rolled), thread),
+                )
+            logger.debug("compacted %d turns (%d tokens) of thread %s", len(rolled), rolled_tokens, thread)
+            return True
+
+    def forget(self, thread: str) -> None:
+        self.conn.execute("DELETE FROM turns WHERE thread_id = ?", (thread,))
+        self.conn.execute("DELETE FROM threads WHERE id = ?", (thread,))
+        self._locks.pop(thread, None)
+
+    def forget_idle(self, older_than: float) -> int:
+        """Drop threads without a new turn for ``older_than`` seconds."""
+        cutoff = self._clock() - older_than
+        idle = [row[0] for row in self.conn.execute("SELECT id FROM threads WHERE updated < ?", (cutoff,))]
+        for thread in idle:
+            self.forget(thread)
+        return len(idle)
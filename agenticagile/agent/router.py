@@ -0,0 +1,369 @@
+"""Fast path for deterministic commands, in front of the model.
+
+Most Slack traffic is a handful of fixed commands: "sprint status", "show my
+cards", "what is blocked?", "move card login bug to Done". These need no
+model at all. :class:`IntentRouter` classifies a message with anchored regex
+rules, falling back to an optional small local classifier, and
+:class:`FastPath` answers recognised intents straight from the board mirror.
+Moves go through the :class:`~agenticagile.trello.writes.WriteQueue` and
+"what blocks X" is answered from the
+:class:`~agenticagile.dependencies.DependencyGraph`.
+Everything else, including commands whose card or list cannot be resolved
+unambiguously, returns ``None`` and goes to the agent as before.
+
+Usage::
+
+    fast = FastPath(mirror, writes=queue)
+    reply = await fast.answer(text, board_id=board_id, member_id=member_id, key=event_id)
+    if reply is None:
+        reply_text = await agent.answer(text)
+    else:
+        await slack.post_message(channel, reply.text, blocks=reply.blocks, thread_ts=ts)
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+import re
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+
+from agenticagile.board.mirror import BoardMirror, Card
+from agenticagile.dependencies import DependencyGraph
+from agenticagile.slack.blocks import SECTION, Block, BlockRenderer, card_names, escape, sections
+from agenticagile.telemetry import span
+from agenticagile.trello.writes import WriteQueue
+
+logger = logging.getLogger(__name__)
+
+_MENTION = re.compile(r"^\s*<@[A-Z0-9]+>[\s:,]*")
+_CARD_URL = re.compile(r"trello\.com/c/([A-Za-z0-9]+)")
+
+
+@dataclass
+class Intent:
+    """A recognised command; ``source`` is ``"rule"`` or ``"model"``."""
+
+    name: str
+    args: dict[str, str] = field(default_factory=dict)
+    confidence: float = 1.0
+    source: str = "rule"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Intent ``name`` when one of ``patterns`` matches the whole message.
+
+    Named groups of the matching pattern become the intent's arguments. A
+    single compiled pattern is accepted in place of the tuple.
+    """
+
+    name: str
+    patterns: tuple[re.Pattern[str], ...]
+
+    def __post_init__(self) -> None:
+        if isinstance(self.patterns, re.Pattern):
+            object.__setattr__(self, "patterns", (self.patterns,))
+
+    @property
+    def pattern(self) -> re.Pattern[str]:
+        """The first of ``patterns``; the only one for single-pattern rules."""
+        return self.patterns[0]
+
+    @classmethod
+    def of(cls, name: str, *patterns: str) -> Rule:
+        return cls(name, tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns))
+
+    def match(self, text: str) -> dict[str, str] | None:
+        """Arguments when the rule matches ``text``, else ``None``."""
+        for pattern in self.patterns:
+            found = pattern.fullmatch(text)
+            if found is not None:
+                return {k: v.strip("\"'“”` ") for k, v in found.groupdict().items() if v is not None}
+        return None
+
+
+#: Built-in rules, tried in order. Patterns are anchored: a message that only
+#: contains a command among other words is left to the model.
+DEFAULT_RULES = (
+    Rule.of(
+        "sprint_status",
+        r"/?sprint(?: status)?",
+        r"(?:show |what'?s |what is )?(?:the )?(?:sprint|board) status",
+        r"how(?:'s| is) the sprint(?: going)?",
+    ),
+    Rule.of(
+        "my_cards",
+        r"(?:show |list )?(?:me )?my (?:cards|tasks|tickets)",
+        r"what am i (?:working on|assigned(?: to)?)",
+    ),
+    Rule.of(
+        "blocked",
+        r"/?blocked",
+        r"(?:what'?s|what is|what are|show|list)(?: the)? (?:blocked|stuck)(?: cards)?",
+    ),
+    Rule.of("board", r"/?board", r"show(?: me)? the board"),
+    Rule.of(
+        "blocking",
+        r"what(?:'s| is)? block(?:s|ing) (?P<card>.+)",
+        r"why is (?P<card>.+) (?:blocked|stuck)",
+    ),
+    Rule.of("move_card", r"move (?:card )?(?P<card>.+) (?:to|into) (?P<list>[^?]+?)"),
+    Rule.of("show_card", r"(?:show|open) card (?P<card>.+)"),
+)
+
+Classifier = Callable[[str], Intent | None | Awaitable[Intent | None]]
+
+
+def normalize(text: str) -> str:
+    """Message text without a leading bot mention, extra spaces and end punctuation."""
+    text = _MENTION.sub("", text)
+    return " ".join(text.split()).rstrip(".!? ")
+
+
+@dataclass
+class RouterStats:
+    rule: int = 0
+    model: int = 0
+    fallthrough: int = 0
+
+
+class IntentRouter:
+    """Classify messages into :class:`Intent`s, cheapest method first.
+
+    Args:
+        rules: Regex rules, tried in order.
+        classifier: Optional local model hook, sync or async, called only when
+            no rule matches. Its intents count when ``confidence`` reaches
+            ``threshold``.
+        threshold: Minimum classifier confidence.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Rule] = DEFAULT_RULES,
+        *,
+        classifier: Classifier | None = None,
+        threshold: float = 0.8,
+    ) -> None:
+        self.rules = list(rules)
+        self.classifier = classifier
+        self.threshold = threshold
+        self.stats = RouterStats()
+
+    def match(self, text: str) -> Intent | None:
+        """Intent of the first rule matching the normalized text."""
+        text = normalize(text)
+        for rule in self.rules:
+            args = rule.match(text)
+            if args is not None:
+                return Intent(rule.name, args)
+        return None
+
+    async def classify(self, text: str) -> Intent | None:
+        """Intent of ``text``, or ``None`` when it should go to the agent."""
+        intent = self.match(text)
+        if intent is not None:
+            self.stats.rule += 1
+            return intent
+        if self.classifier is not None:
+            guess = self.classifier(normalize(text))
+            if inspect.isawaitable(guess):
+                guess = await guess
+            if guess is not None and guess.confidence >= self.threshold:
+                guess.source = "model"
+                self.stats.model += 1
+                return guess
+        self.stats.fallthrough += 1
+        return None
+
+
+@dataclass
+class Reply:
+    """A fast-path answer: plain text plus its Block Kit version."""
+
+    text: str
+    blocks: list[Block] = field(default_factory=list)
+    intent: str = ""
+
+
+Handler = Callable[[Intent, str, str | None, str | None], Reply | None]
+
+
+class FastPath:
+    """Answer recognised commands from the mirror, without the model.
+
+    Args:
+        mirror: Board data.
+        router: Classifier; the default uses :data:`DEFAULT_RULES` only.
+        writes: Queue for moves; without it ``move_card`` goes to the agent.
+        renderer: Block renderer; share one to reuse its card cache.
+        graph: Dependency graph; without it ``blocking`` goes to the agent.
+        limit: Cards listed per answer.
+
+    ``handlers`` maps intent names to ``handler(intent, board_id, member_id,
+    key)``; add entries to support more commands.
+    """
+
+    def __init__(
+        self,
+        mirror: BoardMirror,
+        *,
+        router: IntentRouter | None = None,
+        writes: WriteQueue | None = None,
+        renderer: BlockRenderer | None = None,
+        graph: DependencyGraph | None = None,
+        limit: int = 20,
+    ) -> None:
+        self.mirror = mirror
+        self.router = router or IntentRouter()
+        self.writes = writes
+        self.renderer = renderer or BlockRenderer()
+        self.graph = graph
+        self.limit = limit
+        self.handlers: dict[str, Handler] = {
+            "sprint_status": self._sprint_status,
+            "my_cards": self._my_cards,
+            "blocked": self._blocked,
+            "board": self._board,
+            "move_card": self._move_card,
+            "show_card": self._show_card,
+            "blocking": self._blocking,
+        }
+
+    async def answer(
+        self,
+        text: str,
+        *,
+        board_id: str,
+        member_id: str | None = None,
+        key: str | None = None,
+    ) -> Reply | None:
+        """Answer ``text`` for the board of the channel, or ``None`` for the agent.
+
+        Args:
+            member_id: Trello member of the sender, for "my cards".
+            key: Idempotency key for writes, e.g. the Slack event id.
+        """
+        intent = await self.router.classify(text)
+        if intent is None:
+            return None
+        handler = self.handlers.get(intent.name)
+        if handler is None:
+            return None
+        with span("fastpath", intent=intent.name, source=intent.source) as current:
+            reply = handler(intent, board_id, member_id, key)
+            if current is not None:
+                current.set(answered=reply is not None)
+        if reply is not None:
+            reply.intent = intent.name
+        return reply
+
+    # -- handlers ---------------------------------------------------------
+
+    def _cards_reply(self, title: str, cards: Sequence[Card], board_id: str) -> Reply:
+        lines = [f"*{title}*"] + [f"• {card.name}" for card in cards[: self.limit]]
+        if len(cards) > self.limit:
+            lines.append(f"• …and {len(cards) - self.limit} more")
+        names = card_names(self.mirror, board_id)
+        blocks = self.renderer.card_list(cards, title=title, names=names, limit=self.limit)
+        return Reply("\n".join(lines), blocks)
+
+    def _sprint_status(self, intent: Intent, board_id: str, member_id: str | None, key: str | None) -> Reply:
+        board = self.mirror.board(board_id) or {"name": board_id}
+        counts = self.mirror.list_counts(board_id)
+        blocked = len(self.mirror.blocked_cards(board_id))
+        summary = ", ".join(f"{name}: {count}" for name, count in counts.items())
+        text = f"*{board['name']}* — {sum(counts.values())} open cards, {blocked} blocked\n{summary}"
+        escaped = ", ".join(f"{escape(name)}: {count}" for name, count in counts.items())
+        return Reply(
+            text,
+            [
+                SECTION.render(text=f"*{escape(board['name'])}* — {sum(counts.values())} open cards, {blocked} blocked"),
+                SECTION.render(text=escaped or "_No open lists._"),
+            ],
+        )
+
+    def _my_cards(self, intent: Intent, board_id: str, member_id: str | None, key: str | None) -> Reply | None:
+        if member_id is None:
+            return None
+        cards = self.mirror.cards(board_id=board_id, member_id=member_id)
+        if not cards:
+            return Reply("You have no open cards on this board.")
+        return self._cards_reply(f"Your cards ({len(cards)})", cards, board_id)
+
+    def _blocked(self, intent: Intent, board_id: str, member_id: str | None, key: str | None) -> Reply:
+        cards = self.mirror.blocked_cards(board_id)
+        if not cards:
+            return Reply("Nothing is blocked.")
+        return self._cards_reply(f"Blocked ({len(cards)})", cards, board_id)
+
+    def _board(self, intent: Intent, board_id: str, member_id: str | None, key: str | None) -> Reply:
+        board = self.mirror.board(board_id) or {"name": board_id}
+        counts = self.mirror.list_counts(board_id)
+        text = f"*{board['name']}*\n" + "\n".join(f"{name}: {count}" for name, count in counts.items())
+        return Reply(text, self.renderer.board(self.mirror, board_id))
+
+    def _show_card(self, intent: Intent, board_id: str, member_id: str | None, key: str | None) -> Reply | None:
+        cards = self.find_cards(board_id, intent.args.get("card", ""))
+        if len(cards) != 1:
+            return self._ambiguous(cards)
+        card = cards[0]
+        names = card_names(self.mirror, board_id)
+        lists = {lst["id"]: lst["name"] for lst in self.mirror.lists(board_id, include_closed=True)}
+        where = lists.get(card.list_id or "", "?")
+        blocks = [SECTION.render(text=self.renderer.card_line(card, names) + f"\nIn *{escape(where)}*")]
+        if card.desc:
+            blocks.append(SECTION.render(text=escape(card.desc[:2900])))
+        return Reply(f"{card.name} — in {where}", blocks)
+
+    def _move_card(self, intent: Intent, board_id: str, member_id: str | None, key: str | None) -> Reply | None:
+        if self.writes is None:
+            return None
+        cards = self.find_cards(board_id, intent.args.get("card", ""))
+        if len(cards) != 1:
+            return self._ambiguous(cards)
+        card = cards[0]
+        target = self.mirror.find_list(card.board_id, intent.args.get("list", ""))
+        if target is None:
+            return None
+        if card.list_id == target["id"]:
+            return Reply(f"{card.name} is already in {target['name']}.")
+        self.writes.move_card(card.id, target["id"], key=f"{key}:move" if key else None)
+        return Reply(f"Moving {card.name} to {target['name']}.")
+
+    def _blocking(self, intent: Intent, board_id: str, member_id: str | None, key: str | None) -> Reply | None:
+        ref = intent.args.get("card", "")
+        if self.graph is None or not self.graph.find(ref):
+            return None
+        text = self.graph.explain(ref)
+        return Reply(text, sections([escape(line) for line in text.splitlines()]))
+
+    def _ambiguous(self, cards: Sequence[Card]) -> Reply | None:
+        """No match goes to the agent; several matches are listed back."""
+        if not cards:
+            return None
+        shown = cards[:5]
+        lines = [f"• {card.name}" for card in shown]
+        if len(cards) > len(shown):
+            lines.append(f"• …and {len(cards) - len(shown)} more")
+        text = "Which card do you mean?\n" + "\n".join(lines)
+        return Reply(text, [SECTION.render(text=escape(text))])
+
+    def find_cards(self, board_id: str, ref: str) -> list[Card]:
+        """Cards ``ref`` may mean: an id, short link or card URL, an exact name, or a name fragment."""
+        ref = ref.strip()
+        if not ref:
+            return []
+        url = _CARD_URL.search(ref)
+        card = self.mirror.card_by_link(url.group(1) if url else ref)
+        if card is not None and card.board_id == board_id:
+            return [card]
+        wanted = ref.casefold()
+        cards = self.mirror.cards(board_id=board_id)
+        exact = [c for c in cards if c.name.casefold() == wanted]
+        if exact:
+            return exact
+        return [c for c in cards if wanted in c.name.casefold()]
+
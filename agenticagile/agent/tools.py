@@ -0,0 +1,336 @@
+"""Execution of the tool calls the agent plans.
+
+The model often asks for several things at once ("fetch card X, list the
+board members, search for 'login bug'"). :class:`ToolExecutor` runs the
+independent calls of such a batch concurrently instead of one after another:
+read-only tools run side by side, while a tool marked ``writes=True`` waits
+for the reads planned before it and holds back the ones planned after it.
+
+Results of read tools are memoized. With ``memo="board"`` (the default) the
+key includes :meth:`~agenticagile.board.mirror.BoardMirror.state_hash` of the
+boards the call reads, so a result is reused within a turn and across turns
+until those boards change. ``memo="turn"`` keeps a result for one turn only,
+for tools whose data is not in the mirror; ``memo=None`` never reuses one.
+Identical calls in flight at the same time share one execution, and every
+write drops the memoized results, since the mirror only catches up with it at
+the next sync.
+
+Usage::
+
+    executor = ToolExecutor(board_tools(mirror, indexer), mirror=mirror)
+    results = await executor.run(
+        [ToolCall("1", "get_card", {"card_id": card_id}), ToolCall("2", "members", {"board_id": board_id})],
+        turn=thread_ts,
+    )
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal
+
+from agenticagile.board.mirror import BoardMirror
+from agenticagile.errors import AgenticAgileError
+from agenticagile.llm.cache import single_flight
+from agenticagile.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+MemoScope = Literal["board", "turn"]
+
+
+@dataclass
+class Tool:
+    """A function the agent may call.
+
+    Args:
+        name: Name the model uses to call it.
+        func: Sync or async callable receiving the call arguments as keywords.
+        writes: The tool changes Trello or Slack; it is never memoized and
+            runs alone, in plan order.
+        memo: How long results are reused, see the module docstring.
+        boards: Board ids a call reads, from its arguments; ``None`` means
+            "guess from ``board_id``, ``board_ids`` or ``card_id``".
+    """
+
+    name: str
+    func: Callable[..., Any]
+    writes: bool = False
+    memo: MemoScope | None = "board"
+    boards: Callable[[Mapping[str, Any]], Iterable[str] | None] | None = None
+    description: str = ""
+
+
+def tool(
+    name: str | None = None,
+    *,
+    writes: bool = False,
+    memo: MemoScope | None = "board",
+    boards: Callable[[Mapping[str, Any]], Iterable[str] | None] | None = None,
+) -> Callable[[Callable[..., Any]], Tool]:
+    """Decorator turning a function into a :class:`Tool`."""
+
+    def wrap(func: Callable[..., Any]) -> Tool:
+        return Tool(
+            name or func.__name__,
+            func,
+            writes=writes,
+            memo=None if writes else memo,
+            boards=boards,
+            description=inspect.getdoc(func) or "",
+        )
+
+    return wrap
+
+
+@dataclass
+class ToolCall:
+    id: str
+    name: str
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ToolResult:
+    """Outcome of one call; ``error`` is set instead of raising."""
+
+    call_id: str
+    name: str
+    value: Any = None
+    error: str | None = None
+    cached: bool = False
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class ExecutorStats:
+    calls: int = 0
+    hits: int = 0
+    shared: int = 0
+    errors: int = 0
+
+
+class ToolExecutor:
+    """Runs batches of :class:`ToolCall` with concurrency and memoization.
+
+    Args:
+        tools: The tools the agent may call.
+        mirror: Mirror whose state keys ``memo="board"`` results. Without it
+            such results are only kept for the turn.
+        concurrency: Calls running at the same time within one batch.
+        max_entries: Memoized results kept, least recently used evicted first.
+        ttl: Seconds a memoized result stays valid even if its boards do not
+            change, for tools that also read data outside the mirror.
+        timeout: Seconds one call may take before it fails.
+    """
+
+    def __init__(
+        self,
+        tools: Iterable[Tool],
+        *,
+        mirror: BoardMirror | None = None,
+        concurrency: int = 8,
+        max_entries: int = 2048,
+        ttl: float = 3600.0,
+        timeout: float | None = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tools = {t.name: t for t in tools}
+        self.mirror = mirror
+        self.concurrency = concurrency
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.timeout = timeout
+        self.stats = ExecutorStats()
+        self._clock = clock
+        self._memo: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self._writes = 0
+
+    def clear(self) -> None:
+        """Forget every memoized result."""
+        self._memo.clear()
+
+    async def run(self, calls: Sequence[ToolCall], *, turn: str = "") -> list[ToolResult]:
+        """Execute ``calls`` and return their results in the same order.
+
+        ``turn`` identifies the conversation turn, for ``memo="turn"`` tools.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results: list[ToolResult] = []
+        pending: list[Awaitable[ToolResult]] = []
+        for call in calls:
+            t = self.tools.get(call.name)
+            if t is not None and t.writes:
+                results += await asyncio.gather(*pending)
+                pending = []
+                results.append(await self._execute(call, turn, semaphore))
+            else:
+                pending.append(self._execute(call, turn, semaphore))
+        results += await asyncio.gather(*pending)
+        return results
+
+    async def call(self, name: str, *, turn: str = "", **args: Any) -> Any:
+        """Run a single tool and return its value.
+
+        Raises:
+            AgenticAgileError: The tool is unknown or failed.
+        """
+        result = (await self.run([ToolCall(name, name, args)], turn=turn))[0]
+        if result.error is not None:
+            raise AgenticAgileError(f"tool {name} failed: {result.error}")
+        return result.value
+
+    # -- internals --------------------------------------------------------
+
+    async def _execute(self, call: ToolCall, turn: str, semaphore: asyncio.Semaphore) -> ToolResult:
+        started = self._clock()
+        result = ToolResult(call.id, call.name)
+        t = self.tools.get(call.name)
+        if t is None:
+            result.error = f"unknown tool {call.name!r}"
+            self.stats.errors += 1
+            return result
+        key = self._key(t, call.args, turn)
+        try:
+            with span("tool", tool=call.name) as current:
+                if key is None:
+                    result.value = await self._invoke(t, call.args, semaphore)
+                else:
+                    result.value, result.cached = await self._memoized(
+                        key, lambda: self._invoke(t, call.args, semaphore)
+                    )
+                if current is not None:
+                    current.set(cached=result.cached)
+        except Exception as exc:  # noqa: BLE001 - the model gets the error as the tool result
+            logger.warning("tool %s (%s) failed: %s", call.name, call.id, exc)
+            result.error = f"{type(exc).__name__}: {exc}"
+            self.stats.errors += 1
+        finally:
+            if t.writes:
+                self._writes += 1
+                self.clear()
+        result.seconds = self._clock() - started
+        return result
+
+    async def _invoke(self, t: Tool, args: Mapping[str, Any], semaphore: asyncio.Semaphore) -> Any:
+        async with semaphore:
+            self.stats.calls += 1
+            value = t.func(**args)
+            if inspect.isawaitable(value):
+                value = await asyncio.wait_for(value, self.timeout)
+            return value
+
+    async def _memoized(self, key: str, compute: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        entry = self._memo.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > self._clock():
+                self._memo.move_to_end(key)
+                self.stats.hits += 1
+                return value, True
+            del self._memo[key]
+        writes = self._writes
+        value, shared = await single_flight(self._inflight, key, compute)
+        if shared:
+            self.stats.shared += 1
+        elif writes == self._writes:
+            # Otherwise a write finishing meanwhile may have made the value stale.
+            self._memo[key] = (self._clock() + self.ttl, value)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return value, shared
+
+    def _key(self, t: Tool, args: Mapping[str, Any], turn: str) -> str | None:
+        if t.writes or t.memo is None:
+            return None
+        if t.memo == "board" and self.mirror is not None:
+            boards = t.boards(args) if t.boards is not None else self._boards_of(args)
+            scope = "board:" + self.mirror.state_hash(boards)
+        else:
+            scope = "turn:" + turn
+        material = {"tool": t.name, "args": args, "scope": scope, "writes": self._writes}
+        encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _boards_of(self, args: Mapping[str, Any]) -> list[str] | None:
+        """Boards a call reads, guessed from its arguments; ``None`` means all."""
+        if args.get("board_ids") is not None:
+            return list(args["board_ids"])
+        if args.get("board_id") is not None:
+            return [args["board_id"]]
+        if args.get("card_id") is not None and self.mirror is not None:
+            card = self.mirror.card(args["card_id"])
+            if card is not None:
+                return [card.board_id]
+        return None
+
+
+def board_tools(mirror: BoardMirror, indexer: Any | None = None, graph: Any | None = None) -> list[Tool]:
+    """Read-only tools over the mirror (and the search index and dependency graph, when given)."""
+
+    @tool()
+    def get_card(card_id: str) -> dict[str, Any] | None:
+        """A card with its checklists and latest comments."""
+        card = mirror.card(card_id)
+        if card is None:
+            return None
+        return {**asdict(card), "checklists": mirror.checklists(card_id), "comments": mirror.comments(card_id, limit=5)}
+
+    @tool()
+    def members(board_id: str) -> list[dict[str, Any]]:
+        """Members of a board."""
+        return mirror.members(board_id)
+
+    @tool()
+    def list_counts(board_id: str) -> dict[str, int]:
+        """Open cards per list of a board."""
+        return mirror.list_counts(board_id)
+
+    @tool()
+    def blocked_cards(board_id: str) -> list[dict[str, Any]]:
+        """Blocked cards of a board."""
+        return [asdict(card) for card in mirror.blocked_cards(board_id)]
+
+    @tool()
+    def member_cards(member_id: str, board_id: str | None = None) -> list[dict[str, Any]]:
+        """Open cards assigned to a member."""
+        return [asdict(card) for card in mirror.cards(board_id=board_id, member_id=member_id)]
+
+    tools = [get_card, members, list_counts, blocked_cards, member_cards]
+    if indexer is not None:
+
+        @tool()
+        def search(text: str, k: int = 10, board_ids: list[str] | None = None) -> list[dict[str, Any]]:
+            """Cards related to free text."""
+            return [{"card_id": hit.id, "score": hit.score} for hit in indexer.search(text, k=k, board_ids=board_ids)]
+
+        tools.append(search)
+    if graph is not None:
+
+        @tool()
+        def blockers(card: str) -> list[dict[str, Any]]:
+            """What transitively blocks a card (name, link or id), with its critical path."""
+            return [
+                {
+                    "card_id": card_id,
+                    "chain": [asdict(step) for step in graph.chain(card_id)],
+                    "critical_path": graph.critical_path(card_id),
+                }
+                for card_id in graph.find(card)[:5]
+            ]
+
+        tools.append(blockers)
+    return tools
@@ -0,0 +1,19 @@
+"""Local board model: SQLite mirror, action application and incremental sync."""
+
+from agenticagile.board.actions import apply_action, apply_actions
+from agenticagile.board.eventlog import EventLog
+from agenticagile.board.mirror import BoardMirror, Card, MirrorChange
+from agenticagile.board.replay import BoardReplay
+from agenticagile.board.sync import MirrorSync, SyncReport
+
+__all__ = [
+    "BoardMirror",
+    "BoardReplay",
+    "Card",
+    "EventLog",
+    "MirrorChange",
+    "MirrorSync",
+    "SyncReport",
+    "apply_action",
+    "apply_actions",
+]
@@ -0,0 +1,244 @@
+"""Apply Trello actions to a :class:`~agenticagile.board.mirror.BoardMirror`.
+
+Trello actions describe a change but do not always carry the full object
+(``createCard`` only has the card id and name, for example). :func:`apply_action`
+applies whatever the action does carry and reports the card ids whose mirror
+row is incomplete, so the caller can refetch just those cards.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from agenticagile.board.mirror import BoardMirror, MirrorChange
+
+logger = logging.getLogger(__name__)
+
+#: Card fields that ``updateCard`` may carry, mapped to mirror columns.
+_CARD_FIELDS = {
+    "name": "name",
+    "desc": "desc",
+    "closed": "closed",
+    "due": "due",
+    "dueComplete": "due_complete",
+    "pos": "pos",
+    "idList": "list_id",
+}
+
+#: Action types that create a card whose details must be fetched separately.
+CARD_CREATING_ACTIONS = frozenset(
+    {"createCard", "copyCard", "moveCardToBoard", "convertToCardFromCheckItem", "emailCard"}
+)
+
+
+def _column_value(key: str, value: Any) -> Any:
+    if key in ("closed", "dueComplete"):
+        return int(bool(value))
+    if key == "pos":
+        return float(value or 0)
+    return value
+
+
+def apply_action(mirror: BoardMirror, action: Mapping[str, Any]) -> set[str]:
+    """Apply one action to the mirror.
+
+    Returns:
+        Ids of cards that the action touched but could not fully describe.
+    """
+    kind = action.get("type", "")
+    data = action.get("data") or {}
+    board_id = (data.get("board") or {}).get("id")
+    card = data.get("card") or {}
+    card_id = card.get("id")
+    date = action.get("date")
+    conn = mirror.conn
+    stale: set[str] = set()
+
+    if kind in CARD_CREATING_ACTIONS and card_id:
+        lst = data.get("list") or data.get("listAfter") or {}
+        conn.execute(
+            "INSERT OR IGNORE INTO cards (id, board_id, list_id, name, last_activity, list_entered_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (card_id, board_id, lst.get("id") or card.get("idList"), card.get("name", ""), date, date),
+        )
+        conn.execute(
+            "UPDATE cards SET board_id = ?, closed = 0, last_activity = ?, short_link = coalesce(?, short_link) "
+            "WHERE id = ?",
+            (board_id, date, card.get("shortLink"), card_id),
+        )
+        stale.add(card_id)
+    elif kind == "updateCard" and card_id:
+        changes = {key: card[key] for key in _CARD_FIELDS if key in card}
+        if "listAfter" in data:
+            changes["idList"] = data["listAfter"]["id"]
+        if changes:
+            assignments = ", ".join(f"{_CARD_FIELDS[key]} = ?" for key in changes)
+            values = [_column_value(key, value) for key, value in changes.items()]
+            cursor = conn.execute(
+                f"UPDATE cards SET {assignments}, last_activity = ? WHERE id = ?",
+                (*values, date, card_id),
+            )
+            if cursor.rowcount == 0:
+                stale.add(card_id)
+            elif "idList" in changes:
+                conn.execute("UPDATE cards SET list_entered_at = ? WHERE id = ?", (date, card_id))
+    elif kind in ("deleteCard", "moveCardFromBoard") and card_id:
+        mirror.delete_card(card_id)
+    elif kind == "commentCard" and card_id:
+        conn.execute(
+            "INSERT OR REPLACE INTO comments (id, card_id, board_id, member_id, text, date) VALUES (?, ?, ?, ?, ?, ?)",
+            (action["id"], card_id, board_id, action.get("idMemberCreator"), data.get("text", ""), date),
+        )
+        _touch(mirror, card_id, date)
+    elif kind == "updateComment":
+        conn.execute(
+            "UPDATE comments SET text = ? WHERE id = ?",
+            (data.get("action", {}).get("text", ""), data.get("action", {}).get("id")),
+        )
+    elif kind == "deleteComment":
+        conn.execute("DELETE FROM comments WHERE id = ?", ((data.get("action") or {}).get("id"),))
+    elif kind == "addLabelToCard" and card_id:
+        label = data.get("label") or {}
+        if label.get("id"):
+            if board_id:
+                conn.execute(
+                    "INSERT OR IGNORE INTO labels (id, board_id, name, color) VALUES (?, ?, ?, ?)",
+                    (label["id"], board_id, label.get("name") or "", label.get("color")),
+                )
+            conn.execute("INSERT OR IGNORE INTO card_labels (card_id, label_id) VALUES (?, ?)", (card_id, label["id"]))
+        _touch(mirror, card_id, date)
+    elif kind == "removeLabelFromCard" and card_id:
+        label_id = (data.get("label") or {}).get("id")
+        conn.execute("DELETE FROM card_labels WHERE card_id = ? AND label_id = ?", (card_id, label_id))
+        _touch(mirror, card_id, date)
+    elif kind == "addMemberToCard" and card_id:
+        member_id = data.get("idMember") or (data.get("member") or {}).get("id")
+        if member_id:
+            conn.execute(
+                "INSERT OR IGNORE INTO card_members (card_id, member_id) VALUES (?, ?)", (card_id, member_id)
+            )
+        _touch(mirror, card_id, date)
+    elif kind == "removeMemberFromCard" and card_id:
+        member_id = data.get("idMember") or (data.get("member") or {}).get("id")
+        conn.execute("DELETE FROM card_members WHERE card_id = ? AND member_id = ?", (card_id, member_id))
+        _touch(mirror, card_id, date)
+    elif kind == "addChecklistToCard" and card_id and data.get("checklist"):
+        checklist = data["checklist"]
+        conn.execute(
+            "INSERT OR IGNORE INTO checklists (id, card_id, board_id, name) VALUES (?, ?, ?, ?)",
+            (checklist["id"], card_id, board_id, checklist.get("name") or ""),
+        )
+        _touch(mirror, card_id, date)
+    elif kind == "removeChecklistFromCard" and data.get("checklist"):
+        conn.execute("DELETE FROM checklists WHERE id = ?", (data["checklist"]["id"],))
+        conn.execute("DELETE FROM check_items WHERE checklist_id = ?", (data["checklist"]["id"],))
+    elif kind == "updateChecklist" and data.get("checklist"):
+        checklist = data["checklist"]
+        if "name" in checklist:
+            conn.execute("UPDATE checklists SET name = ? WHERE id = ?", (checklist["name"], checklist["id"]))
+    elif kind in ("createCheckItem", "updateCheckItem", "updateCheckItemStateOnCard") and data.get("checkItem"):
+        item = data["checkItem"]
+        checklist_id = (data.get("checklist") or {}).get("id") or item.get("idChecklist")
+        conn.execute(
+            "INSERT OR IGNORE INTO check_items (id, checklist_id, card_id, board_id) VALUES (?, ?, ?, ?)",
+            (item["id"], checklist_id, card_id, board_id),
+        )
+        fields: dict[str, Any] = {}
+        if "name" in item:
+            fields["name"] = item["name"]
+        if "state" in item:
+            fields["complete"] = int(item["state"] == "complete")
+        if "pos" in item:
+            fields["pos"] = float(item["pos"] or 0)
+        if fields:
+            assignments = ", ".join(f"{key} = ?" for key in fields)
+            conn.execute(f"UPDATE check_items SET {assignments} WHERE id = ?", (*fields.values(), item["id"]))
+        if card_id:
+            _touch(mirror, card_id, date)
+    elif kind == "deleteCheckItem" and data.get("checkItem"):
+        conn.execute("DELETE FROM check_items WHERE id = ?", (data["checkItem"]["id"],))
+    elif kind in ("createList", "updateList", "moveListToBoard") and data.get("list"):
+        lst = data["list"]
+        conn.execute("INSERT OR IGNORE INTO lists (id, board_id) VALUES (?, ?)", (lst["id"], board_id))
+        fields = {key: lst[key] for key in ("name", "closed", "pos") if key in lst}
+        if fields:
+            assignments = ", ".join(f"{key} = ?" for key in fields)
+            values = [_column_value(key, value) for key, value in fields.items()]
+            conn.execute(f"UPDATE lists SET {assignments} WHERE id = ?", (*values, lst["id"]))
+    elif kind == "moveListFromBoard" and data.get("list"):
+        conn.execute("DELETE FROM lists WHERE id = ?", (data["list"]["id"],))
+    elif kind in ("createLabel", "updateLabel") and data.get("label"):
+        label = data["label"]
+        conn.execute("INSERT OR IGNORE INTO labels (id, board_id) VALUES (?, ?)", (label["id"], board_id))
+        fields = {key: label[key] for key in ("name", "color") if key in label}
+        if fields:
+            assignments = ", ".join(f"{key} = ?" for key in fields)
+            conn.execute(f"UPDATE labels SET {assignments} WHERE id = ?", (*fields.values(), label["id"]))
+    elif kind == "deleteLabel" and data.get("label"):
+        conn.execute("DELETE FROM labels WHERE id = ?", (data["label"]["id"],))
+        conn.execute("DELETE FROM card_labels WHERE label_id = ?", (data["label"]["id"],))
+    elif kind in ("addMemberToBoard", "makeNormalMemberOfBoard", "makeAdminOfBoard") and board_id:
+        member = data.get("member") or action.get("member") or {}
+        member_id = data.get("idMember") or member.get("id")
+        if member_id:
+            mirror.upsert_member({"id": member_id, **member}, board_id)
+    elif kind == "removeMemberFromBoard" and board_id:
+        member_id = data.get("idMember") or (data.get("member") or {}).get("id")
+        conn.execute("DELETE FROM board_members WHERE board_id = ? AND member_id = ?", (board_id, member_id))
+    elif kind == "updateBoard" and board_id:
+        fields = {key: data["board"][key] for key in ("name", "closed") if key in data["board"]}
+        if fields:
+            assignments = ", ".join(f"{key} = ?" for key in fields)
+            values = [_column_value(key, value) for key, value in fields.items()]
+            conn.execute(f"UPDATE boards SET {assignments} WHERE id = ?", (*values, board_id))
+    elif card_id:
+        # Checklists, attachments and similar card-level actions only bump
+        # the card's activity timestamp in the mirror.
+        _touch(mirror, card_id, date)
+    else:
+        logger.debug("ignoring action %s of type %s", action.get("id"), kind)
+    return stale
+
+
+def _touch(mirror: BoardMirror, card_id: str, date: str | None) -> None:
+    if date:
+        mirror.conn.execute(
+            "UPDATE cards SET last_activity = max(coalesce(last_activity, ''), ?) WHERE id = ?", (date, card_id)
+        )
+
+
+def apply_actions(mirror: BoardMirror, actions: Iterable[Mapping[str, Any]]) -> set[str]:
+    """Apply ``actions`` oldest first inside one transaction.
+
+    The board cursor advances to the newest applied action, so applying the
+    same feed twice is harmless. Mirror subscribers are notified once the
+    transaction has committed.
+    """
+    ordered = sorted(actions, key=lambda a: a["id"])
+    stale: set[str] = set()
+    cursors: dict[str, tuple[str, str | None]] = {}
+    change = MirrorChange()
+    with mirror.transaction():
+        for action in ordered:
+            data = action.get("data") or {}
+            board_id = (data.get("board") or {}).get("id")
+            if board_id:
+                current = cursors.get(board_id, (mirror.cursor(board_id) or "", None))[0]
+                if action["id"] <= current:
+                    continue
+                cursors[board_id] = (action["id"], action.get("date"))
+                change.board_ids.add(board_id)
+            stale |= apply_action(mirror, action)
+            card_id = (data.get("card") or {}).get("id")
+            if card_id:
+                change.card_ids.add(card_id)
+            if action.get("type") in ("deleteCard", "moveCardFromBoard"):
+                stale.discard(card_id)
+            change.actions.append(action)
+        for board_id, (action_id, date) in cursors.items():
+            mirror.set_cursor(board_id, action_id, date)
+    if change.actions:
+        mirror.notify(change)
+    return stale
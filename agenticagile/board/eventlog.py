@@ -0,0 +1,388 @@
+"""Append-only, segmented, columnar log of every Trello action ingested.
+
+Raw action JSON is large and has to be parsed again by every report. The log
+instead stores each action as one row of fixed-width columns, with ids, action
+types and names dictionary-encoded to ``int32`` codes. Each column is a plain
+binary file that readers memory-map, so analytics touch only the columns they
+use.
+
+The rest of the action (``data`` without the board reference, which is
+rebuilt from the ``board`` column) is kept for replay as compact JSON,
+zlib-compressed with a preset dictionary of common Trello keys. The bulky
+``memberCreator`` objects are dropped; ``idMemberCreator`` is kept as a
+column.
+
+On-disk layout::
+
+    <root>/dict-ids.txt  dict-types.txt  dict-strings.txt   # one JSON string per line
+    <root>/seg-000000/time_ms.bin  type.bin  board.bin  ...  payload.bin
+    <root>/seg-000001/...
+
+Dictionaries are written before the rows that use them, and every column of a
+segment is written before its row count is trusted, so a crash mid-append
+loses at most that append. A reopened log truncates the partial rows.
+
+Usage::
+
+    log = EventLog("var/events")
+    log.attach(mirror)  # log every action the mirror applies
+    cols = log.columns(["time_ms", "type", "card"], board_id=board_id)
+    for action in log.actions(board_id=board_id, until=monday):
+        ...
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import zlib
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from agenticagile.board.actions import CARD_CREATING_ACTIONS
+from agenticagile.board.mirror import BoardMirror, MirrorChange
+
+logger = logging.getLogger(__name__)
+
+#: Fixed-width columns of a segment. Codes are ``-1`` when absent.
+COLUMNS: dict[str, np.dtype[Any]] = {
+    "id": np.dtype("S12"),  # the 24-hex action id as raw bytes
+    "time_ms": np.dtype("<i8"),
+    "type": np.dtype("<i2"),  # types dictionary
+    "member": np.dtype("<i4"),  # ids dictionary: idMemberCreator
+    "board": np.dtype("<i4"),
+    "card": np.dtype("<i4"),
+    "list": np.dtype("<i4"),  # data.list, or data.listAfter for moves
+    "list_before": np.dtype("<i4"),
+    "name": np.dtype("<i4"),  # strings dictionary: card name set by a create or rename
+    "list_name": np.dtype("<i4"),  # strings dictionary: name of ``list``
+    "closed": np.dtype("i1"),  # data.card.closed set by the action: 0/1, -1 absent
+    "payload_end": np.dtype("<u8"),  # end offset of the row's bytes in payload.bin
+}
+
+#: Preset zlib dictionary: substrings common in Trello action payloads.
+ZDICT = (
+    b'"listBefore":{"id":"' b'"listAfter":{"id":"' b'"checklist":{"id":"' b'"checkItem":{"id":"'
+    b'"label":{"id":"' b'"color":"' b'"state":"complete"' b'"state":"incomplete"' b'"idList":"'
+    b'"closed":false' b'"closed":true' b'"old":{' b'"text":"' b'"desc":"' b'"pos":' b'"idShort":'
+    b'"shortLink":"' b'"list":{"id":"' b'"card":{"id":"' b'"name":"' b'"idMember":"' b'"member":{"id":"'
+)
+
+_SEGMENT_ROWS = 1 << 20
+
+
+def _parse_ms(date: str | None, action_id: str) -> int:
+    if date:
+        try:
+            return int(datetime.fromisoformat(date.replace("Z", "+00:00")).timestamp() * 1000)
+        except ValueError:
+            pass
+    return int(action_id[:8], 16) * 1000
+
+
+def action_hex(raw: bytes) -> str:
+    """Hex action id of an ``id`` column value (NumPy strips trailing NULs)."""
+    return raw.ljust(12, b"\0").hex()
+
+
+def _format_ms(ms: int) -> str:
+    moment = datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{ms % 1000:03d}Z"
+
+
+class _Dictionary:
+    """Append-only string dictionary persisted as one JSON string per line."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+        if path.exists():
+            raw = path.read_bytes()
+            complete = raw[: raw.rfind(b"\n") + 1]
+            if len(complete) != len(raw):
+                # A torn final line: the rows using it were never written.
+                path.write_bytes(complete)
+            for line in complete.decode("utf-8").splitlines():
+                value = json.loads(line)
+                self.codes[value] = len(self.values)
+                self.values.append(value)
+        self._pending: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def get(self, value: str) -> int | None:
+        return self.codes.get(value)
+
+    def code(self, value: str | None) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self._pending.append(json.dumps(value) + "\n")
+        return code
+
+    def flush(self) -> None:
+        if self._pending:
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write("".join(self._pending))
+            self._pending.clear()
+
+
+class _Segment:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._maps: dict[str, tuple[int, np.ndarray]] = {}
+        path.mkdir(parents=True, exist_ok=True)
+        for name in [*COLUMNS, "payload"]:
+            self._file(name).touch()
+        sizes = [self._file(name).stat().st_size // dtype.itemsize for name, dtype in COLUMNS.items()]
+        self.rows = min(sizes)
+        if max(sizes) != self.rows:
+            logger.warning("truncating %s to %d complete rows", path, self.rows)
+            for name, dtype in COLUMNS.items():
+                with self._file(name).open("r+b") as handle:
+                    handle.truncate(self.rows * dtype.itemsize)
+        end = int(self.column("payload_end")[-1]) if self.rows else 0
+        if self._file("payload").stat().st_size != end:
+            with self._file("payload").open("r+b") as handle:
+                handle.truncate(end)
+
+    def _file(self, name: str) -> Path:
+        return self.path / f"{name}.bin"
+
+    def column(self, name: str) -> np.ndarray:
+        """Memory-mapped view of one column (cached until the segment grows)."""
+        if not self.rows:
+            return np.empty(0, dtype=COLUMNS[name])
+        cached = self._maps.get(name)
+        if cached is None or cached[0] != self.rows:
+            cached = self._maps[name] = (
+                self.rows,
+                np.memmap(self._file(name), dtype=COLUMNS[name], mode="r", shape=(self.rows,)),
+            )
+        return cached[1]
+
+    def append(self, columns: Mapping[str, np.ndarray], payload: bytes) -> None:
+        with self._file("payload").open("ab") as handle:
+            handle.write(payload)
+        # ``payload_end`` goes last: its length decides whether rows are complete.
+        for name in COLUMNS:
+            with self._file(name).open("ab") as handle:
+                handle.write(np.ascontiguousarray(columns[name], dtype=COLUMNS[name]).tobytes())
+        self.rows += len(columns["time_ms"])
+
+
+class EventLog:
+    """Segmented columnar store of Trello actions.
+
+    Args:
+        root: Directory of the log; created when missing.
+        segment_rows: Rows per segment before a new one is started.
+    """
+
+    def __init__(self, root: str | Path, *, segment_rows: int = _SEGMENT_ROWS) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_rows = segment_rows
+        self.ids = _Dictionary(self.root / "dict-ids.txt")
+        self.types = _Dictionary(self.root / "dict-types.txt")
+        self.strings = _Dictionary(self.root / "dict-strings.txt")
+        self.segments = [_Segment(path) for path in sorted(self.root.glob("seg-*"))]
+        if not self.segments:
+            self.segments.append(_Segment(self.root / "seg-000000"))
+        self._lock = threading.Lock()
+        self._newest: dict[int, bytes] = {}
+        for segment in self.segments:
+            boards, ids = segment.column("board"), segment.column("id")
+            for board in np.unique(boards).tolist():
+                newest = np.sort(ids[boards == board])[-1]
+                self._newest[board] = max(self._newest.get(board, b""), newest)
+
+    def __len__(self) -> int:
+        return sum(segment.rows for segment in self.segments)
+
+    def attach(self, mirror: BoardMirror) -> Callable[[], None]:
+        """Log every action the mirror applies from now on; returns the detach function."""
+
+        def on_change(change: MirrorChange) -> None:
+            if change.actions:
+                self.append(change.actions)
+
+        return mirror.subscribe(on_change)
+
+    # -- writing ----------------------------------------------------------
+
+    def _known(self, raw_ids: np.ndarray) -> np.ndarray:
+        known = np.zeros(raw_ids.size, dtype=bool)
+        for segment in self.segments:
+            known |= np.isin(raw_ids, segment.column("id"))
+        return known
+
+    def append(self, actions: Iterable[Mapping[str, Any]]) -> int:
+        """Append actions not yet in the log; returns how many were written.
+
+        Actions newer than everything logged for their board are appended
+        without a lookup; older ones (backfills, redeliveries) are checked
+        against the id column first.
+        """
+        with self._lock:
+            batch = {action["id"]: action for action in actions if action.get("id")}
+            if not batch:
+                return 0
+            ordered = sorted(batch.values(), key=lambda a: a["id"])
+            raw_ids = np.array([bytes.fromhex(action["id"]) for action in ordered], dtype="S12")
+            boards = [((a.get("data") or {}).get("board") or {}).get("id") for a in ordered]
+            board_codes = np.array([self.ids.code(board_id) for board_id in boards], dtype=np.int32)
+            newest = np.array([self._newest.get(code, b"") for code in board_codes.tolist()], dtype="S12")
+            maybe_known = raw_ids <= newest
+            if maybe_known.any():
+                known = np.zeros(len(ordered), dtype=bool)
+                known[maybe_known] = self._known(raw_ids[maybe_known])
+                ordered = [action for action, skip in zip(ordered, known) if not skip]
+                raw_ids, board_codes = raw_ids[~known], board_codes[~known]
+            if not ordered:
+                return 0
+            start = 0
+            while start < len(ordered):
+                segment = self.segments[-1]
+                room = self.segment_rows - segment.rows
+                if room <= 0:
+                    segment = _Segment(self.root / f"seg-{len(self.segments):06d}")
+                    self.segments.append(segment)
+                    room = self.segment_rows
+                chunk = slice(start, start + room)
+                self._write(segment, ordered[chunk], raw_ids[chunk], board_codes[chunk])
+                start += room
+            for code, raw in zip(board_codes.tolist(), raw_ids.tolist()):
+                if raw > self._newest.get(code, b""):
+                    self._newest[code] = raw
+            return len(ordered)
+
+    def _write(self, segment: _Segment, actions: Sequence[Mapping[str, Any]], raw_ids: np.ndarray, boards: np.ndarray) -> None:
+        count = len(actions)
+        columns = {name: np.full(count, -1, dtype=dtype) for name, dtype in COLUMNS.items() if name not in ("id", "payload_end")}
+        columns["id"], columns["board"] = raw_ids, boards
+        payload = bytearray()
+        ends = np.empty(count, dtype=np.uint64)
+        base = int(segment.column("payload_end")[-1]) if segment.rows else 0
+        for row, action in enumerate(actions):
+            data = dict(action.get("data") or {})
+            board = data.pop("board", None) or {}
+            if set(board) - {"id", "name"}:
+                data["board"] = {k: v for k, v in board.items() if k != "id"}  # e.g. updateBoard changes
+            card = data.get("card") or {}
+            lst = data.get("listAfter") or data.get("list") or {}
+            kind = action.get("type", "")
+            columns["time_ms"][row] = _parse_ms(action.get("date"), action["id"])
+            columns["type"][row] = self.types.code(kind)
+            columns["member"][row] = self.ids.code(action.get("idMemberCreator"))
+            columns["card"][row] = self.ids.code(card.get("id"))
+            columns["list"][row] = self.ids.code(lst.get("id"))
+            columns["list_before"][row] = self.ids.code((data.get("listBefore") or {}).get("id"))
+            columns["list_name"][row] = self.strings.code(lst.get("name"))
+            if "closed" in card:
+                columns["closed"][row] = int(bool(card["closed"]))
+            if card.get("name") is not None and (kind in CARD_CREATING_ACTIONS or "name" in (data.get("old") or {})):
+                columns["name"][row] = self.strings.code(card["name"])
+            compressor = zlib.compressobj(6, zdict=ZDICT)
+            payload += compressor.compress(json.dumps(data, separators=(",", ":")).encode()) + compressor.flush()
+            ends[row] = base + len(payload)
+        columns["payload_end"] = ends
+        for dictionary in (self.ids, self.types, self.strings):
+            dictionary.flush()
+        segment.append(columns, bytes(payload))
+
+    # -- reading ----------------------------------------------------------
+
+    def _masks(self, board_id: str | None, since_ms: int | None, until_ms: int | None) -> Iterator[tuple[_Segment, np.ndarray | None]]:
+        board = None
+        if board_id is not None:
+            board = self.ids.get(board_id)
+            if board is None:
+                return
+        for segment in self.segments:
+            if not segment.rows:
+                continue
+            mask = None
+            if board is not None:
+                mask = segment.column("board") == board
+            if since_ms is not None or until_ms is not None:
+                times = segment.column("time_ms")
+                window = np.ones(segment.rows, dtype=bool)
+                if since_ms is not None:
+                    window &= times >= since_ms
+                if until_ms is not None:
+                    window &= times < until_ms
+                mask = window if mask is None else mask & window
+            yield segment, mask
+
+    def columns(
+        self,
+        names: Sequence[str],
+        *,
+        board_id: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> dict[str, np.ndarray]:
+        """Read ``names`` across segments, optionally for one board and a time window.
+
+        ``since`` and ``until`` are Unix seconds (``since <= t < until``).
+        Only the requested columns, plus those needed for filtering, are read.
+        """
+        since_ms = None if since is None else int(since * 1000)
+        until_ms = None if until is None else int(until * 1000)
+        parts: dict[str, list[np.ndarray]] = {name: [] for name in names}
+        for segment, mask in self._masks(board_id, since_ms, until_ms):
+            for name in names:
+                column = segment.column(name)
+                parts[name].append(np.asarray(column if mask is None else column[mask]))
+        return {
+            name: np.concatenate(chunks) if chunks else np.empty(0, dtype=COLUMNS[name])
+            for name, chunks in parts.items()
+        }
+
+    def actions(
+        self, *, board_id: str | None = None, since: float | None = None, until: float | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Rebuild Trello-shaped actions in log order (oldest first per board)."""
+        since_ms = None if since is None else int(since * 1000)
+        until_ms = None if until is None else int(until * 1000)
+        for segment, mask in self._masks(board_id, since_ms, until_ms):
+            rows = np.arange(segment.rows) if mask is None else np.flatnonzero(mask)
+            if not rows.size:
+                continue
+            ids = segment.column("id")[rows]
+            times = segment.column("time_ms")[rows]
+            types = segment.column("type")[rows]
+            members = segment.column("member")[rows]
+            boards = segment.column("board")[rows]
+            ends = segment.column("payload_end")
+            with segment._file("payload").open("rb") as handle:
+                for i, row in enumerate(rows.tolist()):
+                    start = int(ends[row - 1]) if row else 0
+                    handle.seek(start)
+                    decompressor = zlib.decompressobj(zdict=ZDICT)
+                    data = json.loads(decompressor.decompress(handle.read(int(ends[row]) - start)))
+                    board_code = int(boards[i])
+                    if board_code >= 0:
+                        data["board"] = {"id": self.ids[board_code], **data.get("board", {})}
+                    member = int(members[i])
+                    yield {
+                        "id": action_hex(ids[i]),
+                        "idMemberCreator": self.ids[member] if member >= 0 else None,
+                        "type": self.types[int(types[i])],
+                        "date": _format_ms(int(times[i])),
+                        "data": data,
+                    }
@@ -0,0 +1,647 @@
+"""SQLite-backed local mirror of the managed Trello boards.
+
+Agent queries (standups, sprint status, "what is blocked") read from the
+mirror instead of calling the API. The mirror is seeded once from full board
+snapshots and then kept current by applying the board action feed, see
+:mod:`agenticagile.board.actions` and :mod:`agenticagile.board.sync`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import uuid
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS boards (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    closed INTEGER NOT NULL DEFAULT 0,
+    last_action_id TEXT,
+    last_action_date TEXT,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS lists (
+    id TEXT PRIMARY KEY,
+    board_id TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    closed INTEGER NOT NULL DEFAULT 0,
+    pos REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS lists_board ON lists (board_id);
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY,
+    board_id TEXT NOT NULL,
+    list_id TEXT,
+    name TEXT NOT NULL DEFAULT '',
+    desc TEXT NOT NULL DEFAULT '',
+    closed INTEGER NOT NULL DEFAULT 0,
+    due TEXT,
+    due_complete INTEGER NOT NULL DEFAULT 0,
+    pos REAL NOT NULL DEFAULT 0,
+    last_activity TEXT,
+    list_entered_at TEXT,
+    short_link TEXT
+);
+CREATE INDEX IF NOT EXISTS cards_board ON cards (board_id);
+CREATE INDEX IF NOT EXISTS cards_list ON cards (list_id);
+CREATE TABLE IF NOT EXISTS labels (
+    id TEXT PRIMARY KEY,
+    board_id TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    color TEXT
+);
+CREATE TABLE IF NOT EXISTS members (
+    id TEXT PRIMARY KEY,
+    full_name TEXT NOT NULL DEFAULT '',
+    username TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS board_members (
+    board_id TEXT NOT NULL,
+    member_id TEXT NOT NULL,
+    PRIMARY KEY (board_id, member_id)
+);
+CREATE TABLE IF NOT EXISTS card_labels (
+    card_id TEXT NOT NULL,
+    label_id TEXT NOT NULL,
+    PRIMARY KEY (card_id, label_id)
+);
+CREATE TABLE IF NOT EXISTS card_members (
+    card_id TEXT NOT NULL,
+    member_id TEXT NOT NULL,
+    PRIMARY KEY (card_id, member_id)
+);
+CREATE INDEX IF NOT EXISTS card_members_member ON card_members (member_id);
+CREATE TABLE IF NOT EXISTS comments (
+    id TEXT PRIMARY KEY,
+    card_id TEXT NOT NULL,
+    board_id TEXT NOT NULL,
+    member_id TEXT,
+    text TEXT NOT NULL DEFAULT '',
+    date TEXT
+);
+CREATE INDEX IF NOT EXISTS comments_card ON comments (card_id);
+CREATE TABLE IF NOT EXISTS checklists (
+    id TEXT PRIMARY KEY,
+    card_id TEXT NOT NULL,
+    board_id TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    pos REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS checklists_card ON checklists (card_id);
+CREATE TABLE IF NOT EXISTS check_items (
+    id TEXT PRIMARY KEY,
+    checklist_id TEXT NOT NULL,
+    card_id TEXT NOT NULL,
+    board_id TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    complete INTEGER NOT NULL DEFAULT 0,
+    pos REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS check_items_card ON check_items (card_id);
+"""
+
+
+def _revision_triggers() -> str:
+    """Triggers bumping ``boards.revision`` whenever a board's content changes."""
+    bump = "UPDATE boards SET revision = revision + 1 WHERE id = {};"
+    via_card = "(SELECT board_id FROM cards WHERE id = {}.card_id)"
+    statements = []
+    for table in ("lists", "cards", "labels", "comments", "checklists", "check_items"):
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_rev_ins AFTER INSERT ON {table} "
+            f"BEGIN {bump.format('NEW.board_id')} END;",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_rev_upd AFTER UPDATE ON {table} "
+            f"BEGIN {bump.format('OLD.board_id')} {bump.format('NEW.board_id')} END;",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_rev_del AFTER DELETE ON {table} "
+            f"BEGIN {bump.format('OLD.board_id')} END;",
+        ]
+    for table in ("card_labels", "card_members"):
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_rev_ins AFTER INSERT ON {table} "
+            f"BEGIN {bump.format(via_card.format('NEW'))} END;",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_rev_del AFTER DELETE ON {table} "
+            f"BEGIN {bump.format(via_card.format('OLD'))} END;",
+        ]
+    return "\n".join(statements)
+
+#: Label names (case-insensitive) and list names that mark a card as blocked.
+BLOCKED_MARKERS = ("blocked", "blocker", "on hold")
+
+
+@dataclass
+class Card:
+    """A card as stored in the mirror."""
+
+    id: str
+    board_id: str
+    list_id: str | None
+    name: str
+    desc: str = ""
+    closed: bool = False
+    due: str | None = None
+    due_complete: bool = False
+    pos: float = 0.0
+    last_activity: str | None = None
+    list_entered_at: str | None = None
+    label_ids: list[str] = field(default_factory=list)
+    member_ids: list[str] = field(default_factory=list)
+
+
+_CARD_COLUMNS = (
+    "id, board_id, list_id, name, desc, closed, due, due_complete, pos, last_activity, list_entered_at"
+)
+
+
+@dataclass
+class MirrorChange:
+    """What a committed write changed; passed to mirror subscribers.
+
+    ``actions`` holds the Trello actions applied (oldest first) when the
+    change came from the action feed; ``snapshot`` is set when whole boards
+    were reloaded.
+    """
+
+    board_ids: set[str] = field(default_factory=set)
+    card_ids: set[str] = field(default_factory=set)
+    actions: list[Mapping[str, Any]] = field(default_factory=list)
+    snapshot: bool = False
+
+
+MirrorListener = Callable[[MirrorChange], None]
+
+
+class BoardMirror:
+    """Local relational copy of boards, lists, cards, labels and members.
+
+    Args:
+        path: SQLite database file, or ``":memory:"`` for a throwaway mirror.
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        board_columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(boards)")}
+        if "revision" not in board_columns:
+            # Mirrors created before revisions were tracked.
+            self.conn.execute("ALTER TABLE boards ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+        card_columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(cards)")}
+        if "short_link" not in card_columns:
+            # Mirrors created before short links were stored.
+            self.conn.execute("ALTER TABLE cards ADD COLUMN short_link TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS cards_short_link ON cards (short_link)")
+        self.conn.executescript(_revision_triggers())
+        self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)", (uuid.uuid4().hex,))
+        self.epoch: str = self.conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+        self._listeners: list[MirrorListener] = []
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group several writes into one atomic SQLite transaction."""
+        if self.conn.in_transaction:
+            yield self.conn
+            return
+        self.conn.execute("BEGIN")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def subscribe(self, listener: MirrorListener) -> Callable[[], None]:
+        """Call ``listener`` after every committed change; returns an unsubscribe function."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def notify(self, change: MirrorChange) -> None:
+        """Tell subscribers about ``change``; listener errors are logged, not raised."""
+        for listener in list(self._listeners):
+            try:
+                listener(change)
+            except Exception:  # noqa: BLE001 - one bad listener must not break sync
+                logger.exception("mirror listener %r failed", listener)
+
+    # -- writes -----------------------------------------------------------
+
+    def upsert_board(self, board: Mapping[str, Any]) -> None:
+        self.conn.execute(
+            "INSERT INTO boards (id, name, closed) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, closed = excluded.closed",
+            (board["id"], board.get("name", ""), int(bool(board.get("closed")))),
+        )
+
+    def upsert_list(self, lst: Mapping[str, Any], board_id: str | None = None) -> None:
+        self.conn.execute(
+            "INSERT INTO lists (id, board_id, name, closed, pos) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET board_id = excluded.board_id, name = excluded.name, "
+            "closed = excluded.closed, pos = excluded.pos",
+            (
+                lst["id"],
+                board_id or lst["idBoard"],
+                lst.get("name", ""),
+                int(bool(lst.get("closed"))),
+                float(lst.get("pos") or 0),
+            ),
+        )
+
+    def upsert_label(self, label: Mapping[str, Any], board_id: str | None = None) -> None:
+        self.conn.execute(
+            "INSERT INTO labels (id, board_id, name, color) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, color = excluded.color",
+            (label["id"], board_id or label["idBoard"], label.get("name") or "", label.get("color")),
+        )
+
+    def upsert_member(self, member: Mapping[str, Any], board_id: str | None = None) -> None:
+        self.conn.execute(
+            "INSERT INTO members (id, full_name, username) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET full_name = excluded.full_name, username = excluded.username",
+            (member["id"], member.get("fullName") or "", member.get("username") or ""),
+        )
+        if board_id:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO board_members (board_id, member_id) VALUES (?, ?)",
+                (board_id, member["id"]),
+            )
+
+    def upsert_card(self, card: Mapping[str, Any], board_id: str | None = None) -> None:
+        """Insert or replace a card from a full Trello card payload."""
+        previous = self.conn.execute(
+            "SELECT list_id, list_entered_at, short_link FROM cards WHERE id = ?", (card["id"],)
+        ).fetchone()
+        list_id = card.get("idList")
+        entered = card.get("dateLastActivity")
+        if previous is not None and previous["list_id"] == list_id:
+            entered = previous["list_entered_at"] or entered
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO cards ({_CARD_COLUMNS}, short_link) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                card["id"],
+                board_id or card["idBoard"],
+                list_id,
+                card.get("name", ""),
+                card.get("desc") or "",
+                int(bool(card.get("closed"))),
+                card.get("due"),
+                int(bool(card.get("dueComplete"))),
+                float(card.get("pos") or 0),
+                card.get("dateLastActivity"),
+                entered,
+                card.get("shortLink") or (previous["short_link"] if previous is not None else None),
+            ),
+        )
+        if "idLabels" in card:
+            self.set_card_labels(card["id"], card["idLabels"])
+        if "idMembers" in card:
+            self.set_card_members(card["id"], card["idMembers"])
+
+    def upsert_checklist(self, checklist: Mapping[str, Any], board_id: str | None = None) -> None:
+        """Store a checklist payload, replacing its check items when present."""
+        board_id = board_id or checklist["idBoard"]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checklists (id, card_id, board_id, name, pos) VALUES (?, ?, ?, ?, ?)",
+            (checklist["id"], checklist["idCard"], board_id, checklist.get("name") or "", float(checklist.get("pos") or 0)),
+        )
+        if "checkItems" in checklist:
+            self.conn.execute("DELETE FROM check_items WHERE checklist_id = ?", (checklist["id"],))
+            self.conn.executemany(
+                "INSERT INTO check_items (id, checklist_id, card_id, board_id, name, complete, pos) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        item["id"],
+                        checklist["id"],
+                        checklist["idCard"],
+                        board_id,
+                        item.get("name") or "",
+                        int(item.get("state") == "complete"),
+                        float(item.get("pos") or 0),
+                    )
+                    for item in checklist["checkItems"]
+                ],
+            )
+
+    def set_card_labels(self, card_id: str, label_ids: Iterable[str]) -> None:
+        self.conn.execute("DELETE FROM card_labels WHERE card_id = ?", (card_id,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO card_labels (card_id, label_id) VALUES (?, ?)",
+            [(card_id, label_id) for label_id in label_ids],
+        )
+
+    def set_card_members(self, card_id: str, member_ids: Iterable[str]) -> None:
+        self.conn.execute("DELETE FROM card_members WHERE card_id = ?", (card_id,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO card_members (card_id, member_id) VALUES (?, ?)",
+            [(card_id, member_id) for member_id in member_ids],
+        )
+
+    def delete_card(self, card_id: str) -> None:
+        """Forget a card together with its labels, members, checklists and comments."""
+        self.conn.execute("DELETE FROM cards WHERE id = ?", (card_id,))
+        for table in ("card_labels", "card_members", "checklists", "check_items", "comments"):
+            self.conn.execute(f"DELETE FROM {table} WHERE card_id = ?", (card_id,))
+
+    def load_snapshot(self, snapshot: Mapping[str, Any], *, cursor: tuple[str, str | None] | None = None) -> None:
+        """Replace everything known about one board with a full snapshot.
+
+        ``snapshot`` is the payload of ``GET /boards/{id}`` with lists, cards,
+        labels and members expanded (see ``TrelloClient.get_board_snapshot``).
+        ``cursor`` is the ``(action_id, date)`` of the newest action the
+        snapshot reflects; it is stored in the same transaction, so
+        subscribers see the board and its cursor together.
+        """
+        board_id = snapshot["id"]
+        with self.transaction() as conn:
+            card_ids = [row[0] for row in conn.execute("SELECT id FROM cards WHERE board_id = ?", (board_id,))]
+            conn.executemany("DELETE FROM card_labels WHERE card_id = ?", [(c,) for c in card_ids])
+            conn.executemany("DELETE FROM card_members WHERE card_id = ?", [(c,) for c in card_ids])
+            for table in ("cards", "lists", "labels", "board_members", "checklists", "check_items"):
+                conn.execute(f"DELETE FROM {table} WHERE board_id = ?", (board_id,))
+            self.upsert_board(snapshot)
+            for lst in snapshot.get("lists", ()):
+                self.upsert_list(lst, board_id)
+            for label in snapshot.get("labels", ()):
+                self.upsert_label(label, board_id)
+            for member in snapshot.get("members", ()):
+                self.upsert_member(member, board_id)
+            for card in snapshot.get("cards", ()):
+                self.upsert_card(card, board_id)
+            for checklist in snapshot.get("checklists", ()):
+                self.upsert_checklist(checklist, board_id)
+            if cursor is not None:
+                self.set_cursor(board_id, *cursor)
+        self.notify(
+            MirrorChange(
+                board_ids={board_id},
+                card_ids=set(card_ids) | {card["id"] for card in snapshot.get("cards", ())},
+                snapshot=True,
+            )
+        )
+
+    def export_board(self, board_id: str) -> dict[str, list[list[Any]]]:
+        """Every row describing ``board_id``, per table: ``[columns, *rows]``.
+
+        The result is plain JSON-serialisable data; :meth:`import_board`
+        restores it into another mirror.
+        """
+        by_board = "WHERE board_id = ?"
+        by_card = "WHERE card_id IN (SELECT id FROM cards WHERE board_id = ?)"
+        queries = {
+            "boards": "WHERE id = ?",
+            "lists": by_board,
+            "cards": by_board,
+            "labels": by_board,
+            "members": "WHERE id IN (SELECT member_id FROM board_members WHERE board_id = ?)",
+            "board_members": by_board,
+            "card_labels": by_card,
+            "card_members": by_card,
+            "comments": by_board,
+            "checklists": by_board,
+            "check_items": by_board,
+        }
+        state: dict[str, list[list[Any]]] = {}
+        for table, where in queries.items():
+            cursor = self.conn.execute(f"SELECT * FROM {table} {where}", (board_id,))
+            state[table] = [[column[0] for column in cursor.description], *map(list, cursor.fetchall())]
+        return state
+
+    def import_board(self, state: Mapping[str, Sequence[Sequence[Any]]]) -> None:
+        """Load rows produced by :meth:`export_board`, replacing rows with the same keys."""
+        with self.transaction() as conn:
+            for table, (columns, *rows) in state.items():
+                if rows:
+                    marks = ", ".join("?" * len(columns))
+                    conn.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({marks})", rows)
+
+    def set_cursor(self, board_id: str, action_id: str | None, action_date: str | None) -> None:
+        """Record the newest action already reflected for ``board_id``."""
+        self.conn.execute(
+            "INSERT INTO boards (id, last_action_id, last_action_date) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET last_action_id = excluded.last_action_id, "
+            "last_action_date = excluded.last_action_date",
+            (board_id, action_id, action_date),
+        )
+
+    # -- reads ------------------------------------------------------------
+
+    def cursor(self, board_id: str) -> str | None:
+        row = self.conn.execute("SELECT last_action_id FROM boards WHERE id = ?", (board_id,)).fetchone()
+        return row[0] if row else None
+
+    def revision(self, board_id: str) -> int:
+        """Counter that grows with every change to the board's content."""
+        row = self.conn.execute("SELECT revision FROM boards WHERE id = ?", (board_id,)).fetchone()
+        return row[0] if row else 0
+
+    def state_hash(self, board_ids: Iterable[str] | None = None) -> str:
+        """Short hash identifying the current content of ``board_ids``.
+
+        It changes whenever any of the boards changes, and differs between
+        separately built mirrors, so it is safe to use in persistent cache keys.
+        """
+        if board_ids is None:
+            rows = self.conn.execute("SELECT id, revision FROM boards ORDER BY id").fetchall()
+        else:
+            wanted = sorted(set(board_ids))
+            rows = [(board_id, self.revision(board_id)) for board_id in wanted]
+        digest = hashlib.sha256(self.epoch.encode())
+        for board_id, revision in rows:
+            digest.update(f"|{board_id}:{revision}".encode())
+        return digest.hexdigest()[:16]
+
+    def board_ids(self) -> list[str]:
+        return [row[0] for row in self.conn.execute("SELECT id FROM boards ORDER BY name")]
+
+    def board(self, board_id: str) -> dict[str, Any] | None:
+        row = self.conn.execute("SELECT * FROM boards WHERE id = ?", (board_id,)).fetchone()
+        return dict(row) if row else None
+
+    def lists(self, board_id: str, *, include_closed: bool = False) -> list[dict[str, Any]]:
+        sql = "SELECT * FROM lists WHERE board_id = ?"
+        if not include_closed:
+            sql += " AND closed = 0"
+        return [dict(row) for row in self.conn.execute(sql + " ORDER BY pos", (board_id,))]
+
+    def find_list(self, board_id: str, name: str) -> dict[str, Any] | None:
+        row = self.conn.execute(
+            "SELECT * FROM lists WHERE board_id = ? AND lower(name) = lower(?) AND closed = 0",
+            (board_id, name),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def labels(self, board_id: str) -> list[dict[str, Any]]:
+        return [dict(row) for row in self.conn.execute("SELECT * FROM labels WHERE board_id = ?", (board_id,))]
+
+    def members(self, board_id: str | None = None) -> list[dict[str, Any]]:
+        if board_id is None:
+            return [dict(row) for row in self.conn.execute("SELECT * FROM members")]
+        return [
+            dict(row)
+            for row in self.conn.execute(
+                "SELECT m.* FROM members m JOIN board_members bm ON bm.member_id = m.id WHERE bm.board_id = ?",
+                (board_id,),
+            )
+        ]
+
+    def card(self, card_id: str) -> Card | None:
+        cards = self._cards(f"SELECT {_CARD_COLUMNS} FROM cards WHERE id = ?", (card_id,))
+        return cards[0] if cards else None
+
+    def card_by_link(self, ref: str) -> Card | None:
+        """The card with id or short link ``ref`` (the part after ``trello.com/c/``)."""
+        cards = self._cards(f"SELECT {_CARD_COLUMNS} FROM cards WHERE id = ? OR short_link = ?", (ref, ref))
+        return cards[0] if cards else None
+
+    def short_links(self, board_id: str | None = None) -> dict[str, str]:
+        """Short link of every card that has one, by card id."""
+        sql = "SELECT id, short_link FROM cards WHERE short_link IS NOT NULL"
+        params: tuple[str, ...] = ()
+        if board_id is not None:
+            sql += " AND board_id = ?"
+            params = (board_id,)
+        return {card_id: link for card_id, link in self.conn.execute(sql, params)}
+
+    def cards(
+        self,
+        *,
+        board_id: str | None = None,
+        list_id: str | None = None,
+        member_id: str | None = None,
+        include_closed: bool = False,
+    ) -> list[Card]:
+        """Return cards filtered by board, list and/or assigned member."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if board_id is not None:
+            clauses.append("board_id = ?")
+            params.append(board_id)
+        if list_id is not None:
+            clauses.append("list_id = ?")
+            params.append(list_id)
+        if member_id is not None:
+            clauses.append("id IN (SELECT card_id FROM card_members WHERE member_id = ?)")
+            params.append(member_id)
+        if not include_closed:
+            clauses.append("closed = 0")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._cards(f"SELECT {_CARD_COLUMNS} FROM cards{where} ORDER BY pos", params)
+
+    def blocked_cards(self, board_id: str | None = None) -> list[Card]:
+        """Cards carrying a blocked label or sitting in a blocked list."""
+        markers = [f"%{marker}%" for marker in BLOCKED_MARKERS]
+        label_like = " OR ".join("lower(l.name) LIKE ?" for _ in markers)
+        list_like = " OR ".join("lower(name) LIKE ?" for _ in markers)
+        sql = (
+            f"SELECT {_CARD_COLUMNS} FROM cards WHERE closed = 0 AND ("
+            "id IN (SELECT cl.card_id FROM card_labels cl JOIN labels l ON l.id = cl.label_id "
+            f"WHERE {label_like}) OR list_id IN (SELECT id FROM lists WHERE {list_like}))"
+        )
+        params: list[Any] = [*markers, *markers]
+        if board_id is not None:
+            sql += " AND board_id = ?"
+            params.append(board_id)
+        return self._cards(sql + " ORDER BY pos", params)
+
+    def list_counts(self, board_id: str) -> dict[str, int]:
+        """Open card count per open list name, in board order (sprint status)."""
+        rows = self.conn.execute(
+            "SELECT l.name, COUNT(c.id) FROM lists l LEFT JOIN cards c ON c.list_id = l.id AND c.closed = 0 "
+            "WHERE l.board_id = ? AND l.closed = 0 GROUP BY l.id ORDER BY l.pos",
+            (board_id,),
+        )
+        return {name: count for name, count in rows}
+
+    def comments(self, card_id: str, *, limit: int | None = None) -> list[dict[str, Any]]:
+        sql = "SELECT * FROM comments WHERE card_id = ? ORDER BY date DESC"
+        params: list[Any] = [card_id]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def board_comments(self, board_id: str, *, per_card: int = 3) -> dict[str, list[dict[str, Any]]]:
+        """Latest ``per_card`` comments of every card on a board, newest first."""
+        grouped: dict[str, list[dict[str, Any]]] = {}
+        for row in self.conn.execute(
+            "SELECT * FROM comments WHERE board_id = ? ORDER BY card_id, date DESC", (board_id,)
+        ):
+            bucket = grouped.setdefault(row["card_id"], [])
+            if len(bucket) < per_card:
+                bucket.append(dict(row))
+        return grouped
+
+    def checklists(self, card_id: str) -> list[dict[str, Any]]:
+        """Checklists of a card, each with an ``items`` list in board order."""
+        return self._checklists("card_id", card_id).get(card_id, [])
+
+    def board_checklists(self, board_id: str) -> dict[str, list[dict[str, Any]]]:
+        """Checklists (with items) of every card on a board, keyed by card id."""
+        return self._checklists("board_id", board_id)
+
+    def _checklists(self, column: str, value: str) -> dict[str, list[dict[str, Any]]]:
+        by_id: dict[str, dict[str, Any]] = {}
+        grouped: dict[str, list[dict[str, Any]]] = {}
+        for row in self.conn.execute(f"SELECT * FROM checklists WHERE {column} = ? ORDER BY pos", (value,)):
+            checklist = by_id[row["id"]] = {**dict(row), "items": []}
+            grouped.setdefault(row["card_id"], []).append(checklist)
+        for row in self.conn.execute(f"SELECT * FROM check_items WHERE {column} = ? ORDER BY pos", (value,)):
+            if row["checklist_id"] in by_id:
+                by_id[row["checklist_id"]]["items"].append(dict(row))
+        return grouped
+
+    def _cards(self, sql: str, params: Iterable[Any]) -> list[Card]:
+        rows = self.conn.execute(sql, tuple(params)).fetchall()
+        if not rows:
+            return []
+        ids = [row["id"] for row in rows]
+        labels: dict[str, list[str]] = {card_id: [] for card_id in ids}
+        members: dict[str, list[str]] = {card_id: [] for card_id in ids}
+        for chunk_start in range(0, len(ids), 500):
+            chunk = ids[chunk_start : chunk_start + 500]
+            marks = ",".join("?" * len(chunk))
+            for card_id, label_id in self.conn.execute(
+                f"SELECT card_id, label_id FROM card_labels WHERE card_id IN ({marks})", chunk
+            ):
+                labels[card_id].append(label_id)
+            for card_id, member_id in self.conn.execute(
+                f"SELECT card_id, member_id FROM card_members WHERE card_id IN ({marks})", chunk
+            ):
+                members[card_id].append(member_id)
+        return [
+            Card(
+                id=row["id"],
+                board_id=row["board_id"],
+                list_id=row["list_id"],
+                name=row["name"],
+                desc=row["desc"],
+                closed=bool(row["closed"]),
+                due=row["due"],
+                due_complete=bool(row["due_complete"]),
+                pos=row["pos"],
+                last_activity=row["last_activity"],
+                list_entered_at=row["list_entered_at"],
+                label_ids=labels[row["id"]],
+                member_ids=members[row["id"]],
+            )
+            for row in rows
+        ]
@@ -0,0 +1,200 @@
+"""Rebuild a board as it was at any past moment from the event log.
+
+:class:`BoardReplay` stores checkpoints of a board's mirror rows (see
+:meth:`BoardMirror.export_board`) every ``every`` actions and on every full
+snapshot reload. :meth:`BoardReplay.board_at` restores the newest checkpoint
+taken before the requested time into a throwaway in-memory mirror and
+replays only the logged actions after it, so a query never replays more than
+about ``every`` actions. All the usual mirror reads (``cards``,
+``list_counts``, ``blocked_cards``, ...) then answer "what did the sprint look
+like on Monday?".
+
+Checkpoints are taken from the live mirror while it follows the action feed
+(:meth:`BoardReplay.attach`), or built offline from the log with
+:meth:`BoardReplay.build_checkpoints`. Replay only reproduces what actions
+carry. Card details that sync refetched from the API, such as the description
+of a newly created card, appear from the next checkpoint on.
+
+Usage::
+
+    replay = BoardReplay(log, "var/checkpoints.sqlite", every=500)
+    replay.attach(mirror)
+    monday = replay.board_at(board_id, monday_ts)
+    monday.list_counts(board_id)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import time
+import zlib
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from agenticagile.board.actions import apply_actions
+from agenticagile.board.eventlog import EventLog
+from agenticagile.board.mirror import BoardMirror, MirrorChange
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    board_id TEXT NOT NULL,
+    time_ms INTEGER NOT NULL,
+    action_id TEXT NOT NULL,
+    state BLOB NOT NULL,
+    PRIMARY KEY (board_id, time_ms, action_id)
+);
+"""
+
+
+def _date_ms(date: str | None) -> int | None:
+    if not date:
+        return None
+    try:
+        return int(datetime.fromisoformat(date.replace("Z", "+00:00")).timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+class BoardReplay:
+    """Checkpointed replay of boards from an :class:`EventLog`.
+
+    Args:
+        log: Event log holding every action of the replayed boards.
+        path: SQLite file for checkpoints, or ``":memory:"``.
+        every: Actions between two checkpoints of the same board.
+    """
+
+    def __init__(
+        self,
+        log: EventLog,
+        path: str | Path = ":memory:",
+        *,
+        every: int = 500,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.log = log
+        self.every = every
+        self._clock = clock
+        self.conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._since_checkpoint: dict[str, int] = {}
+        self.replayed = 0
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- checkpoints ------------------------------------------------------
+
+    def checkpoint(self, mirror: BoardMirror, board_id: str, *, at: float | None = None) -> None:
+        """Store ``mirror``'s current rows of ``board_id``.
+
+        The checkpoint is placed at the board's cursor action. Boards without
+        a cursor (a snapshot loaded without one) use ``at`` or the current time.
+        """
+        row = mirror.conn.execute(
+            "SELECT last_action_id, last_action_date FROM boards WHERE id = ?", (board_id,)
+        ).fetchone()
+        if row is None:
+            return
+        action_id = row[0] or ""
+        time_ms = _date_ms(row[1]) if row[0] else None
+        if time_ms is None:
+            time_ms = int((self._clock() if at is None else at) * 1000)
+        state = zlib.compress(json.dumps(mirror.export_board(board_id), separators=(",", ":")).encode())
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checkpoints (board_id, time_ms, action_id, state) VALUES (?, ?, ?, ?)",
+            (board_id, time_ms, action_id, state),
+        )
+        self._since_checkpoint[board_id] = 0
+
+    def checkpoints(self, board_id: str) -> list[tuple[float, str]]:
+        """``(time, action_id)`` of the stored checkpoints of a board, oldest first."""
+        rows = self.conn.execute(
+            "SELECT time_ms, action_id FROM checkpoints WHERE board_id = ? ORDER BY time_ms, action_id", (board_id,)
+        )
+        return [(time_ms / 1000, action_id) for time_ms, action_id in rows]
+
+    def attach(self, mirror: BoardMirror) -> Callable[[], None]:
+        """Checkpoint ``mirror``'s boards now, on every snapshot and every ``every`` actions.
+
+        Returns the detach function.
+        """
+        for board_id in mirror.board_ids():
+            if mirror.cursor(board_id) is not None:
+                self.checkpoint(mirror, board_id)
+
+        def on_change(change: MirrorChange) -> None:
+            if change.snapshot:
+                for board_id in change.board_ids:
+                    self.checkpoint(mirror, board_id)
+                return
+            counts: dict[str, int] = {}
+            for action in change.actions:
+                board_id = ((action.get("data") or {}).get("board") or {}).get("id")
+                if board_id:
+                    counts[board_id] = counts.get(board_id, 0) + 1
+            for board_id, count in counts.items():
+                total = self._since_checkpoint.get(board_id, 0) + count
+                self._since_checkpoint[board_id] = total
+                if total >= self.every:
+                    self.checkpoint(mirror, board_id)
+
+        return mirror.subscribe(on_change)
+
+    def build_checkpoints(self, board_id: str) -> int:
+        """Replay the log after the newest checkpoint, checkpointing every ``every`` actions.
+
+        Without any checkpoint the replay starts from an empty board, which is
+        only complete when the log holds the board's whole history.
+
+        Returns:
+            Number of checkpoints written.
+        """
+        mirror, since = self._restore(board_id, None)
+        written = 0
+        chunk = []
+        for action in self.log.actions(board_id=board_id, since=since):
+            chunk.append(action)
+            if len(chunk) == self.every:
+                apply_actions(mirror, chunk)
+                self.checkpoint(mirror, board_id)
+                written += 1
+                chunk = []
+        mirror.close()
+        return written
+
+    # -- replay -----------------------------------------------------------
+
+    def _restore(self, board_id: str, until_ms: int | None) -> tuple[BoardMirror, float | None]:
+        sql = "SELECT time_ms, state FROM checkpoints WHERE board_id = ?"
+        params: list[object] = [board_id]
+        if until_ms is not None:
+            sql += " AND time_ms <= ?"
+            params.append(until_ms)
+        row = self.conn.execute(sql + " ORDER BY time_ms DESC, action_id DESC LIMIT 1", params).fetchone()
+        mirror = BoardMirror()
+        if row is None:
+            return mirror, None
+        mirror.import_board(json.loads(zlib.decompress(row[1])))
+        return mirror, row[0] / 1000
+
+    def board_at(self, board_id: str, when: float) -> BoardMirror:
+        """In-memory mirror holding ``board_id`` as it was at Unix time ``when``.
+
+        Actions logged after the checkpoint are replayed; those already
+        reflected in it are skipped through the restored board cursor. The
+        caller owns the returned mirror.
+        """
+        until_ms = int(when * 1000)
+        mirror, since = self._restore(board_id, until_ms)
+        # ``until`` is exclusive in the log; include actions at exactly ``when``.
+        actions = list(self.log.actions(board_id=board_id, since=since, until=(until_ms + 1) / 1000))
+        if actions:
+            apply_actions(mirror, actions)
+        self.replayed += len(actions)
+        return mirror
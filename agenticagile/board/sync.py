@@ -0,0 +1,147 @@
+"""Incremental synchronisation of the board mirror from Trello.
+
+The first sync of a board downloads one full snapshot. Every later sync only
+fetches the board's ``actions`` feed since the last action already applied,
+so a quiet board costs one batched sub-request instead of a full download.
+Action feeds for up to ten boards share a single ``/batch`` round trip.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from agenticagile.board.actions import apply_actions
+from agenticagile.board.mirror import BoardMirror, MirrorChange
+from agenticagile.errors import TrelloError
+from agenticagile.ratelimit import Priority, request_priority
+from agenticagile.trello.client import BOARD_SNAPSHOT_PARAMS, TrelloClient, build_path
+
+logger = logging.getLogger(__name__)
+
+#: Page size used for action feeds; Trello caps ``limit`` at 1000.
+ACTIONS_PAGE = 1000
+
+
+@dataclass
+class SyncReport:
+    """What one :meth:`MirrorSync.sync` pass did."""
+
+    snapshots: list[str] = field(default_factory=list)
+    actions_applied: int = 0
+    cards_refetched: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+class MirrorSync:
+    """Keep a :class:`BoardMirror` current for a fixed set of boards.
+
+    Args:
+        client: Trello client used for snapshots and action feeds.
+        mirror: Mirror to write into.
+        board_ids: Boards managed by this instance.
+    """
+
+    def __init__(self, client: TrelloClient, mirror: BoardMirror, board_ids: Iterable[str]) -> None:
+        self.client = client
+        self.mirror = mirror
+        self.board_ids = list(board_ids)
+
+    async def sync(self, board_ids: Sequence[str] | None = None) -> SyncReport:
+        """Bring the given boards (default: all managed boards) up to date.
+
+        Sync traffic runs at :attr:`Priority.BACKGROUND` so it yields to
+        interactive calls sharing the same rate limiter.
+        """
+        board_ids = list(board_ids if board_ids is not None else self.board_ids)
+        report = SyncReport()
+        fresh = [b for b in board_ids if self.mirror.cursor(b) is None]
+        known = [b for b in board_ids if b not in fresh]
+        with request_priority(Priority.BACKGROUND):
+            if fresh:
+                await self._snapshot(fresh, report)
+            if known:
+                await self._apply_feeds(known, report)
+        return report
+
+    async def _snapshot(self, board_ids: list[str], report: SyncReport) -> None:
+        # Read the cursor before the snapshot: actions racing with the
+        # download are then replayed on the next sync, which is idempotent.
+        heads = await self.client.get_many(
+            (build_path(f"/boards/{b}/actions", {"limit": 1, "filter": "all"}) for b in board_ids),
+            raise_errors=False,
+        )
+        snapshots = await self.client.get_many(
+            (build_path(f"/boards/{b}", BOARD_SNAPSHOT_PARAMS) for b in board_ids), raise_errors=False
+        )
+        for board_id, head, snapshot in zip(board_ids, heads, snapshots):
+            if isinstance(snapshot, TrelloError) or isinstance(head, TrelloError):
+                report.failed[board_id] = str(snapshot if isinstance(snapshot, TrelloError) else head)
+                continue
+            newest = head[0] if head else None
+            self.mirror.load_snapshot(
+                snapshot, cursor=(newest["id"], newest.get("date")) if newest else ("", None)
+            )
+            report.snapshots.append(board_id)
+
+    async def _apply_feeds(self, board_ids: list[str], report: SyncReport) -> None:
+        cursors = {b: self.mirror.cursor(b) or "" for b in board_ids}
+        pages = await self.client.get_many(
+            (build_path(f"/boards/{b}/actions", _feed_params(cursors[b])) for b in board_ids),
+            raise_errors=False,
+        )
+        actions: list[dict[str, Any]] = []
+        for board_id, page in zip(board_ids, pages):
+            if isinstance(page, TrelloError):
+                report.failed[board_id] = str(page)
+                continue
+            actions.extend(page)
+            if len(page) >= ACTIONS_PAGE:
+                actions.extend(await self._older_pages(board_id, cursors[board_id], page[-1]["id"]))
+        if not actions:
+            return
+        stale = apply_actions(self.mirror, actions)
+        report.actions_applied += len(actions)
+        if stale:
+            report.cards_refetched += await self.refetch_cards(stale)
+
+    async def _older_pages(self, board_id: str, since: str, before: str) -> list[dict[str, Any]]:
+        """Walk back through a backlog larger than one page."""
+        collected: list[dict[str, Any]] = []
+        while True:
+            page = await self.client.get_board_actions(
+                board_id, since=since or None, before=before, limit=ACTIONS_PAGE
+            )
+            collected.extend(page)
+            if len(page) < ACTIONS_PAGE:
+                return collected
+            before = page[-1]["id"]
+
+    async def refetch_cards(self, card_ids: Iterable[str]) -> int:
+        """Reload full card payloads for ``card_ids`` in batched requests."""
+        card_ids = sorted(card_ids)
+        cards = await self.client.get_many((f"/cards/{card_id}" for card_id in card_ids), raise_errors=False)
+        refreshed = 0
+        change = MirrorChange(card_ids=set(card_ids))
+        with self.mirror.transaction():
+            for card_id, card in zip(card_ids, cards):
+                if isinstance(card, TrelloError):
+                    if card.status == 404:
+                        self.mirror.delete_card(card_id)
+                    else:
+                        logger.warning("could not refetch card %s: %s", card_id, card)
+                    continue
+                self.mirror.upsert_card(card)
+                change.board_ids.add(card["idBoard"])
+                refreshed += 1
+        self.mirror.notify(change)
+        return refreshed
+
+
+def _feed_params(since: str) -> dict[str, Any]:
+    params: dict[str, Any] = {"limit": ACTIONS_PAGE, "filter": "all"}
+    if since:
+        params["since"] = since
+    return params
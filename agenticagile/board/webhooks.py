@@ -0,0 +1,211 @@
+"""Webhook-driven Trello change feed for the board mirror.
+
+Each managed board gets a Trello webhook pointing at AgenticAgile. Incoming
+action payloads are applied straight to the :class:`BoardMirror`, so Slack
+answers see a change within moments instead of after the next poll.
+
+Polling through :class:`~agenticagile.board.sync.MirrorSync` remains only as
+gap repair. A board is re-polled from its last *confirmed* cursor (the last
+point known to be contiguous with Trello's feed) when:
+
+* the feed starts, since deliveries may have been missed while it was down,
+* an action arrives older than one already applied (a late redelivery), or
+* no webhook arrived for ``reconcile_interval`` seconds, as a cheap safety net
+  against deactivated webhooks. All quiet boards share batched calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import time
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+from agenticagile.board.actions import apply_actions
+from agenticagile.board.mirror import BoardMirror
+from agenticagile.board.sync import MirrorSync
+from agenticagile.errors import APIError, TrelloError
+from agenticagile.trello.client import TrelloClient
+
+logger = logging.getLogger(__name__)
+
+
+def verify_trello_signature(secret: str, body: bytes, callback_url: str, signature: str) -> bool:
+    """Check the ``X-Trello-Webhook`` header (base64 HMAC-SHA1 of body + url)."""
+    digest = hmac.new(secret.encode(), body + callback_url.encode(), hashlib.sha1).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode(), signature or "")
+
+
+async def ensure_webhooks(
+    client: TrelloClient,
+    board_ids: Iterable[str],
+    callback_url: str,
+    *,
+    description: str = "AgenticAgile board feed",
+) -> list[str]:
+    """Register ``callback_url`` for every board that lacks an active webhook.
+
+    Returns the ids of boards a webhook was created for.
+    """
+    existing = {
+        hook["idModel"]
+        for hook in await client.list_webhooks()
+        if hook.get("callbackURL") == callback_url and hook.get("active", True)
+    }
+    missing = [board_id for board_id in board_ids if board_id not in existing]
+    created: list[str] = []
+    for board_id, result in zip(
+        missing,
+        await asyncio.gather(
+            *(client.create_webhook(b, callback_url, description) for b in missing), return_exceptions=True
+        ),
+    ):
+        if isinstance(result, TrelloError):
+            logger.error("could not register webhook for board %s: %s", board_id, result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            created.append(board_id)
+    return created
+
+
+class TrelloChangeFeed:
+    """Apply webhook deliveries to the mirror and repair gaps by polling.
+
+    Args:
+        mirror: Mirror to keep current.
+        sync: Poller used for the initial catch-up and for gap repair.
+        secret: Trello app secret used to sign webhook deliveries; ``None``
+            skips verification (local stubs only).
+        callback_url: Public url registered with Trello; part of the signature.
+        reconcile_interval: Seconds of webhook silence after which a board is
+            re-polled.
+    """
+
+    def __init__(
+        self,
+        mirror: BoardMirror,
+        sync: MirrorSync,
+        *,
+        secret: str | None,
+        callback_url: str,
+        reconcile_interval: float = 900.0,
+    ) -> None:
+        self.mirror = mirror
+        self.sync = sync
+        self.secret = secret
+        self.callback_url = callback_url
+        self.reconcile_interval = reconcile_interval
+        self.confirmed: dict[str, str] = {}
+        self.last_delivery: dict[str, float] = {}
+        self.gaps: set[str] = set()
+        self.applied = 0
+        self._repair = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    @property
+    def board_ids(self) -> list[str]:
+        return self.sync.board_ids
+
+    async def catch_up(self, board_ids: Iterable[str] | None = None) -> None:
+        """Poll ``board_ids`` (default: every board with a gap) from their confirmed cursor."""
+        boards = sorted(set(board_ids) if board_ids is not None else self.gaps)
+        if not boards:
+            return
+        async with self._lock:
+            for board_id in boards:
+                confirmed = self.confirmed.get(board_id)
+                if confirmed is not None and confirmed != self.mirror.cursor(board_id):
+                    # Rewind so everything after the last contiguous point is
+                    # replayed in order; applying actions is idempotent.
+                    self.mirror.set_cursor(board_id, confirmed, None)
+            report = await self.sync.sync(boards)
+            now = time.monotonic()
+            for board_id in boards:
+                if board_id in report.failed:
+                    continue
+                self.gaps.discard(board_id)
+                self.confirmed[board_id] = self.mirror.cursor(board_id) or ""
+                self.last_delivery[board_id] = now
+
+    def mark_gap(self, board_id: str) -> None:
+        self.gaps.add(board_id)
+        self._repair.set()
+
+    async def handle(self, payload: Mapping[str, Any]) -> None:
+        """Apply one webhook delivery (``{"action": ..., "model": ...}``)."""
+        action = payload.get("action") or {}
+        board_id = ((action.get("data") or {}).get("board") or {}).get("id") or (payload.get("model") or {}).get("id")
+        if not action.get("id") or board_id not in self.board_ids:
+            return
+        self.last_delivery[board_id] = time.monotonic()
+        if board_id in self.gaps:
+            return  # the pending repair poll will pick this action up
+        cursor = self.mirror.cursor(board_id)
+        if cursor is None or action["id"] < cursor:
+            self.mark_gap(board_id)
+            return
+        async with self._lock:
+            stale = apply_actions(self.mirror, [action])
+        self.applied += 1
+        if stale:
+            await self.sync.refetch_cards(stale)
+
+    async def run(self) -> None:
+        """Catch up once, then repair gaps and reconcile quiet boards forever.
+
+        A failed poll (rate limit, network error) leaves the boards marked as
+        gaps, so the next round retries them.
+        """
+        # Every board starts as a gap: deliveries may have been missed while down.
+        self.gaps.update(self.board_ids)
+        while True:
+            try:
+                await self.catch_up()
+            except (APIError, aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                logger.warning("gap repair failed: %s", exc)
+            try:
+                await asyncio.wait_for(self._repair.wait(), timeout=self.reconcile_interval / 4)
+            except asyncio.TimeoutError:
+                pass
+            self._repair.clear()
+            now = time.monotonic()
+            for board_id in self.board_ids:
+                if now - self.last_delivery.get(board_id, 0.0) >= self.reconcile_interval:
+                    self.gaps.add(board_id)
+
+
+def make_webhook_app(feed: TrelloChangeFeed, *, path: str = "/trello/webhook") -> web.Application:
+    """aiohttp app receiving Trello webhook deliveries at ``path``.
+
+    Trello probes the url with ``HEAD`` when a webhook is created; deliveries
+    are acked with ``200`` right after they are applied.
+    """
+
+    async def probe(request: web.Request) -> web.Response:
+        return web.Response(status=200)
+
+    async def deliver(request: web.Request) -> web.Response:
+        body = await request.read()
+        if feed.secret is not None and not verify_trello_signature(
+            feed.secret, body, feed.callback_url, request.headers.get("X-Trello-Webhook", "")
+        ):
+            return web.Response(status=401)
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        await feed.handle(payload)
+        return web.Response(status=200)
+
+    app = web.Application()
+    app.router.add_route("HEAD", path, probe)
+    app.router.add_post(path, deliver)
+    return app
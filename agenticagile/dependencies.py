@@ -0,0 +1,472 @@
+"""Cross-board card dependency graph, kept current from the mirror.
+
+Teams record dependencies in several ways, and all of them become edges
+"card A is blocked by card B":
+
+* a line in a card's description or in a comment saying ``blocked by``,
+  ``depends on`` or ``waiting on/for`` followed by card links or quoted card
+  names (``blocks`` states the reverse edge),
+* a checklist item that links a card (Trello's "attach card" to a checklist):
+  the card with the checklist waits for the linked card until the item is
+  checked,
+* a label named ``blocked by <card link or name>``.
+
+Card links (``https://trello.com/c/<short link or id>``) resolve through the
+mirror; names resolve to every card with that name, ignoring a leading
+``(n)`` estimate, on any managed board. References that match no card are
+kept as external blockers ("blocked by: legal review").
+
+:class:`DependencyGraph` subscribes to the :class:`BoardMirror` and re-parses
+only the cards an applied change touched, so "what blocks release 2.4" and
+critical-path questions are answered from memory in milliseconds instead of
+from an LLM pass over board dumps. Blockers that are archived or sit in a
+done list (see :class:`~agenticagile.metrics.engine.Workflow`) no longer
+block.
+
+Usage::
+
+    graph = DependencyGraph(mirror)
+    graph.refresh_all()
+    for card_id in graph.find("Release 2.4"):
+        for step in graph.chain(card_id):
+            print("  " * step.depth, step.name)
+        path = graph.critical_path(card_id)
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from agenticagile.board.mirror import BoardMirror, Card, MirrorChange
+from agenticagile.metrics.engine import DONE, Workflow
+from agenticagile.metrics.history import POINTS_PATTERN, card_points
+
+logger = logging.getLogger(__name__)
+
+_LINK = re.compile(r"https?://trello\.com/c/([A-Za-z0-9]+)")
+_PHRASE = re.compile(r"\b(blocked by|depends on|waiting (?:on|for)|blocks)\b:?", re.IGNORECASE)
+_QUOTED = re.compile(r"[\"“]([^\"”]+)[\"”]")
+_LABEL = re.compile(r"^\s*blocked by\b:?\s*(.+)$", re.IGNORECASE)
+
+#: Actions after which the label names of a whole board are parsed again.
+_LABEL_ACTIONS = frozenset({"createLabel", "updateLabel", "deleteLabel"})
+#: Actions after which a board's list names (done or not) are read again.
+_LIST_ACTIONS = frozenset({"createList", "updateList", "moveListToBoard", "moveListFromBoard"})
+
+
+def _name_key(name: str) -> str:
+    return "name:" + " ".join(POINTS_PATTERN.sub("", name).split()).casefold()
+
+
+def _link_key(ref: str) -> str:
+    return "link:" + ref
+
+
+def _refs(text: str) -> list[str]:
+    """Link and quoted-name references in ``text``."""
+    refs = [_link_key(ref) for ref in _LINK.findall(text)]
+    refs += [_name_key(name) for name in _QUOTED.findall(text)]
+    return refs
+
+
+def parse_text(text: str) -> tuple[set[str], set[str]]:
+    """References ``text`` says its card is blocked by, and ones it blocks."""
+    blocked_by: set[str] = set()
+    blocks: set[str] = set()
+    for line in text.splitlines():
+        phrases = list(_PHRASE.finditer(line))
+        for index, phrase in enumerate(phrases):
+            end = phrases[index + 1].start() if index + 1 < len(phrases) else len(line)
+            refs = _refs(line[phrase.end() : end])
+            (blocks if phrase.group(1).lower() == "blocks" else blocked_by).update(refs)
+    return blocked_by, blocks
+
+
+@dataclass
+class Node:
+    """What the graph needs to know about one card."""
+
+    id: str
+    board_id: str
+    list_id: str | None
+    name: str
+    closed: bool
+    short_link: str | None = None
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        keys = [_link_key(self.id), _name_key(self.name)]
+        if self.short_link:
+            keys.append(_link_key(self.short_link))
+        return tuple(keys)
+
+
+@dataclass
+class Edges:
+    """Dependencies one card states, as unresolved references."""
+
+    blocked_by: set[str] = field(default_factory=set)
+    blocks: set[str] = field(default_factory=set)
+    sources: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Dependency:
+    """One step of a blocked chain.
+
+    ``card_id`` is ``None`` for an external blocker that matches no card;
+    ``blocks`` is the card this one holds up and ``depth`` its distance from
+    the card asked about (1 for direct blockers).
+    """
+
+    card_id: str | None
+    name: str
+    board_id: str | None
+    blocks: str
+    depth: int
+    source: str
+    open: bool
+
+
+class DependencyGraph:
+    """Incrementally maintained "blocked by" graph over all mirrored boards.
+
+    Args:
+        mirror: Source of cards; the graph subscribes to its changes.
+        workflow: Decides which lists count as done.
+        comments_per_card: Latest comments of each card that are parsed.
+    """
+
+    def __init__(
+        self,
+        mirror: BoardMirror,
+        *,
+        workflow: Workflow | None = None,
+        comments_per_card: int = 50,
+    ) -> None:
+        self.mirror = mirror
+        self.workflow = workflow or Workflow()
+        self.comments_per_card = comments_per_card
+        self._nodes: dict[str, Node] = {}
+        self._edges: dict[str, Edges] = {}
+        self._by_key: dict[str, set[str]] = {}
+        self._blocked_by_index: dict[str, set[str]] = {}
+        self._blocks_index: dict[str, set[str]] = {}
+        self._done_lists: dict[str, set[str]] = {}
+        self._unsubscribe = mirror.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    # -- maintenance ------------------------------------------------------
+
+    def _on_change(self, change: MirrorChange) -> None:
+        kinds = {action.get("type") for action in change.actions}
+        for board_id in change.board_ids:
+            if change.snapshot or kinds & _LABEL_ACTIONS:
+                self.refresh_board(board_id)
+            elif kinds & _LIST_ACTIONS:
+                self._read_lists(board_id)
+        if change.card_ids and not change.snapshot:
+            self.refresh(change.card_ids)
+
+    def refresh_all(self) -> int:
+        """Parse every card of every mirrored board; returns the cards read."""
+        return sum(self.refresh_board(board_id) for board_id in self.mirror.board_ids())
+
+    def refresh_board(self, board_id: str) -> int:
+        """Parse every card of one board again, dropping cards no longer on it."""
+        self._read_lists(board_id)
+        cards = self.mirror.cards(board_id=board_id, include_closed=True)
+        current = {card.id for card in cards}
+        for card_id in [c for c, node in self._nodes.items() if node.board_id == board_id and c not in current]:
+            self._drop(card_id)
+        labels = {label["id"]: label["name"] for label in self.mirror.labels(board_id)}
+        links = self.mirror.short_links(board_id)
+        comments = self.mirror.board_comments(board_id, per_card=self.comments_per_card)
+        checklists = self.mirror.board_checklists(board_id)
+        for card in cards:
+            self._store(card, links.get(card.id), labels, comments.get(card.id, ()), checklists.get(card.id, ()))
+        return len(cards)
+
+    def refresh(self, card_ids: Iterable[str]) -> int:
+        """Parse specific cards again (dropping those no longer mirrored)."""
+        count = 0
+        labels: dict[str, dict[str, str]] = {}
+        links: dict[str, dict[str, str]] = {}
+        for card_id in set(card_ids):
+            card = self.mirror.card(card_id)
+            if card is None:
+                self._drop(card_id)
+                continue
+            if card.board_id not in labels:
+                labels[card.board_id] = {label["id"]: label["name"] for label in self.mirror.labels(card.board_id)}
+                links[card.board_id] = self.mirror.short_links(card.board_id)
+                if card.board_id not in self._done_lists:
+                    self._read_lists(card.board_id)
+            self._store(
+                card,
+                links[card.board_id].get(card.id),
+                labels[card.board_id],
+                self.mirror.comments(card.id, limit=self.comments_per_card),
+                self.mirror.checklists(card.id),
+            )
+            count += 1
+        return count
+
+    def _read_lists(self, board_id: str) -> None:
+        self._done_lists[board_id] = {
+            lst["id"]
+            for lst in self.mirror.lists(board_id, include_closed=True)
+            if self.workflow.category(lst["name"]) == DONE
+        }
+
+    def _store(
+        self,
+        card: Card,
+        short_link: str | None,
+        labels: dict[str, str],
+        comments: Iterable[dict[str, Any]],
+        checklists: Iterable[dict[str, Any]],
+    ) -> None:
+        edges = Edges()
+
+        def add(refs: Iterable[str], source: str, *, reverse: bool = False) -> None:
+            for ref in refs:
+                (edges.blocks if reverse else edges.blocked_by).add(ref)
+                edges.sources.setdefault(ref, source)
+
+        for text, source in [(card.desc, "description"), *((c.get("text") or "", "comment") for c in comments)]:
+            blocked_by, blocks = parse_text(text)
+            add(blocked_by, source)
+            add(blocks, source, reverse=True)
+        for checklist in checklists:
+            for item in checklist.get("items", ()):
+                if not item.get("complete"):
+                    add((_link_key(ref) for ref in _LINK.findall(item.get("name") or "")), "checklist")
+        for label_id in card.label_ids:
+            found = _LABEL.match(labels.get(label_id, ""))
+            if found:
+                target = found.group(1).strip()
+                links = _LINK.findall(target)
+                add([_link_key(ref) for ref in links] if links else [_name_key(target.strip("\"“”"))], "label")
+        edges.blocked_by.discard(_link_key(card.id))
+        self._drop(card.id)
+        node = Node(card.id, card.board_id, card.list_id, card.name, card.closed, short_link)
+        self._nodes[card.id] = node
+        for key in node.keys:
+            self._by_key.setdefault(key, set()).add(card.id)
+        self._edges[card.id] = edges
+        for ref in edges.blocked_by:
+            self._blocked_by_index.setdefault(ref, set()).add(card.id)
+        for ref in edges.blocks:
+            self._blocks_index.setdefault(ref, set()).add(card.id)
+
+    def _drop(self, card_id: str) -> None:
+        node = self._nodes.pop(card_id, None)
+        if node is not None:
+            for key in node.keys:
+                _discard(self._by_key, key, card_id)
+        edges = self._edges.pop(card_id, None)
+        if edges is not None:
+            for ref in edges.blocked_by:
+                _discard(self._blocked_by_index, ref, card_id)
+            for ref in edges.blocks:
+                _discard(self._blocks_index, ref, card_id)
+
+    # -- queries ----------------------------------------------------------
+
+    def is_open(self, card_id: str) -> bool:
+        """Whether a card still blocks: not archived and not in a done list."""
+        node = self._nodes.get(card_id)
+        if node is None:
+            return False
+        return not node.closed and node.list_id not in self._done_lists.get(node.board_id, ())
+
+    def find(self, ref: str) -> list[str]:
+        """Card ids ``ref`` names: a card link or id, an exact name, else a name fragment."""
+        ref = ref.strip().strip("\"“”")
+        links = _LINK.findall(ref)
+        found = self._by_key.get(_link_key(links[0] if links else ref)) or self._by_key.get(_name_key(ref))
+        if found:
+            return sorted(found)
+        wanted = _name_key(ref)[len("name:") :]
+        return sorted(card_id for card_id, node in self._nodes.items() if wanted in node.name.casefold())
+
+    def _resolve(self, ref: str) -> set[str]:
+        return self._by_key.get(ref, set())
+
+    def blockers(self, card_id: str) -> Iterator[tuple[str | None, str, str]]:
+        """Direct blockers of a card as ``(card_id or None, name, source)``."""
+        edges = self._edges.get(card_id)
+        if edges is not None:
+            for ref in edges.blocked_by:
+                targets = self._resolve(ref) - {card_id}
+                if targets:
+                    for target in targets:
+                        yield target, self._nodes[target].name, edges.sources[ref]
+                elif ref.startswith("name:"):
+                    yield None, ref[len("name:") :], edges.sources[ref]
+        node = self._nodes.get(card_id)
+        for key in node.keys if node is not None else ():
+            for owner in self._blocks_index.get(key, ()):
+                if owner != card_id:
+                    yield owner, self._nodes[owner].name, self._edges[owner].sources[key]
+
+    def dependents(self, card_id: str) -> set[str]:
+        """Cards directly blocked by ``card_id``."""
+        found: set[str] = set()
+        edges = self._edges.get(card_id)
+        if edges is not None:
+            for ref in edges.blocks:
+                found |= self._resolve(ref)
+        node = self._nodes.get(card_id)
+        for key in node.keys if node is not None else ():
+            found |= self._blocked_by_index.get(key, set())
+        found.discard(card_id)
+        return found
+
+    def chain(self, card_id: str, *, open_only: bool = True, max_depth: int | None = None) -> list[Dependency]:
+        """Everything transitively blocking ``card_id``, nearest first.
+
+        With ``open_only`` the walk stops at blockers that are done, since
+        whatever held those up no longer matters.
+        """
+        steps: list[Dependency] = []
+        seen = {card_id}
+        frontier = [card_id]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            following: list[str] = []
+            for current in frontier:
+                for blocker, name, source in sorted(self.blockers(current), key=lambda b: (b[1], b[0] or "")):
+                    if blocker is None:
+                        steps.append(Dependency(None, name, None, current, depth, source, True))
+                        continue
+                    if blocker in seen:
+                        continue
+                    open_ = self.is_open(blocker)
+                    if open_only and not open_:
+                        continue
+                    seen.add(blocker)
+                    node = self._nodes[blocker]
+                    steps.append(Dependency(blocker, name, node.board_id, current, depth, source, open_))
+                    following.append(blocker)
+            frontier = following
+        return steps
+
+    def critical_path(self, card_id: str) -> list[str]:
+        """Longest chain of open blockers ending at ``card_id``, by story points.
+
+        Returns card ids in the order they have to be finished, ``card_id``
+        last. Cycles are broken where the walk first meets them.
+        """
+        best: dict[str, tuple[float, list[str]]] = {}
+        on_path: set[str] = set()
+
+        def walk(current: str) -> tuple[float, list[str]]:
+            if current in best:
+                return best[current]
+            on_path.add(current)
+            longest: tuple[float, list[str]] = (0.0, [])
+            for blocker, _, _ in self.blockers(current):
+                if blocker is None or blocker in on_path or not self.is_open(blocker):
+                    continue
+                candidate = walk(blocker)
+                if candidate[0] > longest[0]:
+                    longest = candidate
+            on_path.discard(current)
+            node = self._nodes.get(current)
+            points = card_points(node.name) if node is not None else 0.0
+            best[current] = (longest[0] + points, [*longest[1], current])
+            return best[current]
+
+        return walk(card_id)[1]
+
+    def cycles(self) -> list[list[str]]:
+        """Groups of open cards that block each other in a loop."""
+        index: dict[str, int] = {}
+        low: dict[str, int] = {}
+        stack: list[str] = []
+        on_stack: set[str] = set()
+        groups: list[list[str]] = []
+        counter = 0
+        for root in sorted(self._nodes):
+            if root in index or not self.is_open(root):
+                continue
+            # Iterative Tarjan: (node, iterator over its open blockers).
+            work = [(root, iter(self._open_blockers(root)))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                current, blockers = work[-1]
+                advanced = False
+                for blocker in blockers:
+                    if blocker not in index:
+                        index[blocker] = low[blocker] = counter
+                        counter += 1
+                        stack.append(blocker)
+                        on_stack.add(blocker)
+                        work.append((blocker, iter(self._open_blockers(blocker))))
+                        advanced = True
+                        break
+                    if blocker in on_stack:
+                        low[current] = min(low[current], index[blocker])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[current])
+                if low[current] == index[current]:
+                    group = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        group.append(member)
+                        if member == current:
+                            break
+                    if len(group) > 1:
+                        groups.append(sorted(group))
+        return groups
+
+    def _open_blockers(self, card_id: str) -> list[str]:
+        return sorted({b for b, _, _ in self.blockers(card_id) if b is not None and self.is_open(b)})
+
+    def explain(self, ref: str, *, max_depth: int = 5) -> str:
+        """Plain-text answer to "what blocks ``ref``", for Slack or a prompt."""
+        card_ids = self.find(ref)
+        if not card_ids:
+            return f"No card matches {ref!r}."
+        lines: list[str] = []
+        for card_id in card_ids[:3]:
+            node = self._nodes[card_id]
+            steps = self.chain(card_id, max_depth=max_depth)
+            if not steps:
+                lines.append(f"{node.name}: nothing open blocks it.")
+                continue
+            lines.append(f"{node.name} is blocked by:")
+            for step in steps:
+                where = "external" if step.card_id is None else step.source
+                lines.append(f"{'  ' * step.depth}• {step.name} ({where})")
+            path = self.critical_path(card_id)
+            if len(path) > 1:
+                lines.append("Critical path: " + " → ".join(self._nodes[c].name for c in path))
+        return "\n".join(lines)
+
+
+def _discard(index: dict[str, set[str]], key: str, value: str) -> None:
+    members = index.get(key)
+    if members is not None:
+        members.discard(value)
+        if not members:
+            del index[key]
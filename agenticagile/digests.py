@@ -0,0 +1,422 @@
+"""Scheduled Slack digests: daily standups, sprint summaries and stale-card nudges.
+
+Subscriptions fire on cron expressions in their own time zone. Everything due
+in the same minute is handled as one run:
+
+* the boards of all due digests are synced once (optional) and each board is
+  read from the mirror into one :class:`BoardDigest` shared by every digest
+  that needs it,
+* digests for the same workspace and channel are merged into one message,
+* the resulting posts are spread evenly over ``spread`` seconds, in
+  round-robin order across workspaces, at background priority.
+
+Posts carry Block Kit blocks next to the plain text. Card lines come from one
+:class:`~agenticagile.slack.blocks.BlockRenderer` shared across runs, so a
+card is rendered again only after it changed since the previous digest.
+
+With 60 channels on a 9:00 digest this makes at most one sync pass and a
+steady trickle of ``chat.postMessage`` calls, not 60 of each at 9:00:00.
+
+Usage::
+
+    scheduler = DigestScheduler(mirror, {"T123": slack}, sync=mirror_sync)
+    scheduler.add(Subscription("standup", "T123", "C42", ["board1"], "0 9 * * 1-5", tz="Europe/Madrid"))
+    await scheduler.run()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import aiohttp
+
+from agenticagile.board.mirror import BoardMirror, Card
+from agenticagile.board.sync import MirrorSync
+from agenticagile.errors import AgenticAgileError
+from agenticagile.llm.context import parse_date
+from agenticagile.ratelimit import Priority, request_priority
+from agenticagile.slack.blocks import DIVIDER, SECTION, Block, BlockRenderer, card_names, escape, fit
+from agenticagile.slack.client import SlackClient
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 6))
+
+
+@dataclass(frozen=True)
+class Cron:
+    """Five-field cron expression (``minute hour day month weekday``).
+
+    Fields accept ``*``, numbers, ranges (``1-5``), lists (``1,15``) and
+    steps (``*/15``). Weekday 0 is Sunday; 7 is accepted as Sunday too.
+    """
+
+    minute: frozenset[int]
+    hour: frozenset[int]
+    day: frozenset[int]
+    month: frozenset[int]
+    weekday: frozenset[int]
+    any_day: bool = True
+    any_weekday: bool = True
+
+    @classmethod
+    def parse(cls, expression: str) -> Cron:
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+        values = {name: _parse_field(part, low, 7 if name == "weekday" else high) for part, (name, low, high) in zip(parts, _FIELDS)}
+        values["weekday"] = frozenset(day % 7 for day in values["weekday"])
+        return cls(**values, any_day=parts[2] == "*", any_weekday=parts[4] == "*")
+
+    def matches_day(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.day
+        weekday_ok = (moment.isoweekday() % 7) in self.weekday
+        if self.any_day or self.any_weekday:
+            # At most one of the two fields is restricted, so it alone decides.
+            return day_ok and weekday_ok
+        # Classic cron: a restricted day field and weekday field are OR-ed.
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after ``moment`` (time zone aware)."""
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for offset in range(366 * 5):
+            candidate_day = day + timedelta(days=offset)
+            if candidate_day.month not in self.month or not self.matches_day(candidate_day):
+                continue
+            for hour in sorted(self.hour):
+                for minute in sorted(self.minute):
+                    candidate = candidate_day.replace(hour=hour, minute=minute)
+                    if candidate >= start:
+                        return candidate
+        raise ValueError("cron expression never matches")
+
+
+def _parse_field(text: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in text.split(","):
+        step = None
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            first, last = low, high
+        elif "-" in part:
+            first, last = (int(x) for x in part.split("-", 1))
+        else:
+            # "5/15" means every 15 starting at 5, up to the field's maximum.
+            first = int(part)
+            last = high if step is not None else first
+        step = step if step is not None else 1
+        if first < low or last > high or first > last or step < 1:
+            raise ValueError(f"invalid cron field {text!r}")
+        values.update(range(first, last + 1, step))
+    return frozenset(values)
+
+
+#: Digest kinds and the section title each contributes to a merged post.
+KINDS = {"standup": "Daily standup", "sprint_summary": "Sprint summary", "stale_nudge": "Stale cards"}
+
+
+@dataclass
+class Subscription:
+    """One recurring digest.
+
+    Args:
+        kind: One of :data:`KINDS`.
+        team_id: Slack workspace; selects the client.
+        channel: Channel to post in.
+        board_ids: Boards the digest covers.
+        cron: When to post, as a five-field cron expression in ``tz``.
+        tz: IANA time zone name.
+    """
+
+    kind: str
+    team_id: str
+    channel: str
+    board_ids: Sequence[str]
+    cron: str
+    tz: str = "UTC"
+    schedule: Cron = field(init=False)
+    next_run: float = field(init=False, default=0.0)
+
+    def __post_init__(self) -> None:
+        if self.kind not in KINDS:
+            raise ValueError(f"unknown digest kind {self.kind!r}")
+        self.schedule = Cron.parse(self.cron)
+
+    def advance(self, after: float) -> float:
+        """Set and return the next run strictly after Unix time ``after``."""
+        zone = ZoneInfo(self.tz)
+        self.next_run = self.schedule.next_after(datetime.fromtimestamp(after, zone)).timestamp()
+        return self.next_run
+
+
+@dataclass
+class BoardDigest:
+    """What digests need from one board, read from the mirror once per run."""
+
+    board_id: str
+    name: str
+    list_counts: dict[str, int]
+    blocked: list[Card]
+    stale: list[Card]
+    due_soon: list[Card]
+    moved_today: list[Card]
+    names: dict[str, str] = field(default_factory=dict)
+
+
+def read_board(mirror: BoardMirror, board_id: str, now: float, *, stale_days: float = 5.0) -> BoardDigest:
+    board = mirror.board(board_id) or {"name": board_id}
+    cards = mirror.cards(board_id=board_id)
+    stale, due_soon, moved = [], [], []
+    for card in cards:
+        activity = parse_date(card.last_activity)
+        if activity is not None and now - activity > stale_days * 86400:
+            stale.append(card)
+        due = parse_date(card.due)
+        if due is not None and not card.due_complete and now <= due <= now + 2 * 86400:
+            due_soon.append(card)
+        entered = parse_date(card.list_entered_at)
+        if entered is not None and now - entered <= 86400:
+            moved.append(card)
+    return BoardDigest(
+        board_id,
+        board["name"],
+        mirror.list_counts(board_id),
+        mirror.blocked_cards(board_id),
+        stale,
+        due_soon,
+        moved,
+        card_names(mirror, board_id),
+    )
+
+
+def _card_lines(cards: Sequence[Card], limit: int = 8) -> list[str]:
+    lines = [f"• {card.name}" for card in cards[:limit]]
+    if len(cards) > limit:
+        lines.append(f"• …and {len(cards) - limit} more")
+    return lines
+
+
+def render_section(kind: str, boards: Sequence[BoardDigest]) -> str:
+    """Text of one digest kind over ``boards``."""
+    lines = [f"*{KINDS[kind]}*"]
+    for board in boards:
+        if kind == "standup":
+            lines.append(f"_{board.name}_ — " + ", ".join(f"{name}: {count}" for name, count in board.list_counts.items()))
+            if board.moved_today:
+                lines += ["Moved in the last day:", *_card_lines(board.moved_today)]
+            if board.blocked:
+                lines += ["Blocked:", *_card_lines(board.blocked)]
+            if board.due_soon:
+                lines += ["Due within two days:", *_card_lines(board.due_soon)]
+        elif kind == "sprint_summary":
+            total = sum(board.list_counts.values())
+            lines.append(
+                f"_{board.name}_ — {total} open cards, {len(board.blocked)} blocked, {len(board.stale)} stale"
+            )
+            lines.append(", ".join(f"{name}: {count}" for name, count in board.list_counts.items()))
+        elif board.stale:
+            lines += [f"_{board.name}_ — no activity for a while:", *_card_lines(board.stale)]
+    return "\n".join(lines) if len(lines) > 1 else ""
+
+
+def render_blocks(kind: str, boards: Sequence[BoardDigest], renderer: BlockRenderer) -> list[Block]:
+    """Block Kit version of :func:`render_section`."""
+    blocks: list[Block] = []
+    for board in boards:
+        name = escape(board.name)
+        counts = ", ".join(f"{escape(lst)}: {count}" for lst, count in board.list_counts.items())
+        if kind == "standup":
+            blocks.append(SECTION.render(text=f"_{name}_ — {counts}"))
+            for title, cards in (
+                ("Moved in the last day", board.moved_today),
+                ("Blocked", board.blocked),
+                ("Due within two days", board.due_soon),
+            ):
+                if cards:
+                    blocks += renderer.card_list(cards, title=title, names=board.names, limit=8)
+        elif kind == "sprint_summary":
+            total = sum(board.list_counts.values())
+            blocks.append(
+                SECTION.render(
+                    text=f"_{name}_ — {total} open cards, {len(board.blocked)} blocked, {len(board.stale)} stale\n{counts}"
+                )
+            )
+        elif board.stale:
+            blocks += renderer.card_list(
+                board.stale, title=f"{board.name} — no activity for a while", names=board.names, limit=8
+            )
+    if not blocks:
+        return []
+    return [SECTION.render(text=f"*{KINDS[kind]}*"), *blocks]
+
+
+@dataclass
+class Post:
+    team_id: str
+    channel: str
+    text: str
+    kinds: list[str]
+    blocks: list[Block] = field(default_factory=list)
+
+
+@dataclass
+class RunReport:
+    """What one scheduler run did."""
+
+    due: int = 0
+    boards_read: int = 0
+    posts: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+    send_times: list[float] = field(default_factory=list)
+
+
+class DigestScheduler:
+    """Run :class:`Subscription`s, batching everything due at the same time.
+
+    Args:
+        mirror: Source of board data.
+        clients: Slack client per workspace (team id).
+        sync: Optional mirror sync run once per batch for the boards involved.
+        spread: Seconds over which the posts of one run are spread.
+        stale_days: Inactivity after which a card counts as stale.
+        renderer: Block renderer; its card cache is kept across runs.
+    """
+
+    def __init__(
+        self,
+        mirror: BoardMirror,
+        clients: Mapping[str, SlackClient],
+        *,
+        sync: MirrorSync | None = None,
+        spread: float = 60.0,
+        stale_days: float = 5.0,
+        renderer: BlockRenderer | None = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.mirror = mirror
+        self.clients = clients
+        self.sync = sync
+        self.spread = spread
+        self.stale_days = stale_days
+        self.renderer = renderer or BlockRenderer()
+        self._clock = clock
+        self._sleep = sleep
+        self.subscriptions: list[Subscription] = []
+
+    def add(self, subscription: Subscription) -> Subscription:
+        subscription.advance(self._clock())
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def due(self, now: float) -> list[Subscription]:
+        return [s for s in self.subscriptions if s.next_run <= now]
+
+    def plan(self, due: Iterable[Subscription], now: float) -> tuple[list[Post], int]:
+        """Merge due digests into one post per workspace/channel.
+
+        Returns the posts in send order and the number of boards read.
+        """
+        due = list(due)
+        boards: dict[str, BoardDigest] = {}
+        for board_id in dict.fromkeys(b for s in due for b in s.board_ids):
+            boards[board_id] = read_board(self.mirror, board_id, now, stale_days=self.stale_days)
+        grouped: dict[tuple[str, str], list[Subscription]] = {}
+        for subscription in due:
+            grouped.setdefault((subscription.team_id, subscription.channel), []).append(subscription)
+        by_team: dict[str, list[Post]] = {}
+        for (team_id, channel), subscriptions in grouped.items():
+            sections = []
+            blocks: list[Block] = []
+            kinds = []
+            for kind in KINDS:
+                board_ids = list(dict.fromkeys(b for s in subscriptions if s.kind == kind for b in s.board_ids))
+                if not board_ids:
+                    continue
+                kinds.append(kind)
+                digests = [boards[b] for b in board_ids]
+                section = render_section(kind, digests)
+                if section:
+                    sections.append(section)
+                    if blocks:
+                        blocks.append(DIVIDER.render())
+                    blocks += render_blocks(kind, digests, self.renderer)
+            if sections:
+                post = Post(team_id, channel, "\n\n".join(sections), kinds, fit(blocks))
+                by_team.setdefault(team_id, []).append(post)
+        # Interleave workspaces so no single workspace gets a burst.
+        posts: list[Post] = []
+        queues = list(by_team.values())
+        while queues:
+            posts += [queue.pop(0) for queue in queues]
+            queues = [queue for queue in queues if queue]
+        return posts, len(boards)
+
+    async def run_due(self) -> RunReport:
+        """Handle every subscription due now and schedule their next runs."""
+        now = self._clock()
+        due = self.due(now)
+        report = RunReport(due=len(due))
+        if not due:
+            return report
+        for subscription in due:
+            subscription.advance(now)
+        with request_priority(Priority.BACKGROUND):
+            if self.sync is not None:
+                try:
+                    await self.sync.sync(sorted({b for s in due for b in s.board_ids}))
+                except (AgenticAgileError, aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                    logger.warning("digest sync failed, posting from the mirror as is: %s", exc)
+            posts, report.boards_read = self.plan(due, now)
+            gap = self.spread / len(posts) if posts else 0.0
+            started = self._clock()
+            for index, post in enumerate(posts):
+                wait = started + index * gap - self._clock()
+                if wait > 0:
+                    await self._sleep(wait)
+                client = self.clients.get(post.team_id)
+                if client is None:
+                    report.failed[f"{post.team_id}/{post.channel}"] = "no Slack client for workspace"
+                    continue
+                try:
+                    await client.post_message(post.channel, post.text, blocks=post.blocks or None)
+                except (AgenticAgileError, aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                    report.failed[f"{post.team_id}/{post.channel}"] = f"{type(exc).__name__}: {exc}"
+                    continue
+                report.posts += 1
+                report.send_times.append(self._clock())
+        return report
+
+    async def run(self) -> None:
+        """Sleep until the next subscription is due, run the batch, repeat forever."""
+        while True:
+            if not self.subscriptions:
+                await self._sleep(60.0)
+                continue
+            wait = min(s.next_run for s in self.subscriptions) - self._clock()
+            if wait > 0:
+                await self._sleep(wait)
+            try:
+                report = await self.run_due()
+            except Exception:
+                # Due subscriptions were already advanced; the next batch still runs.
+                logger.exception("digest run failed")
+                continue
+            if report.due:
+                logger.info(
+                    "digest run: %d due, %d boards read, %d posts, %d failed",
+                    report.due,
+                    report.boards_read,
+                    report.posts,
+                    len(report.failed),
+                )
@@ -0,0 +1,50 @@
+"""Exception hierarchy shared by every AgenticAgile component."""
+
+from __future__ import annotations
+
+
+class AgenticAgileError(Exception):
+    """Base class for all errors raised by AgenticAgile."""
+
+
+class APIError(AgenticAgileError):
+    """An external API answered with a non-success status."""
+
+    def __init__(self, status: int, message: str, *, url: str | None = None) -> None:
+        super().__init__(f"{status}: {message}" + (f" ({url})" if url else ""))
+        self.status = status
+        self.message = message
+        self.url = url
+
+
+class RateLimitedError(APIError):
+    """The API rejected the call with HTTP 429.
+
+    ``retry_after`` holds the number of seconds the server asked us to wait,
+    or ``None`` when no ``Retry-After`` header was sent.
+    """
+
+    def __init__(
+        self,
+        message: str = "rate limited",
+        *,
+        retry_after: float | None = None,
+        url: str | None = None,
+    ) -> None:
+        super().__init__(429, message, url=url)
+        self.retry_after = retry_after
+
+
+class TrelloError(APIError):
+    """The Trello REST API returned an error."""
+
+
+class SlackError(APIError):
+    """The Slack Web API answered ``ok: false``.
+
+    ``error`` is Slack's machine-readable error code, e.g. ``channel_not_found``.
+    """
+
+    def __init__(self, error: str, *, status: int = 200, url: str | None = None) -> None:
+        super().__init__(status, error, url=url)
+        self.error = error
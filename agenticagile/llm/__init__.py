@@ -0,0 +1,7 @@
+"""Language-model layer: provider protocol, reply cache and instrumentation."""
+
+from agenticagile.llm.base import LLM, Message
+from agenticagile.llm.cache import CachingLLM, ResponseCache
+from agenticagile.llm.instrumented import InstrumentedLLM
+
+__all__ = ["LLM", "CachingLLM", "InstrumentedLLM", "Message", "ResponseCache"]
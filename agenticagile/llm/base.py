@@ -0,0 +1,28 @@
+"""Provider-neutral interface for the language models AgenticAgile calls.
+
+Concrete providers only need ``model``, :meth:`LLM.complete` and
+:meth:`LLM.stream`. Messages use the common chat shape
+``{"role": "system" | "user" | "assistant", "content": "..."}``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Mapping, Sequence
+from typing import Any, Protocol, runtime_checkable
+
+Message = Mapping[str, str]
+
+
+@runtime_checkable
+class LLM(Protocol):
+    """Minimal chat-completion model."""
+
+    model: str
+
+    async def complete(self, messages: Sequence[Message], **params: Any) -> str:
+        """Return the full reply to ``messages``."""
+        ...
+
+    def stream(self, messages: Sequence[Message], **params: Any) -> AsyncIterator[str]:
+        """Yield the reply to ``messages`` as text fragments."""
+        ...
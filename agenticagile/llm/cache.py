@@ -0,0 +1,244 @@
+"""Content-addressed cache for LLM replies.
+
+A reply is keyed on the normalised prompt, the model and its sampling
+parameters, and a hash of the board state the prompt was built from (see
+:meth:`~agenticagile.board.mirror.BoardMirror.state_hash`). Asking "summarize
+sprint 12" twice therefore hits the cache until the board actually changes.
+
+Two tiers are kept: an in-process LRU with TTL, and an optional SQLite file
+that survives restarts. Concurrent identical requests share one model call.
+
+Usage::
+
+    cache = ResponseCache(path="llm-cache.sqlite3")
+    llm = CachingLLM(provider, cache)
+    reply = await llm.complete(messages, state=mirror.state_hash([board_id]))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TypeVar
+
+from agenticagile.llm.base import LLM, Message
+
+T = TypeVar("T")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Canonical form of a prompt: NFKC, collapsed whitespace, case-folded."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+def cache_key(messages: Sequence[Message], *, model: str, params: dict[str, Any], state: str = "") -> str:
+    """Stable key for a completion request."""
+    material = {
+        "messages": [[m.get("role", ""), normalize_prompt(m.get("content", ""))] for m in messages],
+        "model": model,
+        "params": params,
+        "state": state,
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+async def single_flight(
+    inflight: dict[str, asyncio.Future[T]], key: str, compute: Callable[[], Awaitable[T]]
+) -> tuple[T, bool]:
+    """Run ``compute`` once for all concurrent callers of ``key``.
+
+    Returns the value and whether it was shared from another caller's run.
+    Exceptions raised by ``compute`` reach every waiter. When the caller
+    running ``compute`` is cancelled only that caller is: one of the waiters
+    takes over and computes the value itself.
+    """
+    while (pending := inflight.get(key)) is not None:
+        try:
+            return await asyncio.shield(pending), True
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+    future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+    inflight[key] = future
+    try:
+        value = await compute()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # Waiters get the exception; nobody else needs to retrieve it.
+        future.exception()
+        raise
+    else:
+        future.set_result(value)
+        return value, False
+    finally:
+        del inflight[key]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    shared: int = 0
+
+
+class ResponseCache:
+    """Two-tier (memory, then SQLite) cache of reply strings.
+
+    Args:
+        max_entries: Size of the in-memory LRU.
+        ttl: Seconds a reply stays valid in either tier.
+        path: SQLite file for the persistent tier; ``None`` disables it.
+        max_disk_entries: Rows kept on disk; the oldest are pruned beyond it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl: float = 24 * 3600.0,
+        path: str | Path | None = None,
+        max_disk_entries: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.stats = CacheStats()
+        self._clock = clock
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+        self._disk: sqlite3.Connection | None = None
+        if path is not None:
+            self._disk = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS replies (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS replies_expires ON replies (expires)")
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def get(self, key: str) -> str | None:
+        now = self._clock()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > now:
+                self._memory.move_to_end(key)
+                self.stats.hits += 1
+                return value
+            del self._memory[key]
+        if self._disk is not None:
+            row = self._disk.execute("SELECT value, expires FROM replies WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] > now:
+                self._remember(key, row[0], row[1])
+                self.stats.disk_hits += 1
+                return row[0]
+        return None
+
+    def put(self, key: str, value: str) -> None:
+        expires = self._clock() + self.ttl
+        self._remember(key, value, expires)
+        if self._disk is not None:
+            self._disk.execute("INSERT OR REPLACE INTO replies (key, value, expires) VALUES (?, ?, ?)", (key, value, expires))
+            self._prune_disk()
+
+    def _remember(self, key: str, value: str, expires: float) -> None:
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _prune_disk(self) -> None:
+        assert self._disk is not None
+        self._disk.execute("DELETE FROM replies WHERE expires <= ?", (self._clock(),))
+        excess = self._disk.execute("SELECT COUNT(*) FROM replies").fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            self._disk.execute(
+                "DELETE FROM replies WHERE key IN (SELECT key FROM replies ORDER BY expires LIMIT ?)", (excess,)
+            )
+
+    def invalidate(self, key: str) -> None:
+        self._memory.pop(key, None)
+        if self._disk is not None:
+            self._disk.execute("DELETE FROM replies WHERE key = ?", (key,))
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached reply for ``key`` or compute it exactly once.
+
+        Callers arriving while the same key is being computed wait for that
+        computation instead of starting their own.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        async def miss() -> str:
+            self.stats.misses += 1
+            value = await compute()
+            self.put(key, value)
+            return value
+
+        value, shared = await single_flight(self._inflight, key, miss)
+        if shared:
+            self.stats.shared += 1
+        return value
+
+
+class CachingLLM:
+    """:class:`LLM` wrapper that serves repeated requests from a cache.
+
+    ``complete`` and ``stream`` accept an extra ``state`` keyword: the hash of
+    the board state the prompt depends on. Requests with ``cache=False`` skip
+    the cache entirely.
+    """
+
+    def __init__(self, inner: LLM, cache: ResponseCache) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.model = inner.model
+
+    def key(self, messages: Sequence[Message], *, state: str, params: dict[str, Any]) -> str:
+        return cache_key(messages, model=self.model, params=params, state=state)
+
+    async def complete(self, messages: Sequence[Message], *, state: str = "", cache: bool = True, **params: Any) -> str:
+        if not cache:
+            return await self.inner.complete(messages, **params)
+        key = self.key(messages, state=state, params=params)
+        return await self.cache.get_or_compute(key, lambda: self.inner.complete(messages, **params))
+
+    async def stream(
+        self, messages: Sequence[Message], *, state: str = "", cache: bool = True, **params: Any
+    ) -> AsyncIterator[str]:
+        """Stream a reply; a cached reply is yielded as a single fragment."""
+        key = self.key(messages, state=state, params=params)
+        if cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        parts: list[str] = []
+        async for fragment in self.inner.stream(messages, **params):
+            parts.append(fragment)
+            yield fragment
+        if cache:
+            self.cache.put(key, "".join(parts))
@@ -0,0 +1,305 @@
+"""Assemble board context for a prompt under a token budget.
+
+Dumping whole boards into the prompt is slow and expensive, so
+:class:`ContextBuilder` ranks the open cards of the relevant boards against
+the request and packs the best ones into a fixed budget:
+
+* **keyword** – BM25 over card name, description, labels, list, comments
+  and checklist items,
+* **semantic** – optional similarity scores from an embedding index,
+* **recency** – exponential decay on the card's last activity,
+* **assignee** – cards of the asking member or of members named in the request,
+* **label/list** – labels or list names mentioned in the request.
+
+Each card is rendered in full (description, latest comments, open checklist
+items) when it fits and in a one-line form otherwise; packing stops once not
+even the short form fits.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from agenticagile.board.mirror import BoardMirror, Card
+from agenticagile.llm.tokens import estimate_tokens
+
+_WORDS = re.compile(r"[a-z0-9]+")
+
+#: Words too common to say anything about relevance.
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were what when "
+    "which who will with my me our we you your i show list tell about all any".split()
+)
+
+#: Similarity provider: ``(query, candidate card ids) -> {card_id: score in [0, 1]}``.
+SemanticScorer = Callable[[str, Sequence[str]], Mapping[str, float]]
+
+
+def terms(text: str) -> list[str]:
+    return [word for word in _WORDS.findall(text.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+def parse_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+@dataclass
+class RankingWeights:
+    keyword: float = 1.0
+    semantic: float = 1.0
+    recency: float = 0.35
+    assignee: float = 0.5
+    label: float = 0.6
+    recency_half_life_days: float = 7.0
+
+
+@dataclass
+class ContextRequest:
+    """What the context is for.
+
+    Args:
+        query: The user's request text.
+        board_ids: Boards to draw cards from.
+        member_id: Trello member asking, if known.
+        budget: Token budget for the packed context.
+    """
+
+    query: str
+    board_ids: Sequence[str]
+    member_id: str | None = None
+    budget: int = 3000
+
+
+@dataclass
+class _BoardNames:
+    """Lookup tables shared by ranking and rendering of one request."""
+
+    members: dict[str, str]
+    lists: dict[str, str] = field(default_factory=dict)
+    labels: dict[str, str] = field(default_factory=dict)
+    comments: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    checklists: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+
+
+@dataclass
+class RankedCard:
+    card: Card
+    score: float
+    reasons: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class BuiltContext:
+    text: str
+    tokens: int
+    card_ids: list[str]
+    considered: int
+    truncated: int
+
+
+class ContextBuilder:
+    """Rank mirror content for a request and pack it into a token budget.
+
+    Args:
+        mirror: Source of cards, comments and checklists.
+        semantic: Optional embedding similarity provider.
+        weights: Relative weights of the ranking signals.
+        max_comments: Comments rendered per card in the full form.
+    """
+
+    def __init__(
+        self,
+        mirror: BoardMirror,
+        *,
+        semantic: SemanticScorer | None = None,
+        weights: RankingWeights | None = None,
+        max_comments: int = 3,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.mirror = mirror
+        self.semantic = semantic
+        self.weights = weights or RankingWeights()
+        self.max_comments = max_comments
+        self._clock = clock
+
+    # -- ranking ------------------------------------------------------------
+
+    def _card_text(self, card: Card, names: _BoardNames) -> str:
+        parts = [card.name, card.desc, names.lists.get(card.list_id or "", "")]
+        parts += [names.labels.get(label_id, "") for label_id in card.label_ids]
+        parts += [comment["text"] for comment in names.comments.get(card.id, ())]
+        for checklist in names.checklists.get(card.id, ()):
+            parts += [item["name"] for item in checklist["items"]]
+        return " ".join(parts)
+
+    def _names(self, board_ids: Iterable[str]) -> _BoardNames:
+        names = _BoardNames(members={m["id"]: m["full_name"] or m["username"] for m in self.mirror.members()})
+        for board_id in board_ids:
+            names.lists.update({lst["id"]: lst["name"] for lst in self.mirror.lists(board_id, include_closed=True)})
+            names.labels.update({label["id"]: label["name"] for label in self.mirror.labels(board_id)})
+            names.comments.update(self.mirror.board_comments(board_id, per_card=self.max_comments))
+            names.checklists.update(self.mirror.board_checklists(board_id))
+        return names
+
+    def rank(self, request: ContextRequest, names: _BoardNames | None = None) -> list[RankedCard]:
+        """Score every open card of the requested boards, best first."""
+        cards = [card for board_id in request.board_ids for card in self.mirror.cards(board_id=board_id)]
+        if not cards:
+            return []
+        names = names or self._names(request.board_ids)
+        list_names, label_names = names.lists, names.labels
+
+        query_terms = terms(request.query)
+        query_text = " ".join(query_terms)
+        documents = {card.id: Counter(terms(self._card_text(card, names))) for card in cards}
+        keyword = _bm25(query_terms, documents)
+        semantic = dict(self.semantic(request.query, [c.id for c in cards])) if self.semantic else {}
+
+        mentioned_members = {
+            member["id"]
+            for board_id in request.board_ids
+            for member in self.mirror.members(board_id)
+            if any(
+                name and name.lower() in request.query.lower()
+                for name in (member["username"], member["full_name"])
+            )
+        }
+        if request.member_id:
+            mentioned_members.add(request.member_id)
+        mentioned_labels = {
+            label_id for label_id, name in label_names.items() if name and _mentions(query_text, name)
+        }
+        mentioned_lists = {list_id for list_id, name in list_names.items() if name and _mentions(query_text, name)}
+
+        w = self.weights
+        now = self._clock()
+        half_life = w.recency_half_life_days * 86400
+        ranked: list[RankedCard] = []
+        for card in cards:
+            reasons: dict[str, float] = {}
+            if keyword.get(card.id):
+                reasons["keyword"] = w.keyword * keyword[card.id]
+            if semantic.get(card.id):
+                reasons["semantic"] = w.semantic * semantic[card.id]
+            activity = parse_date(card.last_activity)
+            if activity is not None:
+                reasons["recency"] = w.recency * 0.5 ** (max(0.0, now - activity) / half_life)
+            if mentioned_members & set(card.member_ids):
+                reasons["assignee"] = w.assignee
+            if mentioned_labels & set(card.label_ids) or card.list_id in mentioned_lists:
+                reasons["label"] = w.label
+            ranked.append(RankedCard(card, sum(reasons.values()), reasons))
+        ranked.sort(key=lambda r: (-r.score, r.card.pos))
+        return ranked
+
+    # -- packing ------------------------------------------------------------
+
+    def render_card(self, card: Card, names: _BoardNames, *, full: bool) -> str:
+        meta = [f"list: {names.lists.get(card.list_id or '', '?')}"]
+        label_text = ", ".join(name for name in (names.labels.get(l, "") for l in card.label_ids) if name)
+        if label_text:
+            meta.append(f"labels: {label_text}")
+        member_text = ", ".join(names.members.get(m, m) for m in card.member_ids)
+        if member_text:
+            meta.append(f"assigned: {member_text}")
+        if card.due:
+            meta.append(f"due: {card.due[:10]}{' (done)' if card.due_complete else ''}")
+        line = f"- [{card.id[-6:]}] {card.name} ({'; '.join(meta)})"
+        if not full:
+            return line
+        lines = [line]
+        if card.desc:
+            desc = " ".join(card.desc.split())
+            lines.append(f"  desc: {desc[:600]}{'…' if len(desc) > 600 else ''}")
+        for checklist in names.checklists.get(card.id, ()):
+            done = sum(item["complete"] for item in checklist["items"])
+            open_items = [item["name"] for item in checklist["items"] if not item["complete"]]
+            summary = f"  checklist {checklist['name']}: {done}/{len(checklist['items'])} done"
+            if open_items:
+                summary += "; open: " + "; ".join(open_items[:5])
+            lines.append(summary)
+        for comment in names.comments.get(card.id, ()):
+            text = " ".join(comment["text"].split())
+            lines.append(f"  comment ({(comment['date'] or '')[:10]}): {text[:300]}")
+        return "\n".join(lines)
+
+    def build(self, request: ContextRequest) -> BuiltContext:
+        """Return the packed context text for ``request``."""
+        names = self._names(request.board_ids)
+        ranked = self.rank(request, names)
+        parts: list[str] = []
+        used = 0
+        for board_id in request.board_ids:
+            board = self.mirror.board(board_id) or {"name": board_id}
+            counts = ", ".join(f"{name}: {count}" for name, count in self.mirror.list_counts(board_id).items())
+            header = f"Board {board['name']} — {counts}"
+            cost = estimate_tokens(header) + 1
+            if used + cost > request.budget:
+                break
+            parts.append(header)
+            used += cost
+
+        included: list[str] = []
+        truncated = 0
+        for entry in ranked:
+            card = entry.card
+            # Only cards with a real relevance signal earn the full form.
+            full = any(key != "recency" for key in entry.reasons)
+            text = self.render_card(card, names, full=full)
+            cost = estimate_tokens(text) + 1
+            if used + cost > request.budget and full:
+                text = self.render_card(card, names, full=False)
+                cost = estimate_tokens(text) + 1
+                truncated += 1
+            if used + cost > request.budget:
+                break
+            parts.append(text)
+            included.append(card.id)
+            used += cost
+        return BuiltContext(
+            text="\n".join(parts),
+            tokens=used,
+            card_ids=included,
+            considered=len(ranked),
+            truncated=truncated,
+        )
+
+
+def _mentions(query_text: str, name: str) -> bool:
+    name_terms = terms(name)
+    return bool(name_terms) and all(term in query_text.split() for term in name_terms)
+
+
+def _bm25(query_terms: Sequence[str], documents: Mapping[str, Counter[str]], k1: float = 1.2, b: float = 0.75) -> dict[str, float]:
+    """BM25 scores normalised to ``[0, 1]`` by the best document."""
+    if not query_terms or not documents:
+        return {}
+    n = len(documents)
+    avg_len = sum(sum(doc.values()) for doc in documents.values()) / n or 1.0
+    df = Counter(term for doc in documents.values() for term in set(query_terms) if term in doc)
+    scores: dict[str, float] = {}
+    for doc_id, doc in documents.items():
+        length = sum(doc.values())
+        score = 0.0
+        for term in set(query_terms):
+            tf = doc.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_len))
+        if score:
+            scores[doc_id] = score
+    best = max(scores.values(), default=0.0)
+    return {doc_id: score / best for doc_id, score in scores.items()} if best else {}
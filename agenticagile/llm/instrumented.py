@@ -0,0 +1,68 @@
+"""Metrics and spans around model calls.
+
+:class:`InstrumentedLLM` wraps any :class:`~agenticagile.llm.base.LLM` and
+records each call in :data:`~agenticagile.telemetry.CALL_SECONDS` (service
+``llm``) with estimated prompt and reply tokens. Streams also record the time
+to the first fragment, which is what users wait for in Slack. Wrap the
+provider, not the :class:`~agenticagile.llm.cache.CachingLLM`, so cache hits
+are not counted as model calls.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from agenticagile.llm.base import LLM, Message
+from agenticagile.llm.tokens import estimate_tokens
+from agenticagile.telemetry import CALL_SECONDS, LLM_TOKENS, span
+
+
+def _prompt_tokens(messages: Sequence[Message]) -> int:
+    return sum(estimate_tokens(message.get("content", "")) for message in messages)
+
+
+class InstrumentedLLM:
+    """:class:`LLM` wrapper that measures every call."""
+
+    def __init__(self, inner: LLM) -> None:
+        self.inner = inner
+        self.model = inner.model
+
+    async def complete(self, messages: Sequence[Message], **params: Any) -> str:
+        outcome = "error"
+        started = time.perf_counter()
+        LLM_TOKENS.observe(_prompt_tokens(messages), model=self.model, kind="prompt")
+        try:
+            with span("llm.complete", model=self.model) as current:
+                reply = await self.inner.complete(messages, **params)
+                tokens = estimate_tokens(reply)
+                if current is not None:
+                    current.set(reply_tokens=tokens)
+            LLM_TOKENS.observe(tokens, model=self.model, kind="reply")
+            outcome = "ok"
+            return reply
+        finally:
+            CALL_SECONDS.observe(time.perf_counter() - started, service="llm", operation="complete", outcome=outcome)
+
+    async def stream(self, messages: Sequence[Message], **params: Any) -> AsyncIterator[str]:
+        outcome = "error"
+        started = time.perf_counter()
+        first: float | None = None
+        tokens = 0
+        LLM_TOKENS.observe(_prompt_tokens(messages), model=self.model, kind="prompt")
+        try:
+            with span("llm.stream", model=self.model) as current:
+                async for fragment in self.inner.stream(messages, **params):
+                    if first is None:
+                        first = time.perf_counter() - started
+                        CALL_SECONDS.observe(first, service="llm", operation="first_fragment", outcome="ok")
+                    tokens += estimate_tokens(fragment)
+                    yield fragment
+                if current is not None:
+                    current.set(reply_tokens=tokens, first_fragment_seconds=first)
+            LLM_TOKENS.observe(tokens, model=self.model, kind="reply")
+            outcome = "ok"
+        finally:
+            CALL_SECONDS.observe(time.perf_counter() - started, service="llm", operation="stream", outcome=outcome)
@@ -0,0 +1,21 @@
+"""Fast local token-count estimate.
+
+Exact tokenizers are model specific and slow to load. Budgeting only needs a
+close, slightly pessimistic figure, so words are counted as one token per four
+characters (at least one) and every punctuation mark as its own token.
+"""
+
+from __future__ import annotations
+
+import re
+
+_PIECES = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate number of tokens ``text`` uses in a prompt."""
+    total = 0
+    for match in _PIECES.finditer(text):
+        piece = match.group()
+        total += (len(piece) + 3) // 4 if piece[0].isalnum() or piece[0] == "_" else 1
+    return total
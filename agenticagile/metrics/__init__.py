@@ -0,0 +1,15 @@
+"""Sprint metrics (burndown, velocity, cycle time, lead time, WIP age) over card history."""
+
+from agenticagile.metrics.engine import Distribution, MetricsEngine, Sprint, SprintReport, Workflow, sprint_calendar
+from agenticagile.metrics.history import CardHistory, Interner
+
+__all__ = [
+    "CardHistory",
+    "Distribution",
+    "Interner",
+    "MetricsEngine",
+    "Sprint",
+    "SprintReport",
+    "Workflow",
+    "sprint_calendar",
+]
@@ -0,0 +1,362 @@
+"""Sprint metrics computed as array operations over :class:`CardHistory`.
+
+For one board the history rows are sorted by card and time once, the
+"unchanged" sentinels are forward-filled per card, and every row gets the
+card's state after the event: open points, done points and whether work has
+started. Burndown, velocity, cycle time, lead time and WIP age all follow
+from cumulative sums, ``searchsorted`` and per-card ``reduceat`` over those
+columns.
+
+Finished sprints are memoized; new actions only invalidate reports of sprints
+that end after the earliest new event, which normally means just the current
+sprint.
+
+Usage::
+
+    engine = MetricsEngine(Workflow(started=("doing", "review"), done=("done",)))
+    engine.attach(mirror)  # follow the action feed
+    engine.ingest(older_actions)  # backfill history
+    reports = engine.reports(sprint_calendar(board_id, first_monday, length_days=14))
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from agenticagile.board.mirror import BoardMirror, MirrorChange
+from agenticagile.metrics.history import UNCHANGED, CardHistory
+
+DAY = 86400.0
+
+#: List categories.
+TODO, STARTED, DONE = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class Workflow:
+    """Which lists mean work has started or is done, matched by name.
+
+    A list belongs to a category when its lowercased name contains one of the
+    markers; ``done`` wins over ``started``.
+    """
+
+    started: tuple[str, ...] = ("doing", "in progress", "review", "testing", "qa")
+    done: tuple[str, ...] = ("done", "released", "shipped")
+
+    def category(self, list_name: str) -> int:
+        name = list_name.lower()
+        if any(marker in name for marker in self.done):
+            return DONE
+        if any(marker in name for marker in self.started):
+            return STARTED
+        return TODO
+
+
+@dataclass(frozen=True)
+class Sprint:
+    """A sprint of a board, ``start <= t < end`` in Unix seconds."""
+
+    board_id: str
+    start: float
+    end: float
+    name: str = ""
+
+
+def sprint_calendar(
+    board_id: str, first_start: float, *, length_days: int = 14, until: float | None = None
+) -> list[Sprint]:
+    """Back-to-back sprints from ``first_start`` up to the one containing ``until`` (now)."""
+    until = time.time() if until is None else until
+    length = length_days * DAY
+    count = max(1, int((until - first_start) // length) + 1)
+    return [
+        Sprint(board_id, first_start + i * length, first_start + (i + 1) * length, f"Sprint {i + 1}")
+        for i in range(count)
+    ]
+
+
+@dataclass
+class Distribution:
+    """Summary of a duration sample, in days."""
+
+    count: int = 0
+    mean: float = 0.0
+    p50: float = 0.0
+    p85: float = 0.0
+    max: float = 0.0
+
+    @classmethod
+    def of(cls, seconds: np.ndarray) -> Distribution:
+        if not seconds.size:
+            return cls()
+        days = seconds / DAY
+        p50, p85 = np.percentile(days, [50, 85])
+        return cls(int(days.size), float(days.mean()), float(p50), float(p85), float(days.max()))
+
+
+@dataclass
+class SprintReport:
+    """Metrics of one sprint.
+
+    ``burndown_times`` are the sample instants (sprint start, then the end of
+    every day); ``remaining`` holds the open points at each of them and
+    ``completed`` the points finished since the sprint started.
+    """
+
+    sprint: Sprint
+    burndown_times: list[float] = field(default_factory=list)
+    remaining: list[float] = field(default_factory=list)
+    completed: list[float] = field(default_factory=list)
+    velocity: float = 0.0
+    completed_cards: list[str] = field(default_factory=list)
+    cycle_time: Distribution = field(default_factory=Distribution)
+    lead_time: Distribution = field(default_factory=Distribution)
+    wip_age: dict[str, float] = field(default_factory=dict)
+    as_of: float = 0.0
+
+
+@dataclass
+class _BoardView:
+    """Per-board history sorted by (card, time) with the state after each row."""
+
+    time: np.ndarray
+    card: np.ndarray
+    group_starts: np.ndarray
+    group_cards: np.ndarray
+    open_delta: np.ndarray
+    done_delta: np.ndarray
+    done_before: np.ndarray
+    done_after: np.ndarray
+    state_after: np.ndarray  # list category, or -1 once archived/deleted
+    first_time: np.ndarray  # per group
+    first_started: np.ndarray  # per group; inf if never started
+    by_time: np.ndarray  # row order by time, for the cumulative series
+    open_cumsum: np.ndarray
+    done_cumsum: np.ndarray
+
+
+def _ffill(values: np.ndarray, valid: np.ndarray, group_first: np.ndarray, default: Any) -> np.ndarray:
+    """Forward-fill ``values`` over rows where ``valid`` is false, per card group."""
+    positions = np.arange(values.size)
+    last_valid = np.maximum.accumulate(np.where(valid, positions, -1))
+    group_start = np.maximum.accumulate(np.where(group_first, positions, 0))
+    filled = values[np.maximum(last_valid, 0)].copy()
+    # Rows before a card's first valid value must not inherit the previous card's.
+    filled[last_valid < group_start] = default
+    return filled
+
+
+def build_board_view(columns: Mapping[str, np.ndarray], board: int, categories: np.ndarray) -> _BoardView | None:
+    """Derive the per-row card state of ``board`` from history ``columns``."""
+    rows = np.flatnonzero(columns["board"] == board)
+    if not rows.size:
+        return None
+    card = columns["card"][rows]
+    when = columns["time"][rows]
+    order = np.lexsort((rows, when, card))  # stable: same-second events keep arrival order
+    rows, card, when = rows[order], card[order], when[order]
+    group_first = np.ones(rows.size, dtype=bool)
+    group_first[1:] = card[1:] != card[:-1]
+    group_starts = np.flatnonzero(group_first)
+
+    raw_list = columns["list"][rows]
+    raw_alive = columns["alive"][rows]
+    raw_points = columns["points"][rows]
+    list_code = _ffill(raw_list, raw_list != UNCHANGED, group_first, UNCHANGED)
+    alive = _ffill(raw_alive, raw_alive != UNCHANGED, group_first, 1)
+    points = _ffill(raw_points, ~np.isnan(raw_points), group_first, 1.0).astype(np.float64)
+
+    category = np.where(list_code >= 0, categories[np.maximum(list_code, 0)], TODO)
+    done = category == DONE
+    is_open = (alive == 1) & ~done
+    open_points = np.where(is_open, points, 0.0)
+    done_points = np.where(done, points, 0.0)
+    done_before = np.zeros(rows.size, dtype=bool)
+    done_before[1:] = done[:-1]
+    done_before[group_first] = False
+    open_delta = open_points.copy()
+    open_delta[1:] -= open_points[:-1]
+    open_delta[group_first] = open_points[group_first]
+    done_delta = done_points.copy()
+    done_delta[1:] -= done_points[:-1]
+    done_delta[group_first] = done_points[group_first]
+
+    started_time = np.where(category != TODO, when, np.inf)
+    by_time = np.argsort(when, kind="stable")
+    return _BoardView(
+        time=when,
+        card=card,
+        group_starts=group_starts,
+        group_cards=card[group_starts],
+        open_delta=open_delta,
+        done_delta=done_delta,
+        done_before=done_before,
+        done_after=done,
+        state_after=np.where(alive == 1, category, -1),
+        first_time=when[group_starts],
+        first_started=np.minimum.reduceat(started_time, group_starts),
+        by_time=by_time,
+        open_cumsum=np.cumsum(open_delta[by_time]),
+        done_cumsum=np.cumsum(done_delta[by_time]),
+    )
+
+
+def compute_sprint(view: _BoardView, history: CardHistory, sprint: Sprint, now: float) -> SprintReport:
+    as_of = min(sprint.end, now)
+    report = SprintReport(sprint, as_of=as_of)
+    sorted_time = view.time[view.by_time]
+
+    def cumulative(series: np.ndarray, at: np.ndarray) -> np.ndarray:
+        position = np.searchsorted(sorted_time, at, side="right")
+        return np.where(position > 0, series[np.maximum(position - 1, 0)], 0.0)
+
+    samples = np.append(np.arange(sprint.start, as_of, DAY), as_of)
+    remaining = cumulative(view.open_cumsum, samples)
+    completed = cumulative(view.done_cumsum, samples) - cumulative(view.done_cumsum, np.array([sprint.start]))[0]
+    report.burndown_times = samples.tolist()
+    report.remaining = remaining.tolist()
+    report.completed = completed.tolist()
+    report.velocity = float(completed[-1])
+
+    # Completions: rows inside the sprint that move a card into done.
+    window = (view.time >= sprint.start) & (view.time < sprint.end)
+    finished = np.flatnonzero(window & view.done_after & ~view.done_before)
+    if finished.size:
+        # Keep the last completion of each card (a reopened card counts once).
+        last = finished[::-1][np.unique(view.card[finished[::-1]], return_index=True)[1]]
+        group = np.searchsorted(view.group_starts, last, side="right") - 1
+        # Cards reopened before ``as_of`` do not count as completed.
+        stays_done = view.done_after[_last_row_before(view, group, as_of)]
+        last, group = last[stays_done], group[stays_done]
+        done_at = view.time[last]
+        report.completed_cards = [history.cards[code] for code in view.card[last].tolist()]
+        started = np.minimum(view.first_started[group], done_at)
+        report.cycle_time = Distribution.of(done_at - started)
+        report.lead_time = Distribution.of(done_at - view.first_time[group])
+
+    # WIP age: cards in a started list at ``as_of``.
+    last_rows = _last_row_before(view, np.arange(view.group_starts.size), as_of)
+    valid = last_rows >= 0
+    in_progress = np.zeros(view.group_starts.size, dtype=bool)
+    in_progress[valid] = view.state_after[last_rows[valid]] == STARTED
+    ages = (as_of - view.first_started[in_progress]) / DAY
+    cards = view.group_cards[in_progress]
+    report.wip_age = {history.cards[code]: float(age) for code, age in zip(cards.tolist(), ages.tolist())}
+    return report
+
+
+def _last_row_before(view: _BoardView, groups: np.ndarray, at: float) -> np.ndarray:
+    """Index of the last row at or before ``at`` of each group, or -1."""
+    candidate = np.where(view.time <= at, np.arange(view.time.size), -1)
+    last = np.maximum.reduceat(candidate, view.group_starts)
+    return last[groups]
+
+
+class MetricsEngine:
+    """Sprint metrics over a growing :class:`CardHistory` with per-sprint memoization.
+
+    Args:
+        workflow: List classification.
+        history: History to read; a new one is created when omitted.
+        max_workers: Threads used by :meth:`reports` to compute boards in parallel.
+    """
+
+    def __init__(
+        self,
+        workflow: Workflow | None = None,
+        history: CardHistory | None = None,
+        *,
+        max_workers: int = 4,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.workflow = workflow or Workflow()
+        self.history = history or CardHistory()
+        self.max_workers = max_workers
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._views: dict[int, tuple[tuple[int, bytes], _BoardView | None]] = {}
+        self._memo: dict[Sprint, SprintReport] = {}
+        self.computed = 0
+
+    def attach(self, mirror: BoardMirror) -> Callable[[], None]:
+        """Ingest every action the mirror applies from now on; returns the detach function."""
+
+        def on_change(change: MirrorChange) -> None:
+            if change.actions:
+                self.ingest(change.actions)
+
+        return mirror.subscribe(on_change)
+
+    def ingest(self, actions: Iterable[Mapping[str, Any]]) -> None:
+        """Add actions to the history and drop memoized reports they affect."""
+        with self._lock:
+            earliest = self.history.append_actions(actions)
+            if earliest:
+                self._memo = {
+                    sprint: report
+                    for sprint, report in self._memo.items()
+                    if sprint.board_id not in earliest or earliest[sprint.board_id] >= sprint.end
+                }
+
+    def _categories(self) -> np.ndarray:
+        lists = self.history.lists
+        return np.array(
+            [self.workflow.category(self.history.list_names.get(code, "")) for code in range(len(lists))] or [TODO],
+            dtype=np.int8,
+        )
+
+    def _view(self, board_id: str) -> _BoardView | None:
+        with self._lock:
+            board = self.history.boards.get(board_id)
+            if board is None:
+                return None
+            # A renamed list can change category without adding rows, so the
+            # categories are part of the key.
+            categories = self._categories()
+            key = (self.history.board_size(board), categories.tobytes())
+            cached = self._views.get(board)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            # Rows below the current size never change, so these views stay
+            # valid while other threads ingest.
+            columns = {name: self.history.column(name) for name in ("time", "board", "card", "list", "alive", "points")}
+        view = build_board_view(columns, board, categories)
+        self._views[board] = (key, view)
+        return view
+
+    def report(self, sprint: Sprint) -> SprintReport:
+        """Metrics of ``sprint``; finished sprints are served from the memo."""
+        cached = self._memo.get(sprint)
+        if cached is not None:
+            return cached
+        now = self._clock()
+        view = self._view(sprint.board_id)
+        result = compute_sprint(view, self.history, sprint, now) if view else SprintReport(sprint, as_of=min(sprint.end, now))
+        self.computed += 1
+        if sprint.end <= now:
+            self._memo[sprint] = result
+        return result
+
+    def reports(self, sprints: Sequence[Sprint]) -> list[SprintReport]:
+        """Reports of many sprints, computing each board's sprints on a worker thread."""
+        by_board: dict[str, list[Sprint]] = {}
+        for sprint in sprints:
+            by_board.setdefault(sprint.board_id, []).append(sprint)
+        if len(by_board) <= 1 or self.max_workers <= 1:
+            results = {sprint: self.report(sprint) for sprint in sprints}
+        else:
+            with ThreadPoolExecutor(self.max_workers) as pool:
+                chunks = pool.map(lambda group: [(s, self.report(s)) for s in group], by_board.values())
+                results = {sprint: report for chunk in chunks for sprint, report in chunk}
+        return [results[sprint] for sprint in sprints]
+
+    def velocity(self, sprints: Sequence[Sprint]) -> list[float]:
+        """Completed points per sprint."""
+        return [report.velocity for report in self.reports(sprints)]
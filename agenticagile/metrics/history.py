@@ -0,0 +1,237 @@
+"""Columnar history of card state changes extracted from Trello actions.
+
+Sprint metrics only need to know, for every card, when it entered which list,
+when it was archived or deleted and how many points it carried. Each relevant
+action becomes one row of parallel NumPy columns with dictionary-encoded ids,
+so the metrics can run as array operations over millions of rows instead of
+Python loops over action dicts.
+
+A column holds the *new* value set by the event, or a sentinel (``-1`` for
+codes and flags, ``NaN`` for points) when the event left it unchanged.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+import numpy as np
+
+from agenticagile.board.actions import CARD_CREATING_ACTIONS
+from agenticagile.board.eventlog import EventLog
+
+#: Leading "(3)" estimate in a card name, the Scrum-for-Trello convention.
+POINTS_PATTERN = re.compile(r"^\s*\((\d+(?:\.\d+)?)\)")
+
+#: Points of a card without an estimate, so unestimated boards count cards.
+DEFAULT_POINTS = 1.0
+
+UNCHANGED = -1
+
+
+def card_points(name: str) -> float:
+    match = POINTS_PATTERN.match(name or "")
+    return float(match.group(1)) if match else DEFAULT_POINTS
+
+
+def action_time(action: Mapping[str, Any]) -> float:
+    """Unix time of an action, read from the timestamp prefix of its id."""
+    return float(int(action["id"][:8], 16))
+
+
+class Interner:
+    """Dictionary encoding of string ids to dense ``int32`` codes."""
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def get(self, value: str) -> int | None:
+        return self.codes.get(value)
+
+
+_COLUMNS = {
+    "time": np.float64,
+    "board": np.int32,
+    "card": np.int32,
+    "list": np.int32,
+    "alive": np.int8,
+    "points": np.float32,
+}
+
+
+class CardHistory:
+    """Append-only columns of card events, one row per relevant action.
+
+    Attributes:
+        boards, cards, lists: Interners of the encoded ids.
+        list_names: Latest known name per list code.
+    """
+
+    def __init__(self, *, capacity: int = 4096) -> None:
+        self.boards = Interner()
+        self.cards = Interner()
+        self.lists = Interner()
+        self.list_names: dict[int, str] = {}
+        self._size = 0
+        self._data = {name: np.empty(capacity, dtype=dtype) for name, dtype in _COLUMNS.items()}
+        self._board_sizes: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        return self._data[name][: self._size]
+
+    def board_size(self, board: int) -> int:
+        """Rows recorded for ``board``; changes whenever the board gets events."""
+        return self._board_sizes.get(board, 0)
+
+    def append_rows(
+        self,
+        time: np.ndarray,
+        board: np.ndarray,
+        card: np.ndarray,
+        list_: np.ndarray,
+        alive: np.ndarray,
+        points: np.ndarray,
+    ) -> None:
+        """Append already encoded rows (used by readers of persisted logs)."""
+        count = len(time)
+        needed = self._size + count
+        capacity = len(self._data["time"])
+        if needed > capacity:
+            capacity = max(needed, capacity * 2)
+            for name, column in self._data.items():
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[: self._size] = column[: self._size]
+                self._data[name] = grown
+        for name, values in zip(_COLUMNS, (time, board, card, list_, alive, points)):
+            self._data[name][self._size : needed] = values
+        self._size = needed
+        codes, counts = np.unique(board, return_counts=True)
+        for code, added in zip(codes.tolist(), counts.tolist()):
+            self._board_sizes[code] = self._board_sizes.get(code, 0) + added
+
+    def _name_list(self, lst: Mapping[str, Any] | None) -> int:
+        if not lst or not lst.get("id"):
+            return UNCHANGED
+        code = self.lists.code(lst["id"])
+        if lst.get("name"):
+            self.list_names[code] = lst["name"]
+        return code
+
+    def append_actions(self, actions: Iterable[Mapping[str, Any]]) -> dict[str, float]:
+        """Extract card events from Trello ``actions`` and append them.
+
+        Returns:
+            Earliest event time appended per board id, for cache invalidation.
+        """
+        rows: list[tuple[float, int, int, int, int, float]] = []
+        earliest: dict[str, float] = {}
+        for action in actions:
+            kind = action.get("type", "")
+            data = action.get("data") or {}
+            if kind in ("createList", "updateList") and data.get("list"):
+                self._name_list(data["list"])
+                continue
+            card = data.get("card") or {}
+            board_id = (data.get("board") or {}).get("id")
+            if not card.get("id") or not board_id:
+                continue
+            list_code, alive, points = UNCHANGED, UNCHANGED, np.nan
+            if kind in CARD_CREATING_ACTIONS:
+                list_code = self._name_list(data.get("list") or data.get("listAfter") or {"id": card.get("idList")})
+                alive, points = 1, card_points(card.get("name", ""))
+            elif kind == "updateCard":
+                if "listAfter" in data:
+                    self._name_list(data.get("listBefore"))
+                    list_code = self._name_list(data["listAfter"])
+                if "closed" in card:
+                    alive = 0 if card["closed"] else 1
+                    if alive:
+                        list_code = self._name_list(data.get("list"))
+                if "name" in card and "name" in (data.get("old") or {}):
+                    points = card_points(card["name"])
+                if list_code == UNCHANGED and alive == UNCHANGED and np.isnan(points):
+                    continue
+            elif kind in ("deleteCard", "moveCardFromBoard"):
+                alive = 0
+            else:
+                continue
+            when = action_time(action)
+            if when < earliest.get(board_id, np.inf):
+                earliest[board_id] = when
+            rows.append(
+                (when, self.boards.code(board_id), self.cards.code(card["id"]), list_code, alive, points)
+            )
+        if rows:
+            columns = list(zip(*rows))
+            self.append_rows(*(np.asarray(values, dtype=dtype) for values, dtype in zip(columns, _COLUMNS.values())))
+        return earliest
+
+    @classmethod
+    def from_event_log(cls, log: EventLog, *, since: float | None = None) -> CardHistory:
+        """Build the history from the columns of an :class:`EventLog`.
+
+        Reads only the id, type and name columns, never the action payloads.
+        """
+        cols = log.columns(
+            ["time_ms", "type", "board", "card", "list", "list_before", "list_name", "name", "closed"], since=since
+        )
+        kinds = np.array(log.types.values or [""], dtype=object)
+        creates = np.isin(kinds, list(CARD_CREATING_ACTIONS))[cols["type"]]
+        updates = (kinds == "updateCard")[cols["type"]]
+        deletes = np.isin(kinds, ["deleteCard", "moveCardFromBoard"])[cols["type"]]
+        closed = cols["closed"]
+
+        list_code = np.where(creates | (updates & ((cols["list_before"] >= 0) | (closed == 0))), cols["list"], -1)
+        alive = np.full(closed.size, UNCHANGED, dtype=np.int8)
+        alive[creates] = 1
+        alive[updates & (closed >= 0)] = 1 - closed[updates & (closed >= 0)]
+        alive[deletes] = 0
+        names = cols["name"]
+        unique_names, inverse = np.unique(names, return_inverse=True)
+        name_points = np.array([card_points(log.strings[c]) if c >= 0 else np.nan for c in unique_names.tolist()])
+        points = name_points[inverse].astype(np.float32)
+        points[~(creates | updates)] = np.nan
+
+        keep = (cols["card"] >= 0) & (cols["board"] >= 0)
+        keep &= creates | deletes | (updates & ((list_code >= 0) | (alive >= 0) | ~np.isnan(points)))
+
+        history = cls(capacity=max(int(keep.sum()), 1))
+        named = cols["list_name"] >= 0
+        for code, name in zip(cols["list"][named].tolist(), cols["list_name"][named].tolist()):
+            history.list_names[history.lists.code(log.ids[code])] = log.strings[name]
+        history.append_rows(
+            cols["time_ms"][keep] / 1000.0,
+            _recode(cols["board"][keep], log, history.boards),
+            _recode(cols["card"][keep], log, history.cards),
+            _recode(list_code[keep], log, history.lists),
+            alive[keep],
+            points[keep],
+        )
+        return history
+
+
+def _recode(codes: np.ndarray, log: EventLog, interner: Interner) -> np.ndarray:
+    """Translate event log id codes to ``interner`` codes (``-1`` stays ``-1``)."""
+    unique, inverse = np.unique(codes, return_inverse=True)
+    mapped = np.array([interner.code(log.ids[c]) if c >= 0 else UNCHANGED for c in unique.tolist()], dtype=np.int32)
+    return mapped[inverse] if unique.size else codes.astype(np.int32)
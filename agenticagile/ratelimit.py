@@ -0,0 +1,307 @@
+"""Central token-bucket scheduler shared by every Trello and Slack call.
+
+Each external limit is one named :class:`TokenBucket`. Callers wait for a
+token through :meth:`RateLimiter.acquire`; waiters are served strictly by
+:class:`Priority` so a background sync can never starve an interactive Slack
+reply. Buckets can also hold a ``reserve`` of tokens that only interactive
+callers may spend, and :meth:`RateLimiter.penalize` pauses a bucket for the
+``Retry-After`` period a server sent back.
+
+The priority of a call is taken from a context variable, so whole code paths
+are tagged once instead of threading an argument through every client::
+
+    with request_priority(Priority.INTERACTIVE):
+        await slack.post_message(channel, text)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+from agenticagile.errors import RateLimitedError
+from agenticagile.telemetry import CALL_RETRIES, RATE_LIMIT_WAIT, bucket_label
+
+T = TypeVar("T")
+
+
+class Priority(enum.IntEnum):
+    """Scheduling lanes; lower values are served first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+_priority: ContextVar[Priority] = ContextVar("agenticagile_priority", default=Priority.NORMAL)
+
+
+def current_priority() -> Priority:
+    """Priority of API calls made from the current context."""
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Run the enclosed calls (and tasks spawned inside) at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+#: Trello allows 100 requests per 10 seconds for each token.
+TRELLO_TOKEN_LIMIT = (100, 10.0)
+
+#: Slack Web API tiers as (requests, per seconds).
+SLACK_TIERS = {
+    1: (1, 60.0),
+    2: (20, 60.0),
+    3: (50, 60.0),
+    4: (100, 60.0),
+}
+
+#: Slack methods used by AgenticAgile and their rate-limit tier. ``chat.*``
+#: write methods are "special": roughly one message per second per channel.
+SLACK_METHOD_TIERS = {
+    "auth.test": 4,
+    "apps.connections.open": 1,
+    "chat.postMessage": "special",
+    "chat.update": 3,
+    "chat.postEphemeral": "special",
+    "conversations.history": 3,
+    "conversations.replies": 3,
+    "conversations.info": 3,
+    "reactions.add": 3,
+    "users.info": 4,
+    "users.list": 2,
+    "views.open": 4,
+    "views.publish": 4,
+}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds from a ``Retry-After`` header, or ``None`` if absent/unparseable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def slack_bucket(method: str, channel: str | None = None) -> str:
+    """Name of the bucket that governs ``method`` (per channel when special)."""
+    tier = SLACK_METHOD_TIERS.get(method, 3)
+    if tier == "special":
+        return f"slack:special:{channel or '*'}"
+    return f"slack:{method}"
+
+
+@dataclass
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` tokens/second.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Maximum number of tokens (the burst size).
+        reserve: Tokens that only :attr:`Priority.INTERACTIVE` may take.
+    """
+
+    rate: float
+    capacity: float
+    reserve: float = 0.0
+    clock: Callable[[], float] = time.monotonic
+    tokens: float = field(init=False)
+    blocked_until: float = field(init=False, default=0.0)
+    _updated: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0 or self.capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        if not 0 <= self.reserve < self.capacity:
+            raise ValueError("reserve must be between 0 and capacity")
+        self.tokens = self.capacity
+        self._updated = self.clock()
+
+    @classmethod
+    def per_window(cls, requests: int, seconds: float, **kwargs: object) -> TokenBucket:
+        """Bucket allowing ``requests`` per ``seconds`` with a full-window burst."""
+        return cls(rate=requests / seconds, capacity=float(requests), **kwargs)  # type: ignore[arg-type]
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, priority: Priority = Priority.NORMAL) -> float:
+        """Seconds until a token is available to ``priority`` (0 = now)."""
+        self._refill()
+        now = self.clock()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        floor = 1.0 if priority == Priority.INTERACTIVE else 1.0 + self.reserve
+        if self.tokens >= floor:
+            return 0.0
+        return (floor - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1.0
+
+    def block(self, seconds: float) -> None:
+        """Refuse every request for ``seconds`` and drain the bucket."""
+        self._refill()
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+        self.tokens = 0.0
+
+
+class _Lane:
+    """Priority-ordered waiters of one bucket and the task that serves them."""
+
+    def __init__(self, bucket: TokenBucket) -> None:
+        self.bucket = bucket
+        self.waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self.pump: asyncio.Task[None] | None = None
+        self.wakeup = asyncio.Event()
+
+
+class RateLimiter:
+    """Registry of named buckets with priority-ordered waiting.
+
+    Buckets are created up front with :meth:`add_bucket` or lazily through
+    ``default_factory`` (called with the bucket name) on first use.
+    """
+
+    def __init__(self, default_factory: Callable[[str], TokenBucket] | None = None) -> None:
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lanes: dict[str, _Lane] = {}
+        self._default_factory = default_factory
+        self._seq = itertools.count()
+        self.waited: dict[str, float] = {}
+
+    @classmethod
+    def for_agenticagile(cls) -> RateLimiter:
+        """Limiter preloaded with the Trello token limit and Slack tiers.
+
+        A tenth of each bucket is reserved for interactive traffic.
+        """
+
+        def factory(name: str) -> TokenBucket:
+            if name.startswith("slack:special:"):
+                return TokenBucket(rate=1.0, capacity=3.0)
+            if name.startswith("slack:"):
+                tier = SLACK_METHOD_TIERS.get(name.removeprefix("slack:"), 3)
+                requests, seconds = SLACK_TIERS[tier if isinstance(tier, int) else 3]
+                return TokenBucket.per_window(requests, seconds, reserve=requests // 10)
+            if name.startswith("trello"):
+                requests, seconds = TRELLO_TOKEN_LIMIT
+                return TokenBucket.per_window(requests, seconds, reserve=requests // 10)
+            raise KeyError(f"unknown rate-limit bucket {name!r}")
+
+        return cls(default_factory=factory)
+
+    def add_bucket(self, name: str, bucket: TokenBucket) -> TokenBucket:
+        self._buckets[name] = bucket
+        return bucket
+
+    def bucket(self, name: str) -> TokenBucket:
+        try:
+            return self._buckets[name]
+        except KeyError:
+            if self._default_factory is None:
+                raise KeyError(f"unknown rate-limit bucket {name!r}") from None
+            return self._buckets.setdefault(name, self._default_factory(name))
+
+    def _lane(self, name: str) -> _Lane:
+        lane = self._lanes.get(name)
+        if lane is None:
+            lane = self._lanes[name] = _Lane(self.bucket(name))
+        return lane
+
+    async def acquire(self, name: str, priority: Priority | None = None) -> float:
+        """Wait for one token of bucket ``name``; returns seconds waited."""
+        priority = current_priority() if priority is None else priority
+        lane = self._lane(name)
+        if not lane.waiters and lane.bucket.delay(priority) == 0.0:
+            lane.bucket.take()
+            RATE_LIMIT_WAIT.observe(0.0, bucket=bucket_label(name))
+            return 0.0
+        started = time.monotonic()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(lane.waiters, (int(priority), next(self._seq), future))
+        lane.wakeup.set()
+        if lane.pump is None or lane.pump.done():
+            lane.pump = asyncio.create_task(self._pump(lane))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The token was granted just before cancellation; give it back.
+                lane.bucket.tokens += 1.0
+            raise
+        waited = time.monotonic() - started
+        self.waited[name] = self.waited.get(name, 0.0) + waited
+        RATE_LIMIT_WAIT.observe(waited, bucket=bucket_label(name))
+        return waited
+
+    async def _pump(self, lane: _Lane) -> None:
+        while lane.waiters:
+            priority, _, future = lane.waiters[0]
+            if future.done():
+                heapq.heappop(lane.waiters)
+                continue
+            delay = lane.bucket.delay(Priority(priority))
+            if delay > 0:
+                # Sleep until a token refills, but wake early if a more
+                # urgent waiter arrives or the bucket gets penalised.
+                lane.wakeup.clear()
+                try:
+                    await asyncio.wait_for(lane.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(lane.waiters)
+            lane.bucket.take()
+            future.set_result(None)
+
+    def penalize(self, name: str, retry_after: float | None, *, default: float = 1.0) -> None:
+        """Honour a ``Retry-After`` answer by pausing bucket ``name``."""
+        self.bucket(name).block(retry_after if retry_after is not None else default)
+        lane = self._lanes.get(name)
+        if lane is not None:
+            lane.wakeup.set()
+
+    async def call(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[T]],
+        *,
+        priority: Priority | None = None,
+        max_retries: int = 3,
+    ) -> T:
+        """Run ``func`` under bucket ``name``, retrying after HTTP 429.
+
+        Each :class:`RateLimitedError` pauses the bucket for the server's
+        ``Retry-After`` before the next attempt; the last one is re-raised.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(name, priority)
+            try:
+                return await func()
+            except RateLimitedError as exc:
+                self.penalize(name, exc.retry_after)
+                attempt += 1
+                if attempt > max_retries:
+                    raise
+                CALL_RETRIES.inc(service=bucket_label(name))
@@ -0,0 +1,394 @@
+"""Stale and at-risk card alerts, computed incrementally from the action feed.
+
+Instead of scanning every card every few minutes, :class:`RiskMonitor` keeps
+the few facts each card's risk depends on (last activity, when it entered its
+list, due date, assignees) and turns them into deadlines: the moment the card
+*would* become stale, stuck in its list, due soon or overdue if nothing else
+happens. Deadlines sit in one heap. A mirror change re-reads only the cards it
+touched and reschedules their deadlines; the monitor otherwise sleeps until
+the earliest deadline. Work is proportional to board activity, not board size.
+
+Alerts are edge-triggered: each one fires once when its threshold is crossed
+and re-arms only after the cause changes (the card sees activity, moves, or
+gets a new due date). Assignee load is kept as a running count of started
+cards per member and alerts when it goes above ``max_load``. Conditions
+already true when a board is first loaded are recorded silently, so starting
+the monitor does not flood channels.
+
+Usage::
+
+    monitor = RiskMonitor(mirror, {"T123": slack}, routes={board_id: ("T123", "C42")})
+    monitor.load()
+    await monitor.run()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+
+import aiohttp
+
+from agenticagile.board.mirror import BoardMirror, Card, MirrorChange
+from agenticagile.errors import AgenticAgileError
+from agenticagile.llm.context import parse_date
+from agenticagile.metrics.engine import DONE, STARTED, Workflow
+from agenticagile.ratelimit import Priority, request_priority
+from agenticagile.slack.blocks import escape, sections
+from agenticagile.slack.client import SlackClient
+
+logger = logging.getLogger(__name__)
+
+#: Alert kinds and how they read in Slack.
+KINDS = {
+    "stale": "no activity for {days:.0f} days",
+    "stuck": "in {list} for {days:.0f} days",
+    "due_soon": "due {when}",
+    "overdue": "overdue since {when}",
+    "overloaded": "has {load} cards in progress",
+}
+
+_LIST_ACTIONS = frozenset({"createList", "updateList", "moveListToBoard", "moveListFromBoard"})
+
+
+@dataclass
+class Thresholds:
+    """When a card or member counts as at risk.
+
+    Args:
+        stale_days: Days without activity on a card that is not done.
+        stuck_days: Days a started card may stay in the same list.
+        due_hours: Hours before the due date at which "due soon" fires.
+        max_load: Started cards one member may hold.
+    """
+
+    stale_days: float = 5.0
+    stuck_days: float = 4.0
+    due_hours: float = 48.0
+    max_load: int = 5
+
+
+@dataclass(frozen=True)
+class Alert:
+    """One crossed threshold; ``card_id`` is ``None`` for member alerts."""
+
+    kind: str
+    board_id: str
+    card_id: str | None
+    name: str
+    at: float
+    detail: dict[str, str | float] = field(default_factory=dict)
+
+    def text(self) -> str:
+        return f"{self.name}: {KINDS[self.kind].format(**self.detail)}"
+
+
+@dataclass
+class _Tracked:
+    board_id: str
+    list_id: str | None
+    name: str
+    started: bool
+    done: bool
+    activity: float | None
+    entered: float | None
+    due: float | None
+    members: tuple[str, ...]
+    generation: int = 0
+
+
+@dataclass
+class MonitorStats:
+    changes: int = 0
+    cards_read: int = 0
+    timers: int = 0
+    alerts: int = 0
+    sent: int = 0
+    failed: int = 0
+
+
+AlertSink = Callable[[Sequence[Alert]], Awaitable[None]]
+
+
+class RiskMonitor:
+    """Per-card risk timers kept current from mirror changes.
+
+    Args:
+        mirror: Board data; the monitor subscribes to its changes.
+        clients: Slack client per workspace (team id).
+        routes: ``(team_id, channel)`` to alert for each board; boards
+            without a route are tracked but not reported.
+        thresholds: What counts as at risk.
+        workflow: Which lists are started or done.
+        sink: Replaces Slack delivery, e.g. to collect alerts in tests.
+        max_wait: Longest sleep between two checks of the timer heap.
+    """
+
+    def __init__(
+        self,
+        mirror: BoardMirror,
+        clients: Mapping[str, SlackClient] | None = None,
+        *,
+        routes: Mapping[str, tuple[str, str]] | None = None,
+        thresholds: Thresholds | None = None,
+        workflow: Workflow | None = None,
+        sink: AlertSink | None = None,
+        max_wait: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.mirror = mirror
+        self.clients = clients or {}
+        self.routes = dict(routes or {})
+        self.thresholds = thresholds or Thresholds()
+        self.workflow = workflow or Workflow()
+        self.sink = sink
+        self.max_wait = max_wait
+        self.stats = MonitorStats()
+        self._clock = clock
+        self._cards: dict[str, _Tracked] = {}
+        self._lists: dict[str, tuple[str, int]] = {}
+        self._heap: list[tuple[float, int, str, str, int]] = []
+        self._seq = itertools.count()
+        self._fired: dict[tuple[str, str], float | None] = {}
+        self._load: Counter[str] = Counter()
+        self._overloaded: set[str] = set()
+        self._pending: list[Alert] = []
+        self._wake: asyncio.Event | None = None
+        self._unsubscribe = mirror.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    # -- state ------------------------------------------------------------
+
+    def load(self, board_ids: Iterable[str] | None = None) -> int:
+        """Start tracking boards; conditions already true are not alerted."""
+        count = 0
+        now = self._clock()
+        for board_id in board_ids if board_ids is not None else self.mirror.board_ids():
+            self._read_lists(board_id)
+            for card in self.mirror.cards(board_id=board_id):
+                self._update(card.id, card, now, silent=True)
+                count += 1
+        return count
+
+    def _on_change(self, change: MirrorChange) -> None:
+        self.stats.changes += 1
+        kinds = {action.get("type") for action in change.actions}
+        relist = change.board_ids if change.snapshot or kinds & _LIST_ACTIONS else set()
+        card_ids = set(change.card_ids)
+        for board_id in relist:
+            self._read_lists(board_id)
+            card_ids |= {card_id for card_id, tracked in self._cards.items() if tracked.board_id == board_id}
+        now = self._clock()
+        for card_id in card_ids:
+            # A snapshot bringing in a card for the first time is a load, not a crossing.
+            silent = change.snapshot and card_id not in self._cards
+            self._update(card_id, self.mirror.card(card_id), now, silent=silent)
+        if self._wake is not None:
+            self._wake.set()
+
+    def _read_lists(self, board_id: str) -> None:
+        for lst in self.mirror.lists(board_id, include_closed=True):
+            self._lists[lst["id"]] = (lst["name"], self.workflow.category(lst["name"]))
+
+    def _update(self, card_id: str, card: Card | None, now: float, *, silent: bool = False) -> None:
+        """Re-read one card's facts and reschedule its timers."""
+        self.stats.cards_read += 1
+        previous = self._cards.pop(card_id, None)
+        if card is None or card.closed:
+            self._shift_load(previous, None, now)
+            for kind in ("stale", "stuck", "due_soon", "overdue"):
+                self._fired.pop((card_id, kind), None)
+            return
+        if card.list_id is not None and card.list_id not in self._lists:
+            self._read_lists(card.board_id)
+        _, category = self._lists.get(card.list_id or "", ("", 0))
+        tracked = _Tracked(
+            board_id=card.board_id,
+            list_id=card.list_id,
+            name=card.name,
+            started=category == STARTED,
+            done=category == DONE,
+            activity=parse_date(card.last_activity),
+            entered=parse_date(card.list_entered_at),
+            due=None if card.due_complete else parse_date(card.due),
+            members=tuple(card.member_ids),
+            generation=next(self._seq),
+        )
+        self._cards[card_id] = tracked
+        self._shift_load(previous, tracked, now, silent=silent)
+        for kind, deadline, cause in self._deadlines(tracked):
+            key = (card_id, kind)
+            if key in self._fired and self._fired[key] == cause:
+                continue
+            self._fired.pop(key, None)
+            if deadline is None:
+                continue
+            if silent and deadline <= now:
+                self._fired[key] = cause
+                continue
+            heapq.heappush(self._heap, (deadline, next(self._seq), card_id, kind, tracked.generation))
+            self.stats.timers += 1
+        if len(self._heap) > 4 * len(self._cards) + 1024:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Drop timers of superseded card versions, which otherwise wait for their deadline."""
+        self._heap = [
+            entry
+            for entry in self._heap
+            if (tracked := self._cards.get(entry[2])) is not None and tracked.generation == entry[4]
+        ]
+        heapq.heapify(self._heap)
+
+    def _deadlines(self, card: _Tracked) -> list[tuple[str, float | None, float | None]]:
+        """``(kind, deadline, cause)``: an alert re-arms once its cause changes."""
+        t = self.thresholds
+        if card.done:
+            return [(kind, None, None) for kind in ("stale", "stuck", "due_soon", "overdue")]
+        stale = card.activity + t.stale_days * 86400 if card.activity is not None else None
+        stuck = card.entered + t.stuck_days * 86400 if card.started and card.entered is not None else None
+        soon = card.due - t.due_hours * 3600 if card.due is not None else None
+        return [
+            ("stale", stale, card.activity),
+            ("stuck", stuck, card.entered if stuck is not None else None),
+            ("due_soon", soon, card.due),
+            ("overdue", card.due, card.due),
+        ]
+
+    def _shift_load(
+        self, before: _Tracked | None, after: _Tracked | None, now: float, *, silent: bool = False
+    ) -> None:
+        """Apply one card's change to the member loads as a net change per member."""
+        card = after or before
+        if card is None:
+            return
+        delta: Counter[str] = Counter()
+        if before is not None and before.started:
+            delta.subtract(before.members)
+        if after is not None and after.started:
+            delta.update(after.members)
+        for member_id, change in delta.items():
+            if not change:
+                continue
+            self._load[member_id] += change
+            load = self._load[member_id]
+            if load > self.thresholds.max_load and member_id not in self._overloaded:
+                self._overloaded.add(member_id)
+                if not silent:
+                    self._emit(Alert("overloaded", card.board_id, None, self._member_name(member_id), now, {"load": load}))
+            elif load <= self.thresholds.max_load:
+                self._overloaded.discard(member_id)
+
+    def _member_name(self, member_id: str) -> str:
+        for member in self.mirror.members():
+            if member["id"] == member_id:
+                return member["full_name"] or member["username"] or member_id
+        return member_id
+
+    def _emit(self, alert: Alert) -> None:
+        self.stats.alerts += 1
+        self._pending.append(alert)
+
+    # -- timers -----------------------------------------------------------
+
+    def next_deadline(self) -> float | None:
+        """Earliest scheduled timer, stale entries included."""
+        return self._heap[0][0] if self._heap else None
+
+    def advance(self, now: float | None = None) -> list[Alert]:
+        """Fire every timer due by ``now``; returns the new alerts."""
+        now = self._clock() if now is None else now
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, card_id, kind, generation = heapq.heappop(self._heap)
+            tracked = self._cards.get(card_id)
+            if tracked is None or tracked.generation != generation:
+                continue
+            causes = {k: cause for k, _, cause in self._deadlines(tracked)}
+            key = (card_id, kind)
+            if key in self._fired:
+                continue
+            self._fired[key] = causes[kind]
+            if kind == "due_soon" and tracked.due is not None and tracked.due <= now:
+                continue  # already overdue; that alert says more
+            self._emit(Alert(kind, tracked.board_id, card_id, tracked.name, deadline, self._detail(tracked, kind, now)))
+        alerts, self._pending = self._pending, []
+        return alerts
+
+    def _detail(self, card: _Tracked, kind: str, now: float) -> dict[str, str | float]:
+        if kind == "stale":
+            return {"days": (now - (card.activity or now)) / 86400}
+        if kind == "stuck":
+            list_name = self._lists.get(card.list_id or "", ("?", 0))[0]
+            return {"days": (now - (card.entered or now)) / 86400, "list": list_name}
+        return {"when": time.strftime("%a %b %d %H:%M UTC", time.gmtime(card.due or now))}
+
+    # -- delivery ---------------------------------------------------------
+
+    async def send(self, alerts: Sequence[Alert]) -> None:
+        """Post alerts, one message per channel, at background priority.
+
+        Alerts that failed on a network error or in ``sink`` are kept and
+        returned again by the next :meth:`advance`; ones Slack rejected are
+        dropped.
+        """
+        if not alerts:
+            return
+        if self.sink is not None:
+            try:
+                await self.sink(alerts)
+            except Exception:
+                logger.exception("risk alert sink failed; keeping %d alerts", len(alerts))
+                self.stats.failed += len(alerts)
+                self._pending[:0] = alerts
+            return
+        by_route: dict[tuple[str, str], list[Alert]] = {}
+        for alert in alerts:
+            route = self.routes.get(alert.board_id)
+            if route is not None:
+                by_route.setdefault(route, []).append(alert)
+        with request_priority(Priority.BACKGROUND):
+            for (team_id, channel), group in by_route.items():
+                client = self.clients.get(team_id)
+                if client is None:
+                    logger.warning("no Slack client for workspace %s; dropping %d alerts", team_id, len(group))
+                    self.stats.failed += len(group)
+                    continue
+                lines = ["*Cards at risk*", *(f"• {escape(alert.text())}" for alert in group)]
+                text = "\n".join(lines)
+                blocks = sections(lines)
+                try:
+                    await client.post_message(channel, text, blocks=blocks)
+                except AgenticAgileError as exc:
+                    logger.warning("risk alert to %s/%s failed: %s", team_id, channel, exc)
+                    self.stats.failed += len(group)
+                    continue
+                except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                    logger.warning("risk alert to %s/%s failed, will retry: %r", team_id, channel, exc)
+                    self.stats.failed += len(group)
+                    self._pending[:0] = group
+                    continue
+                self.stats.sent += len(group)
+
+    async def run(self) -> None:
+        """Fire timers as they come due and on every mirror change, forever."""
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await self.send(self.advance())
+            except Exception:
+                logger.exception("risk monitor round failed")
+            deadline = self.next_deadline()
+            wait = self.max_wait if deadline is None else min(self.max_wait, max(0.0, deadline - self._clock()))
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,243 @@
+"""Sprint rollover as one bulk operation.
+
+Rolling a sprint over moves every unfinished card to the next sprint's list,
+relabels it (e.g. adds "carried over", drops "this sprint") and leaves a
+comment saying where it came from. :func:`plan_rollover` computes that as a
+diff against the local mirror, without any API call: cards already in the
+target list are not moved, labels already present are not added again, and
+cards that need no change at all are left out. :func:`execute_rollover`
+then applies the plan with bounded concurrency. The steps of one card (move,
+comment, labels) run in order and stop at its first failure; other cards
+carry on, and the :class:`RolloverReport` lists what failed and which steps
+did not happen. :func:`retry_plan` turns those into a plan to run again.
+Planning again from the mirror is not enough: a card whose move succeeded is
+already in the target list, so its comment would never be planned again.
+
+Usage::
+
+    plan = plan_rollover(mirror, board_id, "Sprint 13", add_labels=["carried over"])
+    report = await execute_rollover(trello, plan, concurrency=8)
+    if report.failed:
+        report = await execute_rollover(trello, retry_plan(plan, report))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+
+import aiohttp
+
+from agenticagile.board.mirror import BoardMirror
+from agenticagile.errors import AgenticAgileError
+from agenticagile.metrics.engine import DONE, Workflow
+from agenticagile.trello.client import TrelloClient
+
+logger = logging.getLogger(__name__)
+
+#: Gap between consecutive positions given to moved cards, as Trello uses.
+POS_STEP = 16384.0
+
+DEFAULT_COMMENT = "Rolled over to {target} (was in {source})."
+
+
+@dataclass
+class CardRollover:
+    """The changes planned for one card; ``None``/empty means unchanged."""
+
+    card_id: str
+    name: str
+    source_list: str
+    move_to: str | None = None
+    pos: float | None = None
+    add_labels: list[str] = field(default_factory=list)
+    remove_labels: list[str] = field(default_factory=list)
+    comment: str | None = None
+
+    def calls(self) -> int:
+        return (self.move_to is not None) + len(self.add_labels) + len(self.remove_labels) + (self.comment is not None)
+
+
+@dataclass
+class RolloverPlan:
+    board_id: str
+    target_list_id: str
+    target_list: str
+    cards: list[CardRollover] = field(default_factory=list)
+    unchanged: int = 0
+
+    def calls(self) -> int:
+        """API calls the plan will make."""
+        return sum(card.calls() for card in self.cards)
+
+
+@dataclass
+class RolloverReport:
+    """Outcome of :func:`execute_rollover`.
+
+    ``failed`` maps card ids to the error of their first failed step; the
+    steps before it (listed in ``completed``) did happen, the failed step and
+    those after it are listed in ``remaining``.
+    """
+
+    succeeded: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    completed: dict[str, list[str]] = field(default_factory=dict)
+    remaining: dict[str, list[str]] = field(default_factory=dict)
+    calls: int = 0
+    seconds: float = 0.0
+
+
+def _label_ids(mirror: BoardMirror, board_id: str, names: Iterable[str]) -> list[str]:
+    by_name = {label["name"].lower(): label["id"] for label in mirror.labels(board_id)}
+    ids = []
+    for name in names:
+        label_id = by_name.get(name.lower())
+        if label_id is None:
+            raise AgenticAgileError(f"board {board_id} has no label named {name!r}")
+        ids.append(label_id)
+    return ids
+
+
+def plan_rollover(
+    mirror: BoardMirror,
+    board_id: str,
+    target_list: str,
+    *,
+    from_lists: Iterable[str] | None = None,
+    add_labels: Iterable[str] = (),
+    remove_labels: Iterable[str] = (),
+    comment: str | None = DEFAULT_COMMENT,
+    workflow: Workflow | None = None,
+) -> RolloverPlan:
+    """Diff the board in ``mirror`` against its rolled-over state.
+
+    Args:
+        board_id: Board to roll over.
+        target_list: Name of the next sprint's list.
+        from_lists: Names of the lists whose cards roll over. Defaults to every
+            open list that is not done (per ``workflow``) nor the target.
+        add_labels, remove_labels: Label names to set and clear on the
+            rolled-over cards; they must exist on the board.
+        comment: Comment posted on each moved card, formatted with
+            ``target``, ``source`` and ``card``; ``None`` posts none.
+
+    Raises:
+        AgenticAgileError: The target list or a label does not exist.
+    """
+    workflow = workflow or Workflow()
+    target = mirror.find_list(board_id, target_list)
+    if target is None:
+        raise AgenticAgileError(f"board {board_id} has no open list named {target_list!r}")
+    lists = {lst["id"]: lst for lst in mirror.lists(board_id)}
+    if from_lists is None:
+        sources = {
+            list_id
+            for list_id, lst in lists.items()
+            if list_id != target["id"] and workflow.category(lst["name"]) != DONE
+        }
+    else:
+        wanted = {name.lower() for name in from_lists}
+        sources = {list_id for list_id, lst in lists.items() if lst["name"].lower() in wanted}
+    add = _label_ids(mirror, board_id, add_labels)
+    remove = _label_ids(mirror, board_id, remove_labels)
+
+    plan = RolloverPlan(board_id, target["id"], target["name"])
+    target_cards = mirror.cards(list_id=target["id"])
+    pos = max((card.pos for card in target_cards), default=0.0)
+    # Cards already in the target list only get their labels fixed.
+    candidates = [card for card in target_cards if add or remove]
+    for list_id in sorted(sources, key=lambda i: lists[i]["pos"]):
+        candidates += mirror.cards(list_id=list_id)
+    for card in candidates:
+        labels = set(card.label_ids)
+        step = CardRollover(
+            card.id,
+            card.name,
+            lists[card.list_id]["name"] if card.list_id in lists else "",
+            add_labels=[label for label in add if label not in labels],
+            remove_labels=[label for label in remove if label in labels],
+        )
+        if card.list_id != target["id"]:
+            pos += POS_STEP
+            step.move_to, step.pos = target["id"], pos
+            if comment:
+                step.comment = comment.format(target=target["name"], source=step.source_list, card=card.name)
+        if step.calls():
+            plan.cards.append(step)
+        else:
+            plan.unchanged += 1
+    return plan
+
+
+async def execute_rollover(
+    client: TrelloClient,
+    plan: RolloverPlan,
+    *,
+    concurrency: int = 8,
+    clock: Callable[[], float] = time.monotonic,
+) -> RolloverReport:
+    """Apply ``plan``, at most ``concurrency`` cards at a time.
+
+    Failures are collected per card instead of raised.
+    """
+    report = RolloverReport()
+    semaphore = asyncio.Semaphore(concurrency)
+    started = clock()
+
+    async def roll(card: CardRollover) -> None:
+        done: list[str] = []
+        path = f"/cards/{card.card_id}"
+        steps: list[tuple[str, Callable[[], Awaitable[object]]]] = []
+        if card.move_to is not None:
+            steps.append(("move", lambda: client.put(path, json={"idList": card.move_to, "pos": card.pos})))
+        if card.comment is not None:
+            steps.append(("comment", lambda: client.post(f"{path}/actions/comments", json={"text": card.comment})))
+        for label_id in card.add_labels:
+            steps.append((f"label+{label_id}", lambda l=label_id: client.post(f"{path}/idLabels", json={"value": l})))
+        for label_id in card.remove_labels:
+            steps.append((f"label-{label_id}", lambda l=label_id: client.delete(f"{path}/idLabels/{l}")))
+        async with semaphore:
+            for name, call in steps:
+                report.calls += 1
+                try:
+                    await call()
+                except (AgenticAgileError, aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                    logger.warning("rollover of card %s failed at %s: %s", card.card_id, name, exc)
+                    report.failed[card.card_id] = f"{name}: {exc}"
+                    report.remaining[card.card_id] = [step for step, _ in steps[len(done) :]]
+                    break
+                done.append(name)
+            else:
+                report.succeeded.append(card.card_id)
+        report.completed[card.card_id] = done
+
+    await asyncio.gather(*(roll(card) for card in plan.cards))
+    report.seconds = clock() - started
+    return report
+
+
+def retry_plan(plan: RolloverPlan, report: RolloverReport) -> RolloverPlan:
+    """The steps of ``plan`` that ``report`` lists as remaining, as a new plan."""
+    retry = RolloverPlan(plan.board_id, plan.target_list_id, plan.target_list)
+    for card in plan.cards:
+        remaining = set(report.remaining.get(card.card_id, ()))
+        if not remaining:
+            continue
+        move = "move" in remaining
+        retry.cards.append(
+            CardRollover(
+                card.card_id,
+                card.name,
+                card.source_list,
+                move_to=card.move_to if move else None,
+                pos=card.pos if move else None,
+                add_labels=[label for label in card.add_labels if f"label+{label}" in remaining],
+                remove_labels=[label for label in card.remove_labels if f"label-{label}" in remaining],
+                comment=card.comment if "comment" in remaining else None,
+            )
+        )
+    return retry
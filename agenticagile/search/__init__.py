@@ -0,0 +1,6 @@
+"""Semantic search over mirrored cards: embedders and an incremental vector index."""
+
+from agenticagile.search.embedders import Embedder, HashingEmbedder
+from agenticagile.search.index import CardIndexer, Hit, VectorIndex
+
+__all__ = ["CardIndexer", "Embedder", "HashingEmbedder", "Hit", "VectorIndex"]
@@ -0,0 +1,74 @@
+"""Text embedders for the card vector index.
+
+Any object with a ``dim`` attribute and an ``embed`` method returning one
+L2-normalised row per text can back the index. :class:`HashingEmbedder` is a
+deterministic, dependency-free embedder used offline and in tests; production
+deployments plug in a model-backed embedder with the same interface.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Protocol, runtime_checkable
+
+import numpy as np
+
+_TOKENS = re.compile(r"[a-z0-9]+")
+
+
+@runtime_checkable
+class Embedder(Protocol):
+    """Maps texts to unit-length vectors of size ``dim``."""
+
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a ``(len(texts), dim)`` float32 array of unit vectors."""
+        ...
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder over words, word bigrams and character trigrams.
+
+    Similar wording yields similar vectors, which is enough to find duplicate
+    bug reports offline. The output depends only on the input text, so it is
+    stable across processes and machines.
+    """
+
+    def __init__(self, dim: int = 256) -> None:
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        words = _TOKENS.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            features += ["3:" + padded[i : i + 3] for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            slots = [_slot(feature, self.dim) for feature in self._features(text)]
+            if slots:
+                columns, values = zip(*slots)
+                np.add.at(matrix[row], list(columns), list(values))
+        return normalize_rows(matrix)
+
+
+@lru_cache(maxsize=200_000)
+def _slot(feature: str, dim: int) -> tuple[int, float]:
+    """Column and signed weight of ``feature``; card vocabularies repeat a lot."""
+    value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+    # Whole words weigh more than the trigrams they contain.
+    weight = 0.5 if feature.startswith("3:") else 1.0
+    return value % dim, weight if value >> 63 else -weight
@@ -0,0 +1,282 @@
+"""Incrementally maintained vector index over mirrored Trello content.
+
+:class:`VectorIndex` is a brute-force cosine index: one contiguous float32
+matrix searched with a single matrix-vector product, which answers in a few
+milliseconds for tens of thousands of cards. Rows are added, replaced and
+removed in place, and the index can be saved to and memory-mapped from disk.
+
+:class:`CardIndexer` subscribes to the :class:`BoardMirror` and re-embeds only
+the cards whose text actually changed.
+
+Usage::
+
+    indexer = CardIndexer(mirror, HashingEmbedder())
+    for board_id in mirror.board_ids():
+        indexer.refresh_board(board_id)
+    indexer.similar_cards(card_id)  # likely duplicates
+    builder = ContextBuilder(mirror, semantic=indexer.semantic_scorer)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from agenticagile.board.mirror import BoardMirror, Card, MirrorChange
+from agenticagile.search.embedders import Embedder
+
+
+@dataclass(frozen=True)
+class Hit:
+    id: str
+    score: float
+
+
+class VectorIndex:
+    """Cosine-similarity index of unit vectors keyed by string ids."""
+
+    def __init__(self, dim: int, *, capacity: int = 1024) -> None:
+        self.dim = dim
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self.fingerprints: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._matrix[: len(self._ids)]
+
+    def _grow(self, needed: int) -> None:
+        if needed <= self._matrix.shape[0]:
+            return
+        capacity = max(needed, self._matrix.shape[0] * 2)
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[: len(self._ids)] = self.vectors
+        self._matrix = grown
+
+    def upsert(self, ids: Sequence[str], vectors: np.ndarray, fingerprints: Sequence[str] | None = None) -> None:
+        """Insert or replace the vectors of ``ids``."""
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"expected {(len(ids), self.dim)} vectors, got {vectors.shape}")
+        new = [item for item in dict.fromkeys(ids) if item not in self._rows]
+        self._grow(len(self._ids) + len(new))
+        if not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix)
+        for item in new:
+            self._rows[item] = len(self._ids)
+            self._ids.append(item)
+        rows = [self._rows[item] for item in ids]
+        self._matrix[rows] = vectors
+        if fingerprints is not None:
+            self.fingerprints.update(zip(ids, fingerprints))
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Drop ``ids`` by moving the last row into each freed slot."""
+        if not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix)
+        for item in ids:
+            row = self._rows.pop(item, None)
+            self.fingerprints.pop(item, None)
+            if row is None:
+                continue
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._ids.pop()
+
+    def vector(self, item: str) -> np.ndarray:
+        return self._matrix[self._rows[item]]
+
+    def search(
+        self,
+        query: np.ndarray,
+        *,
+        k: int = 10,
+        min_score: float = -1.0,
+        among: Iterable[str] | None = None,
+        exclude: Iterable[str] = (),
+    ) -> list[Hit]:
+        """Return up to ``k`` ids most similar to the unit vector ``query``."""
+        if not self._ids:
+            return []
+        if among is not None:
+            rows = np.fromiter((self._rows[i] for i in among if i in self._rows), dtype=np.int64)
+        else:
+            rows = np.arange(len(self._ids))
+        if rows.size == 0:
+            return []
+        scores = self._matrix[rows] @ query.astype(np.float32, copy=False)
+        excluded = {self._rows[i] for i in exclude if i in self._rows}
+        take = min(rows.size, k + len(excluded))
+        top = np.argpartition(-scores, take - 1)[:take] if take < rows.size else np.arange(rows.size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        hits = []
+        for position in top:
+            row = int(rows[position])
+            score = float(scores[position])
+            if row in excluded or score < min_score:
+                continue
+            hits.append(Hit(self._ids[row], score))
+            if len(hits) == k:
+                break
+        return hits
+
+    def scores(self, query: np.ndarray, ids: Iterable[str]) -> dict[str, float]:
+        """Similarity of ``query`` to each of ``ids`` that is indexed."""
+        present = [i for i in ids if i in self._rows]
+        if not present:
+            return {}
+        values = self._matrix[[self._rows[i] for i in present]] @ query.astype(np.float32, copy=False)
+        return dict(zip(present, values.tolist()))
+
+    def save(self, path: str | Path) -> None:
+        """Write the index as ``<path>.npy`` (vectors) and ``<path>.json`` (ids)."""
+        path = Path(path)
+        np.save(path.with_suffix(".npy"), self.vectors)
+        meta = {"dim": self.dim, "ids": self._ids, "fingerprints": self.fingerprints}
+        path.with_suffix(".json").write_text(json.dumps(meta))
+
+    @classmethod
+    def load(cls, path: str | Path, *, mmap: bool = True) -> VectorIndex:
+        """Load an index written by :meth:`save`, memory-mapping the vectors.
+
+        A memory-mapped index is copied into memory on its first write.
+        """
+        path = Path(path)
+        meta = json.loads(path.with_suffix(".json").read_text())
+        index = cls(meta["dim"], capacity=1)
+        index._matrix = np.load(path.with_suffix(".npy"), mmap_mode="r" if mmap else None)
+        index._ids = list(meta["ids"])
+        index._rows = {item: row for row, item in enumerate(index._ids)}
+        index.fingerprints = dict(meta.get("fingerprints", {}))
+        return index
+
+
+def card_document(card: Card, comments: Sequence[Mapping[str, str]] = ()) -> str:
+    """Text embedded for a card: title, description and recent comments."""
+    parts = [card.name, card.name, card.desc]  # the title counts double
+    parts += [comment["text"] for comment in comments]
+    return "\n".join(part for part in parts if part)
+
+
+class CardIndexer:
+    """Keep a :class:`VectorIndex` in step with the cards of a mirror.
+
+    Args:
+        mirror: Source of cards; the indexer subscribes to its changes.
+        embedder: Embedder producing the vectors.
+        index: Index to maintain; a new one is created when omitted.
+        comments_per_card: Latest comments included in each card's text.
+        batch_size: Texts embedded per ``embed`` call.
+    """
+
+    def __init__(
+        self,
+        mirror: BoardMirror,
+        embedder: Embedder,
+        index: VectorIndex | None = None,
+        *,
+        comments_per_card: int = 5,
+        batch_size: int = 256,
+    ) -> None:
+        self.mirror = mirror
+        self.embedder = embedder
+        self.index = index or VectorIndex(embedder.dim)
+        self.comments_per_card = comments_per_card
+        self.batch_size = batch_size
+        self.embedded = 0
+        self._board_of: dict[str, str] = {}
+        self._unsubscribe = mirror.subscribe(self._on_change)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def _on_change(self, change: MirrorChange) -> None:
+        if change.snapshot:
+            for board_id in change.board_ids:
+                self.refresh_board(board_id)
+        elif change.card_ids:
+            self.refresh(change.card_ids)
+
+    def refresh_board(self, board_id: str) -> int:
+        """Re-index a whole board; only changed cards are re-embedded."""
+        cards = self.mirror.cards(board_id=board_id, include_closed=True)
+        current = {card.id for card in cards}
+        known = {item for item, board in self._board_of.items() if board == board_id}
+        self.index.remove(known - current)
+        for item in known - current:
+            del self._board_of[item]
+        return self._index_cards(cards, self.mirror.board_comments(board_id, per_card=self.comments_per_card))
+
+    def refresh(self, card_ids: Iterable[str]) -> int:
+        """Re-index specific cards (removing those no longer in the mirror)."""
+        cards: list[Card] = []
+        gone: list[str] = []
+        comments: dict[str, list[dict[str, str]]] = {}
+        for card_id in set(card_ids):
+            card = self.mirror.card(card_id)
+            if card is None:
+                gone.append(card_id)
+                continue
+            cards.append(card)
+            comments[card_id] = self.mirror.comments(card_id, limit=self.comments_per_card)
+        self.index.remove(gone)
+        for card_id in gone:
+            self._board_of.pop(card_id, None)
+        return self._index_cards(cards, comments)
+
+    def _index_cards(self, cards: Sequence[Card], comments: Mapping[str, Sequence[Mapping[str, str]]]) -> int:
+        changed: list[tuple[str, str, str]] = []
+        for card in cards:
+            self._board_of[card.id] = card.board_id
+            if card.closed:
+                self.index.remove([card.id])
+                continue
+            text = card_document(card, comments.get(card.id, ()))
+            fingerprint = hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+            if self.index.fingerprints.get(card.id) != fingerprint:
+                changed.append((card.id, text, fingerprint))
+        for start in range(0, len(changed), self.batch_size):
+            chunk = changed[start : start + self.batch_size]
+            vectors = self.embedder.embed([text for _, text, _ in chunk])
+            self.index.upsert([c[0] for c in chunk], vectors, [c[2] for c in chunk])
+        self.embedded += len(changed)
+        return len(changed)
+
+    # -- queries ----------------------------------------------------------
+
+    def search(self, text: str, *, k: int = 10, board_ids: Iterable[str] | None = None, min_score: float = 0.0) -> list[Hit]:
+        """Cards related to free text ``text``."""
+        query = self.embedder.embed([text])[0]
+        among = None
+        if board_ids is not None:
+            boards = set(board_ids)
+            among = [item for item, board in self._board_of.items() if board in boards]
+        return self.index.search(query, k=k, among=among, min_score=min_score)
+
+    def similar_cards(self, card_id: str, *, k: int = 5, min_score: float = 0.4) -> list[Hit]:
+        """Likely duplicates of ``card_id`` across all indexed boards."""
+        if card_id not in self.index:
+            self.refresh([card_id])
+        if card_id not in self.index:
+            return []
+        return self.index.search(self.index.vector(card_id), k=k, min_score=min_score, exclude=[card_id])
+
+    def semantic_scorer(self, query: str, card_ids: Sequence[str]) -> dict[str, float]:
+        """:data:`~agenticagile.llm.context.SemanticScorer` backed by this index."""
+        scores = self.index.scores(self.embedder.embed([query])[0], card_ids)
+        return {card_id: max(0.0, score) for card_id, score in scores.items()}
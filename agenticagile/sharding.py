@@ -0,0 +1,319 @@
+"""Spread boards and Slack workspaces over several worker processes.
+
+Every worker heartbeats into a shared :class:`LeaseStore` (SQLite in WAL
+mode, so any number of local processes can use it). From the set of live
+workers each one builds the same :class:`HashRing`, which assigns every key
+(``"board:<id>"``, ``"team:<id>"``) to exactly one worker. Ownership is only
+*taken* through a lease, though. When the ring changes, the old owner
+releases the keys it lost on its next tick, and the new owner acquires them
+once they are free. Two workers therefore never serve the same board, even
+while they disagree about membership. A crashed worker's leases simply
+expire after ``ttl`` seconds.
+
+Each lease carries a fencing token that grows with every change of owner, so
+a worker that stalled past its lease can detect that with :meth:`LeaseStore.holds`.
+
+Usage::
+
+    async def serve(worker_id: str) -> None:
+        coordinator = ShardCoordinator(
+            LeaseStore("var/leases.sqlite"), worker_id, keys=all_keys,
+            on_acquire=start_board, on_release=stop_board,
+        )
+        await coordinator.run()
+
+    processes = spawn_workers(4, "var/leases.sqlite", main)  # main(worker_id) per process
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT,
+    expires REAL NOT NULL DEFAULT 0,
+    token INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS leases_owner ON leases (owner);
+"""
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes.
+
+    Adding or removing one of ``n`` workers moves only about ``1/n`` of the
+    keys.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), *, vnodes: int = 64) -> None:
+        self.vnodes = vnodes
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        self.nodes: set[str] = set()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str) -> None:
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for replica in range(self.vnodes):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def owner(self, key: str) -> str | None:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class LeaseStore:
+    """Worker membership and key leases shared by local processes.
+
+    Args:
+        path: SQLite database file shared by all workers.
+    """
+
+    def __init__(self, path: str | Path, *, clock: Callable[[], float] = time.time) -> None:
+        self.path = str(path)
+        self._clock = clock
+        self.conn = sqlite3.connect(self.path, isolation_level=None, timeout=30.0, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE takes the write lock up front, so read-check-write is atomic
+        # across processes.
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def heartbeat(self, worker_id: str, ttl: float) -> None:
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO workers (worker_id, expires) VALUES (?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET expires = excluded.expires",
+                (worker_id, self._clock() + ttl),
+            )
+
+    def leave(self, worker_id: str) -> None:
+        """Deregister ``worker_id`` and free all its leases."""
+        with self._write() as conn:
+            conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+            conn.execute("UPDATE leases SET owner = NULL, expires = 0 WHERE owner = ?", (worker_id,))
+
+    def live_workers(self) -> list[str]:
+        rows = self.conn.execute("SELECT worker_id FROM workers WHERE expires > ? ORDER BY worker_id", (self._clock(),))
+        return [row[0] for row in rows]
+
+    def acquire(self, keys: Iterable[str], worker_id: str, ttl: float) -> dict[str, int]:
+        """Take the free or expired leases among ``keys`` and renew those already held.
+
+        Returns:
+            Fencing token per key now held by ``worker_id``.
+        """
+        now = self._clock()
+        held: dict[str, int] = {}
+        with self._write() as conn:
+            for key in keys:
+                conn.execute("INSERT OR IGNORE INTO leases (key) VALUES (?)", (key,))
+                owner, expires, token = conn.execute(
+                    "SELECT owner, expires, token FROM leases WHERE key = ?", (key,)
+                ).fetchone()
+                if owner == worker_id:
+                    conn.execute("UPDATE leases SET expires = ? WHERE key = ?", (now + ttl, key))
+                elif owner is None or expires <= now:
+                    token += 1
+                    conn.execute(
+                        "UPDATE leases SET owner = ?, expires = ?, token = ? WHERE key = ?",
+                        (worker_id, now + ttl, token, key),
+                    )
+                else:
+                    continue
+                held[key] = token
+        return held
+
+    def release(self, keys: Iterable[str], worker_id: str) -> None:
+        with self._write() as conn:
+            conn.executemany(
+                "UPDATE leases SET owner = NULL, expires = 0 WHERE key = ? AND owner = ?",
+                [(key, worker_id) for key in keys],
+            )
+
+    def holds(self, key: str, worker_id: str, token: int) -> bool:
+        """Whether ``worker_id`` still holds ``key`` under fencing ``token``."""
+        row = self.conn.execute("SELECT owner, expires, token FROM leases WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] == worker_id and row[2] == token and row[1] > self._clock()
+
+    def owners(self) -> dict[str, str]:
+        """Current owner of every leased key."""
+        rows = self.conn.execute("SELECT key, owner FROM leases WHERE owner IS NOT NULL AND expires > ?", (self._clock(),))
+        return dict(rows.fetchall())
+
+
+KeyCallback = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class ShardState:
+    """Keys a worker currently serves, with their fencing tokens."""
+
+    held: dict[str, int] = field(default_factory=dict)
+    ring_size: int = 0
+
+
+class ShardCoordinator:
+    """Keep one worker's share of the keys leased and served.
+
+    Args:
+        store: Shared lease store.
+        worker_id: Unique id of this worker.
+        keys: All keys to distribute, or a callable returning them (read each tick).
+        on_acquire: Awaited when this worker starts owning a key.
+        on_release: Awaited when it stops owning a key.
+        ttl: Lease and heartbeat lifetime in seconds.
+        interval: Seconds between ticks; keep well below ``ttl``.
+    """
+
+    def __init__(
+        self,
+        store: LeaseStore,
+        worker_id: str,
+        keys: Iterable[str] | Callable[[], Iterable[str]],
+        *,
+        on_acquire: KeyCallback | None = None,
+        on_release: KeyCallback | None = None,
+        ttl: float = 15.0,
+        interval: float = 3.0,
+        vnodes: int = 64,
+    ) -> None:
+        self.store = store
+        self.worker_id = worker_id
+        self._keys = keys
+        self.on_acquire = on_acquire
+        self.on_release = on_release
+        self.ttl = ttl
+        self.interval = interval
+        self.vnodes = vnodes
+        self.state = ShardState()
+        self._stopping = asyncio.Event()
+
+    def keys(self) -> list[str]:
+        return list(self._keys() if callable(self._keys) else self._keys)
+
+    async def tick(self) -> ShardState:
+        """Heartbeat, release keys that moved away, acquire keys that moved here."""
+        store = self.store
+        await asyncio.to_thread(store.heartbeat, self.worker_id, self.ttl)
+        live = await asyncio.to_thread(store.live_workers)
+        ring = HashRing(live, vnodes=self.vnodes)
+        wanted = {key for key in self.keys() if ring.owner(key) == self.worker_id}
+        lost = [key for key in self.state.held if key not in wanted]
+        for key in lost:
+            await self._call(self.on_release, key)
+            del self.state.held[key]
+        if lost:
+            await asyncio.to_thread(store.release, lost, self.worker_id)
+        held = await asyncio.to_thread(store.acquire, sorted(wanted), self.worker_id, self.ttl)
+        for key in [k for k in self.state.held if k not in held]:
+            # Our lease expired and someone else took the key.
+            logger.warning("worker %s lost lease on %s", self.worker_id, key)
+            del self.state.held[key]
+            await self._call(self.on_release, key)
+        for key, token in held.items():
+            if key not in self.state.held:
+                self.state.held[key] = token
+                await self._call(self.on_acquire, key)
+            self.state.held[key] = token
+        self.state.ring_size = len(live)
+        return self.state
+
+    async def _call(self, callback: KeyCallback | None, key: str) -> None:
+        if callback is None:
+            return
+        try:
+            await callback(key)
+        except Exception:  # noqa: BLE001 - one failing board must not stop the worker
+            logger.exception("shard callback failed for %s", key)
+
+    async def run(self) -> None:
+        """Tick until :meth:`stop`, then hand every key back."""
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await self.tick()
+                except sqlite3.Error as exc:
+                    logger.warning("lease store unavailable: %s", exc)
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for key in list(self.state.held):
+                await self._call(self.on_release, key)
+            self.state.held.clear()
+            await asyncio.to_thread(self.store.leave, self.worker_id)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+def spawn_workers(
+    count: int, store_path: str | Path, main: Callable[[str, str], None], *, prefix: str = "worker"
+) -> list[multiprocessing.Process]:
+    """Start ``count`` processes running ``main(worker_id, store_path)``.
+
+    ``main`` must be importable (a module-level function) because workers are
+    started with the ``spawn`` method.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(count):
+        worker_id = f"{prefix}-{index}-{os.getpid()}"
+        process = context.Process(target=main, args=(worker_id, str(store_path)), name=worker_id, daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
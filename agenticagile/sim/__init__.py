@@ -0,0 +1,7 @@
+"""Offline simulation: fake Trello and Slack with faults, and a load benchmark."""
+
+from agenticagile.sim.faults import Faults
+from agenticagile.sim.slack import FakeSlack
+from agenticagile.sim.trello import ActionStream, FakeTrello, populate
+
+__all__ = ["ActionStream", "FakeSlack", "FakeTrello", "Faults", "populate"]
@@ -0,0 +1,428 @@
+"""Replay a day of traffic through AgenticAgile against the local fakes.
+
+:func:`synthesize_day` produces a recorded-traffic list: Slack messages to
+the agent and Trello board activity, timestamped over a working day. It can be
+saved to and loaded from JSON lines, so a run can be repeated on the same
+traffic. :class:`Benchmark` builds the full stack against
+:class:`~agenticagile.sim.trello.FakeTrello` and
+:class:`~agenticagile.sim.slack.FakeSlack`. That stack is the Events API
+endpoint, the dispatcher, the mirror kept current by webhooks, the tool
+executor and a model. The benchmark then replays the traffic open-loop,
+compressed by ``speed``, and reports:
+
+* reply latency (p50, p90, p99) from sending an event to the first message
+  in its thread,
+* Trello and Slack API calls per Slack event,
+* injected 429s and unanswered events.
+
+The default handler (:func:`reference_handler`) answers with tool calls over
+the mirror and one model call; with ``fast_path=True`` it first tries the
+:class:`~agenticagile.agent.router.FastPath`. Pass another ``handler_factory``
+to measure a different agent. From the shell::
+
+    python -m agenticagile.sim.bench --messages 300 --speed 600 --llm-latency 0.8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from aiohttp import web
+
+from agenticagile.agent.router import FastPath
+from agenticagile.agent.tools import ToolCall, ToolExecutor, board_tools
+from agenticagile.board.mirror import BoardMirror
+from agenticagile.board.sync import MirrorSync
+from agenticagile.board.webhooks import TrelloChangeFeed, ensure_webhooks, make_webhook_app
+from agenticagile.llm.base import LLM, Message
+from agenticagile.ratelimit import RateLimiter
+from agenticagile.sim.faults import Faults
+from agenticagile.sim.slack import FakeSlack
+from agenticagile.sim.trello import ActionStream, FakeTrello, populate
+from agenticagile.slack.client import SlackClient
+from agenticagile.slack.dispatch import EventDispatcher, EventHandler
+from agenticagile.slack.events import make_events_app
+from agenticagile.trello.client import TrelloClient
+from agenticagile.trello.stub import TrelloStub
+
+SIGNING_SECRET = "sim-signing-secret"
+WEBHOOK_SECRET = "stub-secret"
+
+PROMPTS = (
+    "what is blocked?",
+    "standup please",
+    "sprint status",
+    "who is working on the login bug?",
+    "summarize what changed today",
+    "anything stuck in review?",
+    "how many cards are left in the sprint?",
+)
+
+TRELLO_KINDS = ("move", "comment", "label", "create", "update")
+
+
+# -- traffic --------------------------------------------------------------
+
+
+def synthesize_day(
+    *,
+    messages: int = 300,
+    trello_actions: int = 2000,
+    channels: int = 3,
+    hours: float = 9.0,
+    seed: int | None = None,
+) -> list[dict[str, Any]]:
+    """A working day of traffic, sorted by ``at`` (seconds from the start).
+
+    Slack messages cluster around the morning standup and early afternoon;
+    board activity is spread over the day. Each item is either
+    ``{"kind": "message", "channel", "text", "user"}`` or
+    ``{"kind": "trello", "board", "action"}`` where ``board`` indexes the
+    simulated boards.
+    """
+    rng = random.Random(seed)
+    span = hours * 3600
+    traffic: list[dict[str, Any]] = []
+    for _ in range(messages):
+        peak = rng.choice((0.05, 0.5, rng.random()))
+        at = min(span, max(0.0, rng.gauss(peak * span, span * 0.06)))
+        traffic.append(
+            {
+                "at": round(at, 3),
+                "kind": "message",
+                "channel": f"C{rng.randrange(channels) + 1}",
+                "text": rng.choice(PROMPTS),
+                "user": f"U{rng.randrange(8) + 1:04d}",
+            }
+        )
+    for _ in range(trello_actions):
+        traffic.append(
+            {
+                "at": round(rng.uniform(0, span), 3),
+                "kind": "trello",
+                "board": rng.randrange(channels),
+                "action": rng.choices(TRELLO_KINDS, (4, 4, 2, 1, 1))[0],
+            }
+        )
+    traffic.sort(key=lambda item: item["at"])
+    return traffic
+
+
+def save_traffic(path: str | Path, traffic: Iterable[dict[str, Any]]) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        for item in traffic:
+            handle.write(json.dumps(item, separators=(",", ":")) + "\n")
+
+
+def load_traffic(path: str | Path) -> list[dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        return sorted((json.loads(line) for line in handle if line.strip()), key=lambda item: item["at"])
+
+
+# -- system under test ----------------------------------------------------
+
+
+class FakeLLM:
+    """Model stand-in with lognormal latency; replies with a canned summary."""
+
+    def __init__(self, *, latency: float = 0.0, jitter: float = 0.3, model: str = "fake", seed: int | None = None) -> None:
+        self.model = model
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def _delay(self) -> float:
+        return self.latency * self._random.lognormvariate(0.0, self.jitter) if self.latency > 0 else 0.0
+
+    async def complete(self, messages: Sequence[Message], **params: Any) -> str:
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        return f"Here is what I found ({len(messages[-1].get('content', ''))} chars of context)."
+
+    async def stream(self, messages: Sequence[Message], **params: Any) -> AsyncIterator[str]:
+        reply = await self.complete(messages, **params)
+        for word in reply.split(" "):
+            yield word + " "
+
+
+@dataclass
+class Stack:
+    """The running components a handler may use."""
+
+    trello: TrelloClient
+    slack: SlackClient
+    mirror: BoardMirror
+    executor: ToolExecutor
+    llm: LLM
+    channel_boards: dict[str, str]
+    fast: FastPath | None = None
+
+
+def reference_handler(stack: Stack) -> EventHandler:
+    """Answer messages with tool calls over the mirror and one model call, in thread."""
+
+    async def handle(envelope: dict[str, Any]) -> None:
+        event = envelope.get("event") or {}
+        if event.get("type") != "message" or event.get("bot_id") or event.get("subtype"):
+            return
+        board_id = stack.channel_boards.get(event.get("channel", ""))
+        if board_id is None:
+            return
+        thread_ts = event.get("thread_ts") or event["ts"]
+        if stack.fast is not None:
+            answer = await stack.fast.answer(event.get("text", ""), board_id=board_id, key=envelope.get("event_id"))
+            if answer is not None:
+                await stack.slack.post_message(
+                    event["channel"], answer.text, blocks=answer.blocks or None, thread_ts=thread_ts
+                )
+                return
+        text = event.get("text", "").lower()
+        calls = [ToolCall("counts", "list_counts", {"board_id": board_id})]
+        if "block" in text or "stuck" in text or "standup" in text:
+            calls.append(ToolCall("blocked", "blocked_cards", {"board_id": board_id}))
+        if "who" in text or "standup" in text:
+            calls.append(ToolCall("members", "members", {"board_id": board_id}))
+        results = await stack.executor.run(calls, turn=event["ts"])
+        context = json.dumps({r.call_id: r.value for r in results}, default=str)[:6000]
+        reply = await stack.llm.complete(
+            [
+                {"role": "system", "content": "You are AgenticAgile, the team's agile assistant."},
+                {"role": "user", "content": f"{event.get('text', '')}\n\nBoard data:\n{context}"},
+            ]
+        )
+        await stack.slack.post_message(event["channel"], reply, thread_ts=thread_ts)
+
+    return handle
+
+
+@dataclass
+class BenchReport:
+    events: int = 0
+    answered: int = 0
+    trello_actions: int = 0
+    latencies: list[float] = field(default_factory=list)
+    trello_calls: int = 0
+    slack_calls: int = 0
+    llm_calls: int = 0
+    injected_429: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.latencies, q)) if self.latencies else float("nan")
+
+    @property
+    def calls_per_event(self) -> float:
+        return (self.trello_calls + self.slack_calls) / self.events if self.events else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "events": self.events,
+            "answered": self.answered,
+            "trello_actions": self.trello_actions,
+            "p50_ms": round(self.percentile(50) * 1000, 1),
+            "p90_ms": round(self.percentile(90) * 1000, 1),
+            "p99_ms": round(self.percentile(99) * 1000, 1),
+            "trello_calls_per_event": round(self.trello_calls / self.events, 2) if self.events else 0.0,
+            "slack_calls_per_event": round(self.slack_calls / self.events, 2) if self.events else 0.0,
+            "calls_per_event": round(self.calls_per_event, 2),
+            "llm_calls": self.llm_calls,
+            "injected_429": self.injected_429,
+            "rejected": self.rejected,
+            "seconds": round(self.seconds, 1),
+        }
+
+    def format(self) -> str:
+        return "\n".join(f"{key:>24}: {value}" for key, value in self.summary().items())
+
+
+async def _serve(app: web.Application) -> tuple[web.AppRunner, str]:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+
+
+class Benchmark:
+    """Replay traffic through a full AgenticAgile stack wired to the fakes.
+
+    Args:
+        handler_factory: Builds the Slack event handler from the :class:`Stack`.
+        trello_faults, slack_faults: Fault profiles applied during the replay
+            (setup runs without faults).
+        llm: Model used by the handler; defaults to a :class:`FakeLLM`.
+        speed: Replay speed-up; 600 plays an hour in six seconds.
+        boards: Simulated boards; channel ``C<n>`` talks about board ``n``.
+        limiter: Shared rate limiter for both clients; ``None`` disables it,
+            so injected 429s surface as handler failures.
+        workers: Dispatcher workers.
+        reply_timeout: Seconds to wait for outstanding replies at the end.
+        fast_path: Give the handler a :class:`FastPath` for fixed commands.
+    """
+
+    def __init__(
+        self,
+        handler_factory: Callable[[Stack], EventHandler] = reference_handler,
+        *,
+        trello_faults: Faults | None = None,
+        slack_faults: Faults | None = None,
+        llm: LLM | None = None,
+        speed: float = 600.0,
+        boards: int = 3,
+        cards_per_board: int = 60,
+        limiter: RateLimiter | None = None,
+        workers: int = 16,
+        reply_timeout: float = 30.0,
+        fast_path: bool = False,
+        seed: int | None = 0,
+    ) -> None:
+        self.handler_factory = handler_factory
+        self.trello_faults = trello_faults or Faults()
+        self.slack_faults = slack_faults or Faults()
+        self.llm = llm or FakeLLM(seed=seed)
+        self.speed = speed
+        self.boards = boards
+        self.cards_per_board = cards_per_board
+        self.limiter = limiter
+        self.workers = workers
+        self.reply_timeout = reply_timeout
+        self.fast_path = fast_path
+        self.seed = seed
+
+    async def run(self, traffic: Sequence[dict[str, Any]]) -> BenchReport:
+        stub = TrelloStub()
+        board_ids = populate(stub, boards=self.boards, cards_per_board=self.cards_per_board, seed=self.seed)
+        stream = ActionStream(stub, board_ids, seed=self.seed)
+        report = BenchReport()
+        runners: list[web.AppRunner] = []
+        async with FakeTrello(stub) as trello_server, FakeSlack() as slack_server:
+            trello = TrelloClient("sim-key", "sim-token", base_url=trello_server.base_url, limiter=self.limiter)
+            slack = SlackClient("xoxb-sim", base_url=slack_server.api_url, limiter=self.limiter)
+            mirror = BoardMirror()
+            try:
+                sync = MirrorSync(trello, mirror, board_ids)
+                feed = TrelloChangeFeed(mirror, sync, secret=WEBHOOK_SECRET, callback_url="")
+                runner, base = await _serve(make_webhook_app(feed))
+                runners.append(runner)
+                feed.callback_url = f"{base}/trello/webhook"
+                await ensure_webhooks(trello, board_ids, feed.callback_url)
+                await feed.catch_up(board_ids)
+                stack = Stack(
+                    trello=trello,
+                    slack=slack,
+                    mirror=mirror,
+                    executor=ToolExecutor(board_tools(mirror), mirror=mirror),
+                    llm=self.llm,
+                    channel_boards={f"C{i + 1}": board_id for i, board_id in enumerate(board_ids)},
+                    fast=FastPath(mirror) if self.fast_path else None,
+                )
+                dispatcher = EventDispatcher(self.handler_factory(stack), workers=self.workers)
+                # The app starts and stops the workers; replies still pending
+                # after ``reply_timeout`` are dropped rather than drained.
+                runner, base = await _serve(make_events_app(dispatcher, SIGNING_SECRET, drain_timeout=0))
+                runners.append(runner)
+                events_url = f"{base}/slack/events"
+
+                trello_before = sum(trello_server.stub.requests.values())
+                slack_before = sum(slack_server.calls.values())
+                llm_before = getattr(self.llm, "calls", 0)
+                trello_server.faults, slack_server.faults = self.trello_faults, self.slack_faults
+                sent: dict[tuple[str, str], float] = {}
+                deliveries = asyncio.Lock()
+
+                async def message(item: dict[str, Any]) -> None:
+                    event = slack_server.message_event(item["channel"], item["text"], user=item.get("user", "U0001"))
+                    sent[(event["channel"], event["ts"])] = time.monotonic()
+                    if await slack_server.send_event(events_url, event, signing_secret=SIGNING_SECRET) != 200:
+                        report.rejected += 1
+
+                async def board_activity(item: dict[str, Any]) -> None:
+                    stream.act(board_ids[item["board"] % len(board_ids)], item.get("action"))
+                    async with deliveries:
+                        await trello_server.deliver_webhooks(WEBHOOK_SECRET)
+
+                started = time.monotonic()
+                tasks = []
+                origin = traffic[0]["at"] if traffic else 0.0
+                for item in traffic:
+                    delay = (item["at"] - origin) / self.speed - (time.monotonic() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    if item["kind"] == "message":
+                        report.events += 1
+                        tasks.append(asyncio.create_task(message(item)))
+                    else:
+                        report.trello_actions += 1
+                        tasks.append(asyncio.create_task(board_activity(item)))
+                await asyncio.gather(*tasks)
+                try:
+                    await asyncio.wait_for(dispatcher.join(), self.reply_timeout)
+                except asyncio.TimeoutError:
+                    pass
+                report.seconds = time.monotonic() - started
+
+                for key, at in sent.items():
+                    replied = slack_server.replied_at.get(key)
+                    if replied is not None:
+                        report.latencies.append(replied - at)
+                report.answered = len(report.latencies)
+                report.trello_calls = sum(trello_server.stub.requests.values()) - trello_before
+                report.slack_calls = sum(slack_server.calls.values()) - slack_before
+                report.llm_calls = getattr(self.llm, "calls", 0) - llm_before
+                report.injected_429 = self.trello_faults.injected + self.slack_faults.injected
+            finally:
+                for runner in reversed(runners):
+                    await runner.cleanup()
+                await trello.close()
+                await slack.close()
+                mirror.close()
+        return report
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a day of Slack and Trello traffic against local fakes.")
+    parser.add_argument("--traffic", help="JSON-lines traffic file to replay; synthesized when omitted")
+    parser.add_argument("--record", help="write the replayed traffic to this file")
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--trello-actions", type=int, default=2000)
+    parser.add_argument("--speed", type=float, default=600.0)
+    parser.add_argument("--trello-latency", type=float, default=0.08)
+    parser.add_argument("--slack-latency", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--no-limiter", action="store_true", help="run without the shared rate limiter")
+    parser.add_argument("--fast-path", action="store_true", help="answer fixed commands without the model")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.traffic:
+        traffic = load_traffic(args.traffic)
+    else:
+        traffic = synthesize_day(messages=args.messages, trello_actions=args.trello_actions, seed=args.seed)
+    if args.record:
+        save_traffic(args.record, traffic)
+    benchmark = Benchmark(
+        trello_faults=Faults(latency=args.trello_latency, jitter=0.4, rate_limit=args.rate_limit, seed=args.seed),
+        slack_faults=Faults(latency=args.slack_latency, jitter=0.4, rate_limit=args.rate_limit, seed=args.seed),
+        llm=FakeLLM(latency=args.llm_latency, seed=args.seed),
+        speed=args.speed,
+        limiter=None if args.no_limiter else RateLimiter.for_agenticagile(),
+        fast_path=args.fast_path,
+        seed=args.seed,
+    )
+    print(asyncio.run(benchmark.run(traffic)).format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Latency and rate-limit injection for the local fakes.
+
+:class:`Faults` is shared by :class:`~agenticagile.sim.trello.FakeTrello` and
+:class:`~agenticagile.sim.slack.FakeSlack`. It delays each request by a
+configurable latency and answers a fraction of them with HTTP 429 and a
+``Retry-After`` header, the way both APIs signal rate limiting. The fakes
+read their ``faults`` attribute on every request, so a profile can be swapped
+while a simulation runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+@dataclass
+class Faults:
+    """Fault profile of a fake API.
+
+    Args:
+        latency: Median added delay per request, in seconds.
+        jitter: Spread of the delay; each request waits a lognormal sample
+            with this sigma around ``latency``, so a few are much slower.
+        rate_limit: Fraction of requests answered with HTTP 429.
+        retry_after: Value of the ``Retry-After`` header on those answers.
+        seed: Seed for reproducible runs.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_limit: float = 0.0
+    retry_after: float = 1.0
+    seed: int | None = None
+    injected: int = 0
+    _random: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def delay(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        if self.jitter <= 0:
+            return self.latency
+        return self.latency * self._random.lognormvariate(0.0, self.jitter)
+
+    def limited(self) -> bool:
+        return self.rate_limit > 0 and self._random.random() < self.rate_limit
+
+    async def apply(self, request: web.Request, handler: Handler) -> web.StreamResponse:
+        """Serve ``request`` through ``handler`` after the injected delay, or answer 429."""
+        delay = self.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if self.limited():
+            self.injected += 1
+            return web.json_response(
+                {"ok": False, "error": "ratelimited"},
+                status=429,
+                headers={"Retry-After": f"{self.retry_after:g}"},
+            )
+        return await handler(request)
+
+
+def fault_middleware(owner: Any) -> Callable[[web.Request, Handler], Awaitable[web.StreamResponse]]:
+    """aiohttp middleware applying ``owner.faults`` as it is at request time."""
+
+    @web.middleware
+    async def inject(request: web.Request, handler: Handler) -> web.StreamResponse:
+        return await owner.faults.apply(request, handler)
+
+    return inject
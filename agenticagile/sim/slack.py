@@ -0,0 +1,168 @@
+"""Fake Slack Web API and Events API sender for simulations.
+
+:class:`FakeSlack` serves the Web API methods AgenticAgile calls
+(``chat.postMessage``, ``chat.update``, ``reactions.add``, ...) on localhost
+under a :class:`~agenticagile.sim.faults.Faults` profile. It keeps every
+message, counts calls per method and lets a caller wait for the first reply
+in a thread. :meth:`FakeSlack.send_event` plays Slack's side of the Events
+API: it wraps an event in a signed ``event_callback`` envelope and POSTs it to
+the app's request URL.
+
+Usage::
+
+    async with FakeSlack(faults=Faults(latency=0.05)) as slack:
+        client = SlackClient("xoxb-test", base_url=slack.api_url)
+        event = slack.message_event("C1", "what is blocked?")
+        await slack.send_event(events_url, event, signing_secret="secret")
+        reply = await slack.wait_reply("C1", event["ts"])
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import time
+from collections import Counter
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+from agenticagile.sim.faults import Faults, fault_middleware
+
+
+class FakeSlack:
+    """Slack's Web API, served on an ephemeral local port.
+
+    ``calls`` counts every request per method; ``messages`` holds posted
+    messages by ``(channel, ts)`` with edits applied.
+    """
+
+    def __init__(self, *, faults: Faults | None = None, host: str = "127.0.0.1", team_id: str = "T0001") -> None:
+        self.faults = faults or Faults()
+        self.host = host
+        self.port = 0
+        self.team_id = team_id
+        self.calls: Counter[str] = Counter()
+        self.messages: dict[tuple[str, str], dict[str, Any]] = {}
+        self.replied_at: dict[tuple[str, str], float] = {}
+        self._ts = itertools.count(1)
+        self._ids = itertools.count(1)
+        self._waiters: dict[tuple[str, str], list[asyncio.Future[dict[str, Any]]]] = {}
+        self._runner: web.AppRunner | None = None
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def api_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api"
+
+    async def start(self) -> FakeSlack:
+        app = web.Application(middlewares=[fault_middleware(self)])
+        app.router.add_post("/api/{method}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, 0).start()
+        self.port = self._runner.addresses[0][1]
+        self._session = aiohttp.ClientSession()
+        return self
+
+    async def stop(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> FakeSlack:
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    def next_ts(self) -> str:
+        return f"{int(time.time())}.{next(self._ts):06d}"
+
+    # -- Web API ----------------------------------------------------------
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        payload = await request.json() if request.can_read_body else {}
+        return web.json_response(self.resolve(method, payload))
+
+    def resolve(self, method: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Answer one Web API call."""
+        channel = payload.get("channel", "")
+        if method in ("chat.postMessage", "chat.postEphemeral"):
+            ts = self.next_ts()
+            message = {"channel": channel, "ts": ts, **payload}
+            self.messages[(channel, ts)] = message
+            self._replied(channel, payload.get("thread_ts") or ts, message)
+            return {"ok": True, "channel": channel, "ts": ts, "message": message}
+        if method == "chat.update":
+            message = self.messages.get((channel, payload.get("ts", "")))
+            if message is None:
+                return {"ok": False, "error": "message_not_found"}
+            message.update(payload)
+            return {"ok": True, "channel": channel, "ts": message["ts"], "text": message.get("text", "")}
+        if method == "conversations.replies":
+            thread = payload.get("ts")
+            replies = [m for (c, _), m in sorted(self.messages.items()) if c == channel and m.get("thread_ts") == thread]
+            return {"ok": True, "messages": replies}
+        if method == "auth.test":
+            return {"ok": True, "team_id": self.team_id, "user_id": "UBOT"}
+        if method == "users.info":
+            user = payload.get("user", "")
+            return {"ok": True, "user": {"id": user, "name": user.lower(), "real_name": user}}
+        return {"ok": True}
+
+    def _replied(self, channel: str, thread_ts: str, message: dict[str, Any]) -> None:
+        key = (channel, thread_ts)
+        self.replied_at.setdefault(key, time.monotonic())
+        for waiter in self._waiters.pop(key, []):
+            if not waiter.done():
+                waiter.set_result(message)
+
+    async def wait_reply(self, channel: str, thread_ts: str, *, timeout: float = 30.0) -> dict[str, Any]:
+        """First message posted in the thread of ``thread_ts``."""
+        for (c, _), message in self.messages.items():
+            if c == channel and (message.get("thread_ts") or message["ts"]) == thread_ts:
+                return message
+        waiter: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((channel, thread_ts), []).append(waiter)
+        return await asyncio.wait_for(waiter, timeout)
+
+    # -- Events API -------------------------------------------------------
+
+    def message_event(self, channel: str, text: str, *, user: str = "U0001", thread_ts: str | None = None) -> dict[str, Any]:
+        """A ``message`` event as a user would send it."""
+        event = {"type": "message", "channel": channel, "user": user, "text": text, "ts": self.next_ts()}
+        if thread_ts is not None:
+            event["thread_ts"] = thread_ts
+        return event
+
+    def envelope(self, event: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "type": "event_callback",
+            "team_id": self.team_id,
+            "event_id": f"Ev{next(self._ids):08d}",
+            "event_time": int(time.time()),
+            "event": event,
+        }
+
+    async def send_event(self, url: str, event: dict[str, Any], *, signing_secret: str | None = None) -> int:
+        """POST ``event`` to an Events API request URL; returns the HTTP status."""
+        assert self._session is not None, "FakeSlack is not started"
+        body = json.dumps(self.envelope(event)).encode()
+        headers = {"Content-Type": "application/json"}
+        if signing_secret is not None:
+            timestamp = str(int(time.time()))
+            base = b"v0:" + timestamp.encode() + b":" + body
+            signature = "v0=" + hmac.new(signing_secret.encode(), base, hashlib.sha256).hexdigest()
+            headers.update({"X-Slack-Request-Timestamp": timestamp, "X-Slack-Signature": signature})
+        async with self._session.post(url, data=body, headers=headers) as response:
+            return response.status
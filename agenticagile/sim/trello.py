@@ -0,0 +1,151 @@
+"""Fake Trello for simulations: realistic boards, faults and an action stream.
+
+:class:`FakeTrello` is the :class:`~agenticagile.trello.stub.StubServer`
+with :class:`~agenticagile.sim.faults.Faults` applied to every request.
+:func:`populate` fills a :class:`~agenticagile.trello.stub.TrelloStub` with
+sprint boards shaped like real ones, and :class:`ActionStream` keeps changing
+them the way a team does during the day: cards move right, get comments and
+labels, and new cards show up. Every change lands in the stub's action feed
+and webhook outbox.
+
+Usage::
+
+    stub = TrelloStub()
+    populate(stub, boards=3, seed=1)
+    async with FakeTrello(stub, faults=Faults(latency=0.08, rate_limit=0.01)) as trello:
+        client = TrelloClient("k", "t", base_url=trello.base_url)
+        ActionStream(stub, seed=1).step(50)
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Sequence
+from typing import Any
+
+from aiohttp import web
+
+from agenticagile.sim.faults import Faults, fault_middleware
+from agenticagile.trello.stub import StubServer, TrelloStub
+
+#: Workflow lists of a simulated sprint board, left to right.
+SPRINT_LISTS = ("Backlog", "Sprint 12", "In Progress", "Review", "Blocked", "Done")
+LABELS = (("bug", "red"), ("feature", "green"), ("tech debt", "orange"), ("blocked", "black"), ("carried over", "purple"))
+_NOUNS = ("login", "billing", "search", "export", "onboarding", "dashboard", "webhook", "settings", "api", "reports")
+_VERBS = ("Fix", "Add", "Refactor", "Speed up", "Document", "Test", "Migrate", "Remove")
+_COMMENTS = (
+    "Picked this up.",
+    "Blocked on the API change, see thread.",
+    "PR is up for review.",
+    "Needs design input.",
+    "Deployed to staging.",
+    "Can we split this?",
+    "Done, moving on.",
+)
+_NAMES = ("Ana Ruiz", "Ben Cole", "Chen Li", "Dara Okafor", "Eli Novak", "Farah Aziz", "Gus Hale", "Hana Sato")
+
+
+class FakeTrello(StubServer):
+    """:class:`StubServer` answering through a :class:`Faults` profile."""
+
+    def __init__(self, stub: TrelloStub, *, faults: Faults | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__(stub, host=host, port=port)
+        self.faults = faults or Faults()
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[fault_middleware(self)])
+        app.router.add_route("*", "/1/{tail:.*}", self._handle)
+        return app
+
+
+def card_name(rng: random.Random) -> str:
+    points = rng.choice((1, 2, 3, 5, 8))
+    return f"({points}) {rng.choice(_VERBS)} {rng.choice(_NOUNS)} {rng.choice(_NOUNS)}"
+
+
+def populate(
+    stub: TrelloStub,
+    *,
+    boards: int = 3,
+    cards_per_board: int = 60,
+    members: int = 8,
+    seed: int | None = None,
+) -> list[str]:
+    """Create sprint boards with members, labels, lists, cards, comments and checklists.
+
+    Returns the new board ids.
+    """
+    rng = random.Random(seed)
+    people = [stub.add_member(name) for name in (_NAMES * (members // len(_NAMES) + 1))[:members]]
+    board_ids = []
+    for index in range(boards):
+        board = stub.add_board(f"Team {index + 1}", member_ids=[m["id"] for m in people])
+        board_ids.append(board["id"])
+        labels = [stub.add_label(board["id"], name, color) for name, color in LABELS]
+        lists = [stub.add_list(board["id"], name) for name in SPRINT_LISTS]
+        # Most cards sit early in the workflow, like a sprint in progress.
+        weights = (4, 6, 4, 2, 1, 3)
+        for _ in range(cards_per_board):
+            lst = rng.choices(lists, weights)[0]
+            card = stub.add_card(
+                lst["id"],
+                card_name(rng),
+                desc=f"As a user I want {rng.choice(_NOUNS)} to work with {rng.choice(_NOUNS)}.",
+                label_ids=[label["id"] for label in rng.sample(labels[:3], rng.randint(0, 2))],
+                member_ids=[member["id"] for member in rng.sample(people, rng.randint(0, 2))],
+            )
+            for _ in range(rng.randint(0, 3)):
+                stub.comment(card["id"], rng.choice(_COMMENTS), member_id=rng.choice(people)["id"])
+            if rng.random() < 0.3:
+                stub.add_checklist(card["id"], "Tasks", [f"Step {n}" for n in range(1, rng.randint(2, 5))])
+    return board_ids
+
+
+class ActionStream:
+    """Random but plausible board activity, applied to a stub.
+
+    Args:
+        board_ids: Boards to act on; defaults to every board of the stub.
+    """
+
+    def __init__(self, stub: TrelloStub, board_ids: Sequence[str] | None = None, *, seed: int | None = None) -> None:
+        self.stub = stub
+        self.board_ids = list(board_ids or stub.boards)
+        self.rng = random.Random(seed)
+
+    def step(self, count: int = 1) -> list[dict[str, Any]]:
+        """Make ``count`` changes; returns the recorded actions."""
+        before = len(self.stub.actions)
+        for _ in range(count):
+            self.act(self.rng.choice(self.board_ids))
+        return self.stub.actions[before:]
+
+    def act(self, board_id: str, kind: str | None = None) -> None:
+        """Make one change of ``kind`` (chosen at random when ``None``) on a board."""
+        stub, rng = self.stub, self.rng
+        lists = sorted((l for l in stub.lists.values() if l["idBoard"] == board_id), key=lambda l: l["pos"])
+        cards = [c for c in stub.cards.values() if c["idBoard"] == board_id and not c["closed"]]
+        members = stub.boards[board_id]["idMembers"]
+        kind = kind or rng.choices(("move", "comment", "label", "create", "update"), (4, 4, 2, 1, 1))[0]
+        if kind == "create" or not cards:
+            stub.add_card(rng.choice(lists[:2])["id"], card_name(rng), member_ids=rng.sample(members, min(1, len(members))))
+            return
+        card = rng.choice(cards)
+        member_id = rng.choice(members) if members else None
+        if kind == "move":
+            index = next(i for i, lst in enumerate(lists) if lst["id"] == card["idList"])
+            target = lists[min(len(lists) - 1, index + 1)] if rng.random() < 0.85 else lists[max(0, index - 1)]
+            if target["id"] != card["idList"]:
+                stub.update_card(card["id"], {"idList": target["id"]}, member_id=member_id)
+                return
+            kind = "comment"
+        if kind == "comment":
+            stub.comment(card["id"], rng.choice(_COMMENTS), member_id=member_id)
+        elif kind == "label":
+            label = rng.choice([l for l in stub.labels.values() if l["idBoard"] == board_id])
+            if label["id"] in card["idLabels"]:
+                stub.remove_label_from_card(card["id"], label["id"])
+            else:
+                stub.add_label_to_card(card["id"], label["id"])
+        else:
+            stub.update_card(card["id"], {"desc": card["desc"] + " Updated."}, member_id=member_id)
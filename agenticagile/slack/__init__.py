@@ -0,0 +1,17 @@
+"""Slack integration: Web API client, event ingestion and Block Kit rendering."""
+
+from agenticagile.slack.blocks import BlockRenderer, Template
+from agenticagile.slack.client import SlackClient
+from agenticagile.slack.dispatch import EventDispatcher, RecentIds
+from agenticagile.slack.events import make_events_app
+from agenticagile.slack.socket_mode import SocketModeClient
+
+__all__ = [
+    "BlockRenderer",
+    "EventDispatcher",
+    "RecentIds",
+    "SlackClient",
+    "SocketModeClient",
+    "Template",
+    "make_events_app",
+]
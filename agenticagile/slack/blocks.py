@@ -0,0 +1,234 @@
+"""Block Kit rendering with precompiled templates and a per-card line cache.
+
+Messages are built from :class:`Template` skeletons compiled once at import:
+constant parts of a skeleton are shared between renders instead of being
+rebuilt, and only the ``{field}`` slots are filled per call. Cards are
+rendered to one mrkdwn line each by :class:`BlockRenderer`, which keeps the
+line of every card together with the card version it was rendered from. When
+a board message is updated only the cards whose name, due date, labels or
+members changed are rendered again; the rest of the message is reassembled
+from cached lines.
+
+Rendered blocks share their constant parts with the templates; treat them as
+read-only.
+
+Usage::
+
+    renderer = BlockRenderer()
+    blocks = renderer.board(mirror, board_id)
+    await slack.update_message(channel, ts, "Sprint board", blocks=blocks)
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from agenticagile.board.mirror import BoardMirror, Card
+from agenticagile.llm.context import parse_date
+
+Block = dict[str, Any]
+
+#: Slack's limits on blocks per message and characters per section text.
+MAX_BLOCKS = 50
+MAX_SECTION_CHARS = 3000
+
+#: Card links point here; Trello resolves full card ids as well as short links.
+CARD_URL = "https://trello.com/c/{id}"
+
+_FIELD = re.compile(r"\{(\w+)\}")
+
+
+def escape(text: str) -> str:
+    """Escape the three characters Slack's mrkdwn reserves."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _compile(node: Any) -> tuple[Callable[[Mapping[str, Any]], Any], bool]:
+    """Builder for ``node`` and whether it is constant."""
+    if isinstance(node, str):
+        whole = _FIELD.fullmatch(node)
+        if whole is not None:
+            name = whole.group(1)
+            return (lambda values: values[name]), False
+        if _FIELD.search(node):
+            return node.format_map, False
+        return (lambda values: node), True
+    if isinstance(node, dict):
+        parts = {key: _compile(value) for key, value in node.items()}
+        if all(constant for _, constant in parts.values()):
+            return (lambda values: node), True
+        items = [(key, build) for key, (build, _) in parts.items()]
+        return (lambda values: {key: build(values) for key, build in items}), False
+    if isinstance(node, list):
+        parts_list = [_compile(value) for value in node]
+        if all(constant for _, constant in parts_list):
+            return (lambda values: node), True
+        builders = [build for build, _ in parts_list]
+        return (lambda values: [build(values) for build in builders]), False
+    return (lambda values: node), True
+
+
+class Template:
+    """A Block Kit skeleton with ``{field}`` slots, compiled once.
+
+    A string that is exactly one slot is replaced by the value as is, so a
+    slot can hold a list of elements; other strings are filled with
+    :meth:`str.format_map`. Values are inserted verbatim: escape user text
+    with :func:`escape` first.
+    """
+
+    def __init__(self, skeleton: Any) -> None:
+        self.skeleton = skeleton
+        self.fields = frozenset(_fields(skeleton))
+        self._build, _ = _compile(skeleton)
+
+    def render(self, **values: Any) -> Any:
+        """Fill the slots; raises ``KeyError`` for a missing field."""
+        return self._build(values)
+
+
+def _fields(node: Any) -> Iterable[str]:
+    if isinstance(node, str):
+        yield from _FIELD.findall(node)
+    elif isinstance(node, dict):
+        for value in node.values():
+            yield from _fields(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _fields(value)
+
+
+HEADER = Template({"type": "header", "text": {"type": "plain_text", "text": "{text}", "emoji": True}})
+SECTION = Template({"type": "section", "text": {"type": "mrkdwn", "text": "{text}"}})
+CONTEXT = Template({"type": "context", "elements": [{"type": "mrkdwn", "text": "{text}"}]})
+DIVIDER = Template({"type": "divider"})
+CARD_LINE = "• <{url}|{name}>{due}{labels}{members}"
+
+
+@dataclass
+class RenderStats:
+    hits: int = 0
+    misses: int = 0
+
+
+def card_names(mirror: BoardMirror, board_id: str) -> dict[str, str]:
+    """Display names of the board's labels and members, by id."""
+    names = {label["id"]: label["name"] or label.get("color") or "" for label in mirror.labels(board_id)}
+    for member in mirror.members(board_id):
+        names[member["id"]] = member["full_name"] or member["username"]
+    return names
+
+
+def sections(lines: Sequence[str], *, max_chars: int = MAX_SECTION_CHARS) -> list[Block]:
+    """Pack mrkdwn lines into as few section blocks as Slack allows."""
+    blocks: list[Block] = []
+    chunk: list[str] = []
+    size = 0
+    for line in lines:
+        if chunk and size + len(line) + 1 > max_chars:
+            blocks.append(SECTION.render(text="\n".join(chunk)))
+            chunk, size = [], 0
+        chunk.append(line[:max_chars])
+        size += len(line) + 1
+    if chunk:
+        blocks.append(SECTION.render(text="\n".join(chunk)))
+    return blocks
+
+
+def fit(blocks: list[Block], *, max_blocks: int = MAX_BLOCKS) -> list[Block]:
+    """Cut ``blocks`` to Slack's per-message limit, saying how much was left out."""
+    if len(blocks) <= max_blocks:
+        return blocks
+    dropped = len(blocks) - max_blocks + 1
+    return [*blocks[: max_blocks - 1], CONTEXT.render(text=f"…{dropped} more blocks not shown")]
+
+
+class BlockRenderer:
+    """Render cards, card lists and boards to Block Kit, caching card lines.
+
+    Args:
+        max_entries: Cards whose rendered line is kept (least recently used
+            cards are dropped first).
+        card_url: Link format of a card, with an ``{id}`` slot.
+    """
+
+    def __init__(self, *, max_entries: int = 8192, card_url: str = CARD_URL) -> None:
+        self.max_entries = max_entries
+        self.card_url = card_url
+        self.stats = RenderStats()
+        self._lines: OrderedDict[str, tuple[tuple[Any, ...], str]] = OrderedDict()
+
+    def card_line(self, card: Card, names: Mapping[str, str] | None = None) -> str:
+        """One mrkdwn line for ``card``, rendered again only when it changed."""
+        names = names or {}
+        labels = tuple(names.get(label_id, "") for label_id in card.label_ids)
+        members = tuple(names.get(member_id, "") for member_id in card.member_ids)
+        version = (card.name, card.due, card.due_complete, labels, members)
+        cached = self._lines.get(card.id)
+        if cached is not None and cached[0] == version:
+            self._lines.move_to_end(card.id)
+            self.stats.hits += 1
+            return cached[1]
+        self.stats.misses += 1
+        line = self._render_line(card, labels, members)
+        self._lines[card.id] = (version, line)
+        self._lines.move_to_end(card.id)
+        while len(self._lines) > self.max_entries:
+            self._lines.popitem(last=False)
+        return line
+
+    def _render_line(self, card: Card, labels: tuple[str, ...], members: tuple[str, ...]) -> str:
+        due = ""
+        when = parse_date(card.due)
+        if when is not None:
+            due = " · due " + time.strftime("%b %d", time.gmtime(when)) + (" ✓" if card.due_complete else "")
+        shown = [escape(label) for label in labels if label]
+        return CARD_LINE.format(
+            url=self.card_url.format(id=card.id),
+            name=escape(card.name).replace("|", "¦"),
+            due=due,
+            labels=" · `" + "` `".join(shown) + "`" if shown else "",
+            members=" · " + ", ".join(escape(member) for member in members if member) if any(members) else "",
+        )
+
+    def card_list(
+        self,
+        cards: Sequence[Card],
+        *,
+        title: str | None = None,
+        names: Mapping[str, str] | None = None,
+        limit: int | None = None,
+    ) -> list[Block]:
+        """A titled list of cards; cards past ``limit`` are summarised in one line."""
+        shown = cards if limit is None else cards[:limit]
+        lines = [self.card_line(card, names) for card in shown]
+        if len(cards) > len(shown):
+            lines.append(f"• …and {len(cards) - len(shown)} more")
+        blocks = [SECTION.render(text=f"*{escape(title)}*")] if title else []
+        return blocks + sections(lines)
+
+    def board(self, mirror: BoardMirror, board_id: str, *, empty_lists: bool = False) -> list[Block]:
+        """The whole board: a header, then every open list with its cards."""
+        board = mirror.board(board_id) or {"name": board_id}
+        names = card_names(mirror, board_id)
+        by_list: dict[str, list[Card]] = {}
+        for card in mirror.cards(board_id=board_id):
+            by_list.setdefault(card.list_id or "", []).append(card)
+        blocks = [HEADER.render(text=board["name"][:150])]
+        for lst in mirror.lists(board_id):
+            cards = by_list.get(lst["id"], [])
+            if not cards and not empty_lists:
+                continue
+            blocks.append(DIVIDER.render())
+            blocks += self.card_list(cards, title=f"{lst['name']} ({len(cards)})", names=names)
+        return fit(blocks)
+
+    def forget(self, card_ids: Iterable[str]) -> None:
+        """Drop cached lines, e.g. for archived or deleted cards."""
+        for card_id in card_ids:
+            self._lines.pop(card_id, None)
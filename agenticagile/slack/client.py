@@ -0,0 +1,154 @@
+"""Async Slack Web API client.
+
+Like :class:`~agenticagile.trello.client.TrelloClient`, the client reuses one
+pooled session and, when given a shared
+:class:`~agenticagile.ratelimit.RateLimiter`, takes a token from the bucket of
+the method's rate-limit tier before every call (see
+:func:`~agenticagile.ratelimit.slack_bucket`).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Any
+
+import aiohttp
+
+from agenticagile.errors import RateLimitedError, SlackError
+from agenticagile.ratelimit import RateLimiter, parse_retry_after, slack_bucket
+from agenticagile.telemetry import CALL_BYTES, CALL_SECONDS, span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://slack.com/api"
+
+
+class SlackClient:
+    """Pooled client for Slack Web API methods.
+
+    Args:
+        token: Bot token (``xoxb-...``) or, for Socket Mode, an app token.
+        base_url: API root; point it at a fake server in tests.
+        pool_size: Maximum number of pooled keep-alive connections.
+        timeout: Total timeout in seconds for each call.
+        session: Optional externally managed session.
+        limiter: Shared rate limiter; see the module docstring.
+        max_retries: Retries after ``ratelimited`` answers when a limiter is set.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        pool_size: int = 16,
+        timeout: float = 30.0,
+        session: aiohttp.ClientSession | None = None,
+        limiter: RateLimiter | None = None,
+        max_retries: int = 3,
+    ) -> None:
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self._pool_size = pool_size
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = session
+        self._owns_session = session is None
+        self.limiter = limiter
+        self.max_retries = max_retries
+
+    async def __aenter__(self) -> SlackClient:
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+            self._owns_session = True
+        return self._session
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The pooled session, created on first use."""
+        return self._ensure_session()
+
+    async def close(self) -> None:
+        if self._session is not None and self._owns_session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def call(self, method: str, **payload: Any) -> dict[str, Any]:
+        """Invoke ``method`` with a JSON ``payload`` and return the response.
+
+        Raises:
+            RateLimitedError: Slack answered HTTP 429 (after limiter retries).
+            SlackError: Slack answered ``ok: false``.
+        """
+        payload = {key: value for key, value in payload.items() if value is not None}
+
+        async def send() -> dict[str, Any]:
+            return await self._send(method, payload)
+
+        if self.limiter is None:
+            return await send()
+        bucket = slack_bucket(method, payload.get("channel"))
+        return await self.limiter.call(bucket, send, max_retries=self.max_retries)
+
+    async def _send(self, method: str, payload: dict[str, Any]) -> dict[str, Any]:
+        session = self._ensure_session()
+        headers = {"Authorization": f"Bearer {self.token}", "Content-Type": "application/json; charset=utf-8"}
+        data = json.dumps(payload).encode()
+        outcome = "error"
+        started = time.perf_counter()
+        try:
+            with span("slack", method=method):
+                async with session.post(f"{self.base_url}/{method}", data=data, headers=headers) as response:
+                    if response.status == 429:
+                        outcome = "429"
+                        raise RateLimitedError(
+                            "ratelimited",
+                            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                            url=method,
+                        )
+                    raw = await response.read()
+                CALL_BYTES.observe(len(data), service="slack", direction="out")
+                CALL_BYTES.observe(len(raw), service="slack", direction="in")
+                body = json.loads(raw)
+                if not body.get("ok"):
+                    outcome = body.get("error", "unknown_error")
+                    raise SlackError(body.get("error", "unknown_error"), status=response.status, url=method)
+                outcome = "ok"
+        finally:
+            CALL_SECONDS.observe(time.perf_counter() - started, service="slack", operation=method, outcome=outcome)
+        if body.get("warning"):
+            logger.debug("slack %s warning: %s", method, body["warning"])
+        return body
+
+    async def post_message(
+        self,
+        channel: str,
+        text: str,
+        *,
+        blocks: list[dict[str, Any]] | None = None,
+        thread_ts: str | None = None,
+        **extra: Any,
+    ) -> dict[str, Any]:
+        return await self.call(
+            "chat.postMessage", channel=channel, text=text, blocks=blocks, thread_ts=thread_ts, **extra
+        )
+
+    async def update_message(
+        self,
+        channel: str,
+        ts: str,
+        text: str,
+        *,
+        blocks: list[dict[str, Any]] | None = None,
+        **extra: Any,
+    ) -> dict[str, Any]:
+        return await self.call("chat.update", channel=channel, ts=ts, text=text, blocks=blocks, **extra)
@@ -0,0 +1,273 @@
+"""Bounded worker pool for Slack events with per-channel ordering.
+
+Transports (the HTTP Events API endpoint and Socket Mode) ack an event first
+and then hand its envelope to :class:`EventDispatcher`. The dispatcher:
+
+* drops redeliveries whose ``event_id`` was seen recently,
+* keeps events of one channel strictly in arrival order while different
+  channels are processed in parallel by up to ``workers`` tasks, and
+* bounds the number of queued events so bursts apply backpressure instead of
+  growing memory without limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from agenticagile.ratelimit import Priority, request_priority
+from agenticagile.telemetry import span, track_queue
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+def ordering_key(envelope: Mapping[str, Any]) -> str:
+    """Key whose events must be handled in order: the channel when known."""
+    event = envelope.get("event") or {}
+    channel = event.get("channel") or (event.get("item") or {}).get("channel")
+    if isinstance(channel, dict):
+        channel = channel.get("id")
+    if channel:
+        return f"{envelope.get('team_id', '')}:{channel}"
+    return f"{envelope.get('team_id', '')}:user:{event.get('user', '')}"
+
+
+class RecentIds:
+    """Insertion-ordered set that forgets ids after ``ttl`` seconds.
+
+    Slack redelivers an unacknowledged event up to three times over a few
+    minutes, so a short memory is enough to make handling idempotent.
+    """
+
+    def __init__(self, ttl: float = 600.0, max_size: int = 100_000, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._seen: OrderedDict[str, float] = OrderedDict()
+
+    def _expire(self, now: float) -> None:
+        while self._seen:
+            oldest, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < self.ttl and len(self._seen) <= self.max_size:
+                break
+            del self._seen[oldest]
+
+    def add(self, item: str) -> bool:
+        """Remember ``item``; returns ``False`` if it was already known."""
+        now = self._clock()
+        self._expire(now)
+        if item in self._seen:
+            return False
+        self._seen[item] = now
+        return True
+
+    def discard(self, item: str) -> None:
+        self._seen.pop(item, None)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+@dataclass
+class DispatchStats:
+    received: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    processed: int = 0
+    failed: int = 0
+
+
+class EventDispatcher:
+    """Process Slack event envelopes with bounded, key-ordered concurrency.
+
+    Args:
+        handler: Coroutine called with each envelope. Handlers run at
+            :attr:`Priority.INTERACTIVE`, since they answer users.
+        workers: Number of concurrent worker tasks.
+        max_pending: Maximum number of accepted but unprocessed events.
+        dedup: Memory of recently seen ``event_id`` values.
+        name: Queue name reported in the ``agenticagile_queue_depth`` gauge
+            while the dispatcher runs.
+    """
+
+    def __init__(
+        self,
+        handler: EventHandler,
+        *,
+        workers: int = 16,
+        max_pending: int = 10_000,
+        dedup: RecentIds | None = None,
+        name: str = "slack_events",
+    ) -> None:
+        if workers < 1 or max_pending < 1:
+            raise ValueError("workers and max_pending must be positive")
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.dedup = dedup or RecentIds()
+        self.name = name
+        self.stats = DispatchStats()
+        self._pending: dict[str, deque[tuple[dict[str, Any], float]]] = {}
+        self._ready: asyncio.Queue[str] = asyncio.Queue()
+        self._count = 0
+        self._space = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._untrack: Callable[[], None] | None = None
+
+    @property
+    def pending(self) -> int:
+        """Events accepted but not yet finished."""
+        return self._count
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.max_pending
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+            self._untrack = track_queue(self.name, lambda: self._count)
+
+    async def stop(self, *, drain: bool = True, timeout: float | None = None) -> None:
+        """Stop the workers, by default after finishing queued events.
+
+        Draining waits at most ``timeout`` seconds. Events still queued when
+        the workers are cancelled were already acknowledged to Slack, so they
+        are logged and dropped. Calling ``stop`` again is harmless.
+        """
+        if drain and self._tasks:
+            try:
+                await asyncio.wait_for(self.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("%s: %d events still pending after %ss, stopping", self.name, self._count, timeout)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._count:
+            logger.warning("%s: dropping %d unprocessed events", self.name, self._count)
+        self._pending.clear()
+        self._ready = asyncio.Queue()
+        self._count = 0
+        self._idle.set()
+        self._space.set()
+        if self._untrack is not None:
+            self._untrack()
+            self._untrack = None
+
+    async def __aenter__(self) -> EventDispatcher:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    async def join(self) -> None:
+        """Wait until every accepted event has been processed.
+
+        Returns at once when the workers are not running, since nothing would
+        ever process the queue.
+        """
+        if self._tasks:
+            await self._idle.wait()
+
+    def _is_duplicate(self, envelope: Mapping[str, Any]) -> bool:
+        event_id = envelope.get("event_id") or envelope.get("envelope_id")
+        return bool(event_id) and not self.dedup.add(str(event_id))
+
+    def _enqueue(self, envelope: dict[str, Any]) -> None:
+        key = ordering_key(envelope)
+        queue = self._pending.get(key)
+        if queue is None:
+            queue = self._pending[key] = deque()
+            # A key is in the ready queue at most once; its successor events
+            # are scheduled only after the current one finishes.
+            self._ready.put_nowait(key)
+        queue.append((envelope, time.monotonic()))
+        self._count += 1
+        self._idle.clear()
+
+    def submit_nowait(self, envelope: dict[str, Any]) -> bool:
+        """Accept ``envelope`` without waiting.
+
+        Returns ``False`` when the event was a duplicate or the dispatcher is
+        full; duplicates are still "handled" from Slack's point of view.
+        """
+        self.stats.received += 1
+        if self.full:
+            self.stats.rejected += 1
+            return False
+        if self._is_duplicate(envelope):
+            self.stats.duplicates += 1
+            return False
+        self._enqueue(envelope)
+        return True
+
+    async def submit(self, envelope: dict[str, Any], *, timeout: float | None = None) -> bool:
+        """Accept ``envelope``, waiting up to ``timeout`` for free capacity.
+
+        Returns ``False`` for duplicates; raises :class:`asyncio.TimeoutError`
+        if no capacity frees up in time.
+        """
+        self.stats.received += 1
+        if self._is_duplicate(envelope):
+            self.stats.duplicates += 1
+            return False
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while self.full:
+            self._space.clear()
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                await asyncio.wait_for(self._space.wait(), remaining)
+            except asyncio.TimeoutError:
+                # Forget the id so Slack's redelivery gets another chance.
+                self.dedup.discard(str(envelope.get("event_id") or envelope.get("envelope_id") or ""))
+                self.stats.rejected += 1
+                raise
+        self._enqueue(envelope)
+        return True
+
+    async def _worker(self, index: int) -> None:
+        with request_priority(Priority.INTERACTIVE):
+            while True:
+                key = await self._ready.get()
+                queue = self._pending[key]
+                envelope, accepted = queue.popleft()
+                event = envelope.get("event") or {}
+                try:
+                    with span(
+                        "slack.event",
+                        event_id=envelope.get("event_id"),
+                        type=event.get("type"),
+                        channel=event.get("channel"),
+                        queued_seconds=time.monotonic() - accepted,
+                    ):
+                        await self.handler(envelope)
+                    self.stats.processed += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    self.stats.failed += 1
+                    logger.exception("slack event %s failed", envelope.get("event_id"))
+                finally:
+                    if queue:
+                        self._ready.put_nowait(key)
+                    else:
+                        del self._pending[key]
+                    self._count -= 1
+                    if self._count == 0:
+                        self._idle.set()
+                    self._space.set()
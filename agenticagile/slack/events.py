@@ -0,0 +1,118 @@
+"""Slack Events API endpoint that acks immediately.
+
+Slack retries any event that is not acknowledged within three seconds, so the
+request handler only verifies the signature, hands the envelope to an
+:class:`~agenticagile.slack.dispatch.EventDispatcher` and returns ``200``.
+All real work happens later in the dispatcher's worker pool.
+
+Usage::
+
+    dispatcher = EventDispatcher(handle_event, workers=32)
+    app = make_events_app(dispatcher, signing_secret)
+    web.run_app(app, port=3000)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import time
+
+from aiohttp import web
+
+from agenticagile.slack.dispatch import EventDispatcher
+
+logger = logging.getLogger(__name__)
+
+#: Requests whose timestamp is further off than this are rejected as replays.
+MAX_CLOCK_SKEW = 60 * 5
+
+DISPATCHER_KEY: web.AppKey[EventDispatcher] = web.AppKey("dispatcher", EventDispatcher)
+
+
+def verify_signature(
+    signing_secret: str,
+    timestamp: str,
+    body: bytes,
+    signature: str,
+    *,
+    now: float | None = None,
+) -> bool:
+    """Check Slack's ``X-Slack-Signature`` header for ``body``."""
+    try:
+        sent_at = int(timestamp)
+    except (TypeError, ValueError):
+        return False
+    if abs((now if now is not None else time.time()) - sent_at) > MAX_CLOCK_SKEW:
+        return False
+    base = b"v0:" + timestamp.encode() + b":" + body
+    expected = "v0=" + hmac.new(signing_secret.encode(), base, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+class EventsEndpoint:
+    """aiohttp handler for the Events API request URL.
+
+    Args:
+        dispatcher: Pool that processes accepted events.
+        signing_secret: App signing secret; ``None`` disables verification
+            (only for local simulators).
+    """
+
+    def __init__(self, dispatcher: EventDispatcher, signing_secret: str | None) -> None:
+        self.dispatcher = dispatcher
+        self.signing_secret = signing_secret
+
+    async def __call__(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        if self.signing_secret is not None and not verify_signature(
+            self.signing_secret,
+            request.headers.get("X-Slack-Request-Timestamp", ""),
+            body,
+            request.headers.get("X-Slack-Signature", ""),
+        ):
+            return web.Response(status=401, text="invalid signature")
+        try:
+            envelope = json.loads(body)
+        except ValueError:
+            return web.Response(status=400, text="invalid json")
+
+        kind = envelope.get("type")
+        if kind == "url_verification":
+            return web.json_response({"challenge": envelope.get("challenge", "")})
+        if kind != "event_callback":
+            return web.Response(status=200)
+
+        if not self.dispatcher.submit_nowait(envelope) and self.dispatcher.full:
+            # Not acking makes Slack retry later, which is the backpressure
+            # signal the Events API offers; duplicates are acked normally.
+            logger.warning("event queue full, deferring %s", envelope.get("event_id"))
+            return web.Response(status=503)
+        return web.Response(status=200)
+
+
+def make_events_app(
+    dispatcher: EventDispatcher,
+    signing_secret: str | None,
+    *,
+    path: str = "/slack/events",
+    drain_timeout: float = 30.0,
+) -> web.Application:
+    """Build an aiohttp app serving the Events API at ``path``.
+
+    The dispatcher's workers start and stop with the application; on
+    shutdown queued events get ``drain_timeout`` seconds to finish.
+    """
+    app = web.Application()
+    app[DISPATCHER_KEY] = dispatcher
+    app.router.add_post(path, EventsEndpoint(dispatcher, signing_secret))
+
+    async def lifecycle(app: web.Application):  # type: ignore[no-untyped-def]
+        await dispatcher.start()
+        yield
+        await dispatcher.stop(timeout=drain_timeout)
+
+    app.cleanup_ctx.append(lifecycle)
+    return app
@@ -0,0 +1,162 @@
+"""Local fake of Slack's Socket Mode endpoints for offline and load tests.
+
+:class:`FakeSocketModeServer` answers ``apps.connections.open`` with the url
+of its own WebSocket endpoint and then behaves like Slack's side of the link:
+it greets with ``hello``, pushes envelopes, records acks (with latency) and
+redelivers envelopes that are not acked in time.
+
+Usage::
+
+    async with FakeSocketModeServer() as slack:
+        web = SlackClient("xapp-test", base_url=slack.api_url)
+        client = SocketModeClient(web, dispatcher)
+        task = asyncio.create_task(client.run())
+        await slack.push_event({"type": "message", "channel": "C1", "text": "hi"})
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from typing import Any
+
+from aiohttp import WSMsgType, web
+
+
+class FakeSocketModeServer:
+    """Slack's half of a Socket Mode connection, served on localhost.
+
+    Args:
+        ack_timeout: Seconds to wait for an ack before redelivering.
+        max_retries: Redeliveries per envelope (Slack uses 3).
+    """
+
+    def __init__(self, *, ack_timeout: float = 3.0, max_retries: int = 3, host: str = "127.0.0.1") -> None:
+        self.ack_timeout = ack_timeout
+        self.max_retries = max_retries
+        self.host = host
+        self.port = 0
+        self.sockets: list[web.WebSocketResponse] = []
+        self.connections = 0
+        self.ack_latencies: list[float] = []
+        self.unacked: dict[str, tuple[dict[str, Any], float]] = {}
+        self.expired: list[str] = []
+        self._ids = itertools.count(1)
+        self._runner: web.AppRunner | None = None
+        self._retry_task: asyncio.Task[None] | None = None
+        self._connected = asyncio.Event()
+
+    @property
+    def api_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api"
+
+    async def start(self) -> FakeSocketModeServer:
+        app = web.Application()
+        app.router.add_post("/api/apps.connections.open", self._open)
+        app.router.add_get("/link", self._link)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, 0).start()
+        self.port = self._runner.addresses[0][1]
+        self._retry_task = asyncio.create_task(self._redeliver())
+        return self
+
+    async def stop(self) -> None:
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+        for ws in list(self.sockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> FakeSocketModeServer:
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    async def _open(self, request: web.Request) -> web.Response:
+        return web.json_response({"ok": True, "url": f"ws://{self.host}:{self.port}/link"})
+
+    async def _link(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        self.connections += 1
+        await ws.send_str(json.dumps({"type": "hello", "num_connections": len(self.sockets)}))
+        self._connected.set()
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                envelope_id = json.loads(msg.data).get("envelope_id")
+                sent = self.unacked.pop(envelope_id, None)
+                if sent is not None:
+                    self.ack_latencies.append(time.monotonic() - sent[1])
+        finally:
+            self.sockets.remove(ws)
+            if not self.sockets:
+                self._connected.clear()
+        return ws
+
+    async def wait_connected(self, timeout: float = 5.0) -> None:
+        await asyncio.wait_for(self._connected.wait(), timeout)
+
+    async def push(self, payload: dict[str, Any], *, kind: str = "events_api", retry_attempt: int = 0) -> str:
+        """Send one envelope to the newest connection; returns its id."""
+        await self.wait_connected()
+        envelope_id = f"env-{next(self._ids)}"
+        message = {
+            "envelope_id": envelope_id,
+            "type": kind,
+            "payload": payload,
+            "accepts_response_payload": kind != "events_api",
+            "retry_attempt": retry_attempt,
+        }
+        await self._send(message)
+        return envelope_id
+
+    async def push_event(self, event: dict[str, Any], *, team_id: str = "T0001") -> str:
+        """Wrap ``event`` in an Events API envelope and push it."""
+        event_id = f"Ev{next(self._ids):08d}"
+        payload = {
+            "type": "event_callback",
+            "team_id": team_id,
+            "event_id": event_id,
+            "event_time": int(time.time()),
+            "event": event,
+        }
+        await self.push(payload)
+        return event_id
+
+    async def _send(self, message: dict[str, Any]) -> None:
+        self.unacked[message["envelope_id"]] = (message, time.monotonic())
+        await self.sockets[-1].send_str(json.dumps(message))
+
+    async def disconnect(self, reason: str = "refresh_requested") -> None:
+        """Ask connected clients to reconnect, as Slack does periodically."""
+        for ws in list(self.sockets):
+            await ws.send_str(json.dumps({"type": "disconnect", "reason": reason}))
+
+    async def drop(self) -> None:
+        """Close every socket abruptly, simulating a network failure."""
+        for ws in list(self.sockets):
+            await ws.close()
+
+    async def _redeliver(self) -> None:
+        while True:
+            await asyncio.sleep(self.ack_timeout / 4)
+            now = time.monotonic()
+            for envelope_id, (message, sent_at) in list(self.unacked.items()):
+                if now - sent_at < self.ack_timeout:
+                    continue
+                del self.unacked[envelope_id]
+                attempt = message["retry_attempt"] + 1
+                if attempt > self.max_retries or not self.sockets:
+                    self.expired.append(envelope_id)
+                    continue
+                retry = {**message, "envelope_id": f"env-{next(self._ids)}", "retry_attempt": attempt}
+                await self._send(retry)
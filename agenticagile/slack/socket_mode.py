@@ -0,0 +1,156 @@
+"""Slack Socket Mode transport.
+
+Socket Mode lets AgenticAgile receive events over an outbound WebSocket, so
+it can run behind a firewall without a public request URL. The client:
+
+* opens a connection URL with ``apps.connections.open`` and reconnects with
+  exponential backoff whenever the socket drops or Slack asks for a refresh,
+* acks every envelope as soon as it is accepted by the
+  :class:`~agenticagile.slack.dispatch.EventDispatcher`, well within Slack's
+  three second deadline, and
+* stops reading from the socket while the dispatcher is full. An envelope that
+  cannot be queued before its ack deadline is left unacked, so Slack
+  redelivers it later instead of AgenticAgile buffering without bound.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+
+from agenticagile.slack.client import SlackClient
+from agenticagile.slack.dispatch import EventDispatcher
+
+logger = logging.getLogger(__name__)
+
+#: Slack's deadline for acknowledging an envelope.
+ACK_DEADLINE = 3.0
+
+
+def to_envelope(message: dict[str, Any]) -> dict[str, Any]:
+    """Convert a Socket Mode message into the envelope shape the dispatcher uses.
+
+    ``events_api`` payloads already are Events API envelopes. Slash commands
+    and interactivity payloads are wrapped so that ``event.channel`` and
+    ``envelope_id`` drive ordering and deduplication.
+    """
+    kind = message.get("type")
+    payload = message.get("payload") or {}
+    if kind == "events_api":
+        return {**payload, "envelope_id": message["envelope_id"]}
+    channel = payload.get("channel_id") or (payload.get("channel") or {}).get("id")
+    user = payload.get("user_id") or (payload.get("user") or {}).get("id")
+    team = payload.get("team_id") or (payload.get("team") or {}).get("id", "")
+    return {
+        "type": kind,
+        "envelope_id": message["envelope_id"],
+        "team_id": team,
+        "event": {"type": kind, "channel": channel, "user": user, "payload": payload},
+    }
+
+
+@dataclass
+class SocketModeStats:
+    connections: int = 0
+    envelopes: int = 0
+    acked: int = 0
+    deferred: int = 0
+
+
+class SocketModeClient:
+    """Receive Slack events over Socket Mode and feed a dispatcher.
+
+    Args:
+        web: Slack client authenticated with the app-level token
+            (``xapp-...``); used only for ``apps.connections.open``.
+        dispatcher: Worker pool the envelopes are handed to.
+        ping_interval: WebSocket heartbeat interval in seconds.
+        max_backoff: Upper bound for the reconnect delay in seconds.
+    """
+
+    def __init__(
+        self,
+        web: SlackClient,
+        dispatcher: EventDispatcher,
+        *,
+        ping_interval: float = 10.0,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self.web = web
+        self.dispatcher = dispatcher
+        self.ping_interval = ping_interval
+        self.max_backoff = max_backoff
+        self.stats = SocketModeStats()
+        self.connected = asyncio.Event()
+        self._stopping = False
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+
+    async def run(self) -> None:
+        """Connect and process envelopes until :meth:`stop` is called."""
+        await self.dispatcher.start()
+        failures = 0
+        while not self._stopping:
+            try:
+                url = (await self.web.call("apps.connections.open"))["url"]
+                await self._serve(url)
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001 - any failure means reconnect
+                failures += 1
+                delay = min(self.max_backoff, 0.5 * 2 ** (failures - 1)) * (0.5 + random.random() / 2)
+                logger.warning("socket mode connection failed (%s); retrying in %.1fs", exc, delay)
+                if not self._stopping:
+                    await asyncio.sleep(delay)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _serve(self, url: str) -> None:
+        async with self.web.session.ws_connect(url, heartbeat=self.ping_interval) as ws:
+            self._ws = ws
+            self.stats.connections += 1
+            try:
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        if not await self._on_message(ws, json.loads(msg.data)):
+                            break
+                    elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSE):
+                        break
+            finally:
+                self.connected.clear()
+                self._ws = None
+
+    async def _on_message(self, ws: aiohttp.ClientWebSocketResponse, message: dict[str, Any]) -> bool:
+        """Handle one frame; returns ``False`` when the socket should be replaced."""
+        kind = message.get("type")
+        if kind == "hello":
+            self.connected.set()
+            return True
+        if kind == "disconnect":
+            logger.info("socket mode disconnect requested: %s", message.get("reason"))
+            return False
+        envelope_id = message.get("envelope_id")
+        if not envelope_id:
+            return True
+        self.stats.envelopes += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ACK_DEADLINE * 0.8
+        try:
+            # Waiting here stops the read loop, which is the backpressure.
+            await self.dispatcher.submit(to_envelope(message), timeout=max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            self.stats.deferred += 1
+            logger.warning("dispatcher full; leaving envelope %s for redelivery", envelope_id)
+            return True
+        await ws.send_str(json.dumps({"envelope_id": envelope_id}))
+        self.stats.acked += 1
+        return True
@@ -0,0 +1,199 @@
+"""Stream LLM output into Slack by editing one message in place.
+
+A placeholder message is posted as soon as the agent starts answering, so
+users see a response within a second. Fragments are accumulated locally and
+pushed with coalesced ``chat.update`` calls: at most one update is in flight
+and each one carries the latest text, sent every ``interval`` seconds or once
+``token_step`` new tokens have accumulated, whichever comes first. Because
+updates are coalesced, a slow rate-limit bucket only means fewer, larger
+edits, never a growing backlog.
+
+Usage::
+
+    reply = await stream_to_slack(slack, channel, llm.stream(messages), thread_ts=ts)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterable
+from dataclasses import dataclass, field
+
+from agenticagile.llm.tokens import estimate_tokens
+from agenticagile.ratelimit import Priority, request_priority
+from agenticagile.slack.client import SlackClient
+
+logger = logging.getLogger(__name__)
+
+#: Appended to the message while the reply is still being written.
+CURSOR = " ▌"
+
+#: Longest text kept in one message before the reply continues in a new one.
+MAX_MESSAGE_CHARS = 3500
+
+
+@dataclass
+class StreamResult:
+    """Outcome of :func:`stream_to_slack`."""
+
+    text: str = ""
+    message_ts: list[str] = field(default_factory=list)
+    updates: int = 0
+    first_post_latency: float = 0.0
+
+
+class SlackMessageStream:
+    """One reply being written into Slack, possibly across several messages.
+
+    Args:
+        slack: Client used for ``chat.postMessage`` and ``chat.update``.
+        channel: Channel to answer in.
+        thread_ts: Thread to answer in, if any.
+        interval: Maximum seconds between two updates while text is pending.
+        token_step: Pending tokens that trigger an update before ``interval``.
+        min_gap: Minimum seconds between two updates of the same message.
+        placeholder: Text of the initial message.
+    """
+
+    def __init__(
+        self,
+        slack: SlackClient,
+        channel: str,
+        *,
+        thread_ts: str | None = None,
+        interval: float = 0.5,
+        token_step: int = 200,
+        min_gap: float = 0.25,
+        placeholder: str = "_Thinking…_",
+    ) -> None:
+        self.slack = slack
+        self.channel = channel
+        self.thread_ts = thread_ts
+        self.interval = interval
+        self.token_step = token_step
+        self.min_gap = min_gap
+        self.placeholder = placeholder
+        self.result = StreamResult()
+        self._done_text = ""  # text of messages already finalised
+        self._current = ""  # text of the message being edited
+        self._sent = ""
+        self._pending_tokens = 0
+        self._last_update = 0.0
+        self._dirty = asyncio.Event()
+        self._urgent = asyncio.Event()
+        self._closed = False
+        self._updater: asyncio.Task[None] | None = None
+
+    @property
+    def ts(self) -> str:
+        return self.result.message_ts[-1]
+
+    async def open(self) -> None:
+        started = time.monotonic()
+        response = await self.slack.post_message(self.channel, self.placeholder, thread_ts=self.thread_ts)
+        self.result.first_post_latency = time.monotonic() - started
+        self.result.message_ts.append(response["ts"])
+        self._updater = asyncio.create_task(self._run_updates())
+
+    def write(self, fragment: str) -> None:
+        """Append ``fragment`` to the reply; never blocks on Slack."""
+        if not fragment:
+            return
+        self._current += fragment
+        self._pending_tokens += estimate_tokens(fragment)
+        self._dirty.set()
+        if self._pending_tokens >= self.token_step or len(self._current) > MAX_MESSAGE_CHARS:
+            self._urgent.set()
+
+    async def close(self) -> StreamResult:
+        """Flush the final text and stop the updater."""
+        self._closed = True
+        self._dirty.set()
+        self._urgent.set()
+        if self._updater is not None:
+            await self._updater
+        self.result.text = self._done_text + self._current
+        return self.result
+
+    async def _run_updates(self) -> None:
+        while True:
+            await self._dirty.wait()
+            if not self._closed:
+                # Wait for the interval to pass, or for enough new tokens.
+                wait = max(0.0, self.interval - (time.monotonic() - self._last_update))
+                try:
+                    await asyncio.wait_for(self._urgent.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                gap = self.min_gap - (time.monotonic() - self._last_update)
+                if gap > 0 and not self._closed:
+                    await asyncio.sleep(gap)
+            self._dirty.clear()
+            self._urgent.clear()
+            await self._flush(final=self._closed)
+            if self._closed:
+                return
+
+    async def _flush(self, *, final: bool) -> None:
+        while len(self._current) > MAX_MESSAGE_CHARS:
+            # Finish this message at a line or word boundary and continue
+            # the reply in a new message of the same thread.
+            cut = self._current.rfind("\n", 0, MAX_MESSAGE_CHARS)
+            if cut <= 0:
+                cut = self._current.rfind(" ", 0, MAX_MESSAGE_CHARS)
+            if cut <= 0:
+                cut = MAX_MESSAGE_CHARS
+            head, rest = self._current[:cut], self._current[cut:].lstrip()
+            await self._update(head)
+            try:
+                response = await self.slack.post_message(
+                    self.channel, self.placeholder, thread_ts=self.thread_ts or self.result.message_ts[0]
+                )
+            except Exception:  # noqa: BLE001 - a failed post must not kill the reply
+                # Keep writing into the current message; the next flush tries again.
+                logger.exception("chat.postMessage failed for %s; continuing in %s", self.channel, self.ts)
+                break
+            self._done_text += head + "\n"
+            self._current = rest
+            self.result.message_ts.append(response["ts"])
+            self._sent = ""
+        text = self._current if final else self._current + CURSOR
+        if text != self._sent and (self._current or final):
+            await self._update(text or "…")
+        self._pending_tokens = 0
+
+    async def _update(self, text: str) -> None:
+        try:
+            await self.slack.update_message(self.channel, self.ts, text)
+        except Exception:  # noqa: BLE001 - a failed edit must not kill the reply
+            logger.exception("chat.update failed for %s/%s", self.channel, self.ts)
+            return
+        self._sent = text
+        self._last_update = time.monotonic()
+        self.result.updates += 1
+
+
+async def stream_to_slack(
+    slack: SlackClient,
+    channel: str,
+    fragments: AsyncIterable[str],
+    *,
+    thread_ts: str | None = None,
+    **options: float | int | str,
+) -> StreamResult:
+    """Post a placeholder and stream ``fragments`` into it.
+
+    ``options`` are passed to :class:`SlackMessageStream`. Slack calls run at
+    :attr:`Priority.INTERACTIVE`.
+    """
+    with request_priority(Priority.INTERACTIVE):
+        stream = SlackMessageStream(slack, channel, thread_ts=thread_ts, **options)  # type: ignore[arg-type]
+        await stream.open()
+        try:
+            async for fragment in fragments:
+                stream.write(fragment)
+        finally:
+            result = await stream.close()
+    return result
@@ -0,0 +1,390 @@
+"""Prometheus-style metrics and optional span tracing.
+
+Every external call records into the histograms below: the Trello and Slack
+clients per request, :class:`~agenticagile.llm.instrumented.InstrumentedLLM`
+per completion, and the :class:`~agenticagile.ratelimit.RateLimiter` for time
+spent waiting on a bucket. Queue depths are gauges sampled at scrape time
+(:func:`track_queue`). :func:`make_metrics_app` serves everything in the
+Prometheus text format at ``/metrics``.
+
+Tracing is off until an exporter is added. Then :func:`span` records nested
+spans: one per Slack event handled by the dispatcher, with the tool calls,
+model calls and API requests made while handling it as children. Spans go to
+every exporter, e.g. a :class:`RecentSpans` ring buffer that
+:func:`make_metrics_app` also serves at ``/traces``.
+
+Usage::
+
+    spans = RecentSpans()
+    add_span_exporter(spans)
+    track_queue("slack_events", lambda: dispatcher.pending)
+    web.run_app(make_metrics_app(spans=spans), port=9100)
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import os
+import re
+import time
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+#: Latency buckets in seconds, from a cached lookup to a slow model reply.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def _format(self, key: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{self._format(key)} {_number(value)}"
+
+
+class Gauge(_Metric):
+    """Gauge set directly or computed by a function at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float | Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def set_function(self, func: Callable[[], float], **labels: Any) -> None:
+        self._values[self._key(labels)] = func
+
+    def remove(self, **labels: Any) -> None:
+        self._values.pop(self._key(labels), None)
+
+    def value(self, **labels: Any) -> float:
+        value = self._values.get(self._key(labels), 0.0)
+        return float(value() if callable(value) else value)
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items(), key=lambda item: item[0]):
+            try:
+                number = float(value() if callable(value) else value)
+            except Exception:  # noqa: BLE001 - a broken callback must not break the scrape
+                logger.exception("gauge %s%s failed", self.name, key)
+                continue
+            yield f"{self.name}{self._format(key)} {_number(number)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: Sequence[str] = (), *, buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., count above the last bucket], sum.
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def sum(self, **labels: Any) -> float:
+        entry = self._values.get(self._key(labels))
+        return entry[1][0] if entry else 0.0
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{self._format(key, le)} {cumulative}"
+            yield f"{self.name}_sum{self._format(key)} {_number(total[0])}"
+            yield f"{self.name}_count{self._format(key)} {cumulative}"
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labels != metric.labels:
+                raise ValueError(f"metric {metric.name} already registered differently")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str] = (), *, buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets=buckets))
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+CALL_SECONDS = REGISTRY.histogram(
+    "agenticagile_external_call_seconds",
+    "Duration of calls to Trello, Slack and the model.",
+    ("service", "operation", "outcome"),
+)
+CALL_BYTES = REGISTRY.histogram(
+    "agenticagile_external_call_bytes",
+    "Request and response body sizes of Trello and Slack calls.",
+    ("service", "direction"),
+    buckets=BYTES_BUCKETS,
+)
+CALL_RETRIES = REGISTRY.counter(
+    "agenticagile_external_call_retries_total",
+    "Calls retried after a rate-limit answer or a failed delivery.",
+    ("service",),
+)
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "agenticagile_rate_limit_wait_seconds",
+    "Time spent waiting for a rate-limit token.",
+    ("bucket",),
+)
+LLM_TOKENS = REGISTRY.histogram(
+    "agenticagile_llm_tokens",
+    "Estimated prompt and reply tokens per model call.",
+    ("model", "kind"),
+    buckets=TOKEN_BUCKETS,
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "agenticagile_queue_depth",
+    "Items waiting in an internal queue.",
+    ("queue",),
+)
+
+_ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F]{16,}|\d+)$")
+
+
+def trello_operation(method: str, path: str) -> str:
+    """Low-cardinality name of a Trello request: ids in the path become ``:id``."""
+    segments = [":id" if _ID_SEGMENT.match(part) else part for part in path.split("?", 1)[0].split("/") if part]
+    return f"{method} /{'/'.join(segments)}"
+
+
+def bucket_label(name: str) -> str:
+    """Rate-limit bucket name without per-channel or per-token suffixes."""
+    if name.startswith("slack:special:"):
+        return "slack:special"
+    if name.startswith("slack:"):
+        return name
+    return name.split(":", 1)[0]
+
+
+def track_queue(name: str, depth: Callable[[], float]) -> Callable[[], None]:
+    """Report ``depth()`` as the depth of queue ``name``; returns an untrack function."""
+    QUEUE_DEPTH.set_function(depth, queue=name)
+    return lambda: QUEUE_DEPTH.remove(queue=name)
+
+
+# -- tracing --------------------------------------------------------------
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start: float
+    end: float | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.end if self.end is not None else time.time()) - self.start
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+SpanExporter = Callable[[Span], None]
+
+_current_span: ContextVar[Span | None] = ContextVar("agenticagile_span", default=None)
+_exporters: list[SpanExporter] = []
+
+
+def add_span_exporter(exporter: SpanExporter) -> Callable[[], None]:
+    """Send finished spans to ``exporter``; returns a function removing it."""
+    _exporters.append(exporter)
+    return lambda: _exporters.remove(exporter)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Record the enclosed block as a span, child of the current one.
+
+    Yields ``None`` and costs next to nothing while no exporter is set.
+    """
+    if not _exporters:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(
+        name,
+        trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent_id=parent.span_id if parent else None,
+        start=time.time(),
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        current.end = time.time()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # An async generator closed from another task; its context is gone.
+            pass
+        for exporter in list(_exporters):
+            try:
+                exporter(current)
+            except Exception:  # noqa: BLE001 - tracing must never break the traced code
+                logger.exception("span exporter %r failed", exporter)
+
+
+class RecentSpans:
+    """Span exporter keeping the last ``max_spans`` spans in memory."""
+
+    def __init__(self, max_spans: int = 10_000) -> None:
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+
+    def __call__(self, finished: Span) -> None:
+        self._spans.append(finished)
+
+    def spans(self, trace_id: str | None = None) -> list[Span]:
+        return [s for s in self._spans if trace_id is None or s.trace_id == trace_id]
+
+    def traces(self, limit: int = 50) -> list[dict[str, Any]]:
+        """Latest root spans, newest first, each with its descendants as ``spans``."""
+        by_trace: dict[str, list[Span]] = {}
+        for s in self._spans:
+            by_trace.setdefault(s.trace_id, []).append(s)
+        roots = [s for s in reversed(self._spans) if s.parent_id is None][:limit]
+        return [
+            {**asdict(root), "seconds": root.seconds, "spans": [asdict(s) for s in by_trace[root.trace_id] if s is not root]}
+            for root in roots
+        ]
+
+
+def make_metrics_app(
+    registry: Registry = REGISTRY, *, spans: RecentSpans | None = None, path: str = "/metrics"
+) -> web.Application:
+    """aiohttp app serving ``registry`` at ``path`` and, given ``spans``, ``/traces``."""
+
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get(path, metrics)
+    if spans is not None:
+
+        async def traces(request: web.Request) -> web.Response:
+            return web.json_response(spans.traces(int(request.query.get("limit", "50"))))
+
+        app.router.add_get("/traces", traces)
+    return app
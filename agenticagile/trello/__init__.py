@@ -0,0 +1,6 @@
+"""Trello integration: REST client, durable write queue and a local stub server for tests."""
+
+from agenticagile.trello.client import BATCH_LIMIT, TrelloClient
+from agenticagile.trello.writes import WriteQueue
+
+__all__ = ["BATCH_LIMIT", "TrelloClient", "WriteQueue"]
@@ -0,0 +1,301 @@
+"""Async Trello REST client.
+
+The client keeps a single pooled :class:`aiohttp.ClientSession` alive for its
+whole lifetime, caps the number of in-flight requests with a semaphore and
+groups read-only lookups through Trello's ``/batch`` endpoint, which accepts up
+to :data:`BATCH_LIMIT` GET urls per round trip.
+
+Usage::
+
+    async with TrelloClient(key, token) as trello:
+        boards = await trello.get_many([f"/boards/{b}" for b in board_ids])
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json as jsonlib
+import logging
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+from urllib.parse import parse_qsl, urlencode
+
+import aiohttp
+
+from agenticagile.errors import RateLimitedError, TrelloError
+from agenticagile.ratelimit import RateLimiter, parse_retry_after
+from agenticagile.telemetry import CALL_BYTES, CALL_SECONDS, span, trello_operation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.trello.com/1"
+
+#: Maximum number of urls Trello accepts in a single ``/batch`` call.
+BATCH_LIMIT = 10
+
+#: Query used to pull a complete board (lists, cards, labels and members) at once.
+BOARD_SNAPSHOT_PARAMS: Mapping[str, str] = {
+    "fields": "name,closed,dateLastActivity",
+    "lists": "all",
+    "cards": "all",
+    "card_fields": "name,desc,closed,idList,idLabels,idMembers,due,dueComplete,pos,dateLastActivity,shortLink",
+    "labels": "all",
+    "label_fields": "name,color",
+    "members": "all",
+    "member_fields": "fullName,username",
+    "checklists": "all",
+    "checklist_fields": "name,idCard,pos",
+}
+
+
+def _batch_item_error(path: str, item: Any) -> TrelloError:
+    # Failed batch entries come either as {"404": "message"} or as an error
+    # object carrying "statusCode" and "message".
+    if isinstance(item, dict):
+        if "statusCode" in item:
+            return TrelloError(int(item["statusCode"]), str(item.get("message", "")), url=path)
+        for key, value in item.items():
+            if key.isdigit():
+                return TrelloError(int(key), str(value), url=path)
+    return TrelloError(500, f"unexpected batch item: {item!r}", url=path)
+
+
+def build_path(path: str, params: Mapping[str, Any] | None = None) -> str:
+    """Return ``path`` with ``params`` encoded as its query string."""
+    if not path.startswith("/"):
+        path = "/" + path
+    if params:
+        path = f"{path}?{urlencode(params)}"
+    return path
+
+
+class TrelloClient:
+    """Pooled, concurrency-limited client for the Trello REST API.
+
+    Args:
+        key: Trello API key.
+        token: Trello API token.
+        base_url: API root; point it at a local stub server in tests.
+        max_concurrency: Upper bound on requests in flight at once.
+        pool_size: Maximum number of pooled keep-alive connections.
+        timeout: Total timeout in seconds for each request.
+        session: Optional externally managed session. The client does not
+            close sessions it did not create.
+        limiter: Shared :class:`~agenticagile.ratelimit.RateLimiter`. When
+            set, every request takes a token from bucket ``bucket`` at the
+            caller's :func:`~agenticagile.ratelimit.current_priority`, and
+            HTTP 429 answers pause the bucket and are retried up to
+            ``max_retries`` times.
+        bucket: Name of the limiter bucket; one per Trello token.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        token: str,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        max_concurrency: int = 8,
+        pool_size: int = 16,
+        timeout: float = 30.0,
+        session: aiohttp.ClientSession | None = None,
+        limiter: RateLimiter | None = None,
+        bucket: str = "trello",
+        max_retries: int = 3,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._auth = {"key": key, "token": token}
+        self.base_url = base_url.rstrip("/")
+        self._pool_size = pool_size
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = session
+        self._owns_session = session is None
+        self.limiter = limiter
+        self.bucket = bucket
+        self.max_retries = max_retries
+
+    @property
+    def token(self) -> str:
+        return self._auth["token"]
+
+    async def __aenter__(self) -> TrelloClient:
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        """Close the underlying session if this client created it."""
+        if self._session is not None and self._owns_session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Mapping[str, Any] | None = None,
+        json: Any = None,
+    ) -> Any:
+        """Send one request and return the decoded JSON body.
+
+        Raises:
+            RateLimitedError: Trello answered with HTTP 429 (after the
+                limiter's retries, when one is configured).
+            TrelloError: Any other non-2xx response.
+        """
+        path, _, inline_query = build_path(path).partition("?")
+        query = {**dict(parse_qsl(inline_query)), **(params or {}), **self._auth}
+
+        async def send() -> Any:
+            return await self._send(method, path, query, json)
+
+        if self.limiter is None:
+            return await send()
+        return await self.limiter.call(self.bucket, send, max_retries=self.max_retries)
+
+    async def _send(self, method: str, path: str, query: Mapping[str, Any], json: Any) -> Any:
+        session = self._ensure_session()
+        operation = trello_operation(method, path)
+        data = None if json is None else jsonlib.dumps(json).encode()
+        headers = None if data is None else {"Content-Type": "application/json"}
+        outcome = "error"
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                with span("trello", operation=operation):
+                    async with session.request(
+                        method, self.base_url + path, params=query, data=data, headers=headers
+                    ) as response:
+                        outcome = str(response.status)
+                        if response.status == 429:
+                            raise RateLimitedError(
+                                await response.text(),
+                                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                                url=path,
+                            )
+                        if response.status >= 400:
+                            raise TrelloError(response.status, await response.text(), url=path)
+                        body = await response.read()
+                        CALL_BYTES.observe(len(body), service="trello", direction="in")
+                        if data is not None:
+                            CALL_BYTES.observe(len(data), service="trello", direction="out")
+                        if response.content_type == "application/json":
+                            return jsonlib.loads(body)
+                        return body.decode(response.charset or "utf-8")
+            finally:
+                CALL_SECONDS.observe(
+                    time.perf_counter() - started, service="trello", operation=operation, outcome=outcome
+                )
+
+    async def get(self, path: str, **params: Any) -> Any:
+        """GET ``path`` with ``params`` as query string."""
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path: str, json: Any = None, **params: Any) -> Any:
+        return await self.request("POST", path, params=params, json=json)
+
+    async def put(self, path: str, json: Any = None, **params: Any) -> Any:
+        return await self.request("PUT", path, params=params, json=json)
+
+    async def delete(self, path: str, **params: Any) -> Any:
+        return await self.request("DELETE", path, params=params)
+
+    async def batch(self, paths: Sequence[str]) -> list[Any]:
+        """Resolve up to :data:`BATCH_LIMIT` GET ``paths`` in a single round trip.
+
+        Each element of the result is either the decoded body of the matching
+        url or a :class:`TrelloError` instance when that sub-request failed;
+        failures of individual urls never fail the whole batch.
+        """
+        if not paths:
+            return []
+        if len(paths) > BATCH_LIMIT:
+            raise ValueError(f"Trello batches hold at most {BATCH_LIMIT} urls, got {len(paths)}")
+        # Commas separate batch entries, so commas inside a url must be escaped.
+        urls = ",".join(build_path(p).replace(",", "%2C") for p in paths)
+        raw = await self.get("/batch", urls=urls)
+        results: list[Any] = []
+        for path, item in zip(paths, raw):
+            if isinstance(item, dict) and "200" in item:
+                results.append(item["200"])
+            else:
+                results.append(_batch_item_error(path, item))
+        return results
+
+    async def get_many(self, paths: Iterable[str], *, raise_errors: bool = True) -> list[Any]:
+        """GET every path, grouped into concurrent ``/batch`` calls.
+
+        Results are returned in the order of ``paths``. With ``raise_errors``
+        the first failed sub-request is raised; otherwise failures are left in
+        place as :class:`TrelloError` instances.
+
+        A failure of the call itself is raised in both modes: a 429 answer
+        (:class:`RateLimitedError`, which is not a :class:`TrelloError`) or a
+        network error concerns every url of the call, not one of them.
+        """
+        paths = list(paths)
+        chunks = [paths[i : i + BATCH_LIMIT] for i in range(0, len(paths), BATCH_LIMIT)]
+        if len(chunks) == 1 and len(paths) == 1:
+            # A single url gains nothing from the batch envelope.
+            try:
+                return [await self.get(paths[0])]
+            except TrelloError as exc:
+                if raise_errors:
+                    raise
+                return [exc]
+        batches = await asyncio.gather(*(self.batch(chunk) for chunk in chunks))
+        results = [item for batch in batches for item in batch]
+        if raise_errors:
+            for item in results:
+                if isinstance(item, TrelloError):
+                    raise item
+        return results
+
+    async def get_board_snapshot(self, board_id: str) -> dict[str, Any]:
+        """Return a board together with its lists, cards, labels and members."""
+        return await self.get(f"/boards/{board_id}", **BOARD_SNAPSHOT_PARAMS)
+
+    async def get_board_snapshots(self, board_ids: Iterable[str]) -> list[dict[str, Any]]:
+        """Fetch full snapshots for many boards, ten per round trip."""
+        return await self.get_many(
+            build_path(f"/boards/{board_id}", BOARD_SNAPSHOT_PARAMS) for board_id in board_ids
+        )
+
+    async def get_board_actions(
+        self,
+        board_id: str,
+        *,
+        since: str | None = None,
+        before: str | None = None,
+        limit: int = 1000,
+    ) -> list[dict[str, Any]]:
+        """Return one page of board actions, newest first as Trello sends them."""
+        params: dict[str, Any] = {"limit": limit, "filter": "all"}
+        if since:
+            params["since"] = since
+        if before:
+            params["before"] = before
+        return await self.get(f"/boards/{board_id}/actions", **params)
+
+    async def list_webhooks(self) -> list[dict[str, Any]]:
+        """Webhooks registered with this client's token."""
+        return await self.get(f"/tokens/{self.token}/webhooks")
+
+    async def create_webhook(self, model_id: str, callback_url: str, description: str = "") -> dict[str, Any]:
+        """Register ``callback_url`` for actions on ``model_id`` (e.g. a board)."""
+        return await self.post(
+            "/webhooks", json={"idModel": model_id, "callbackURL": callback_url, "description": description}
+        )
@@ -0,0 +1,424 @@
+"""In-memory Trello API stub served over local HTTP.
+
+:class:`TrelloStub` keeps boards, lists, cards, labels, members and the action
+feed in plain dicts and answers the subset of the Trello REST API that
+AgenticAgile uses, including ``/batch``. Every write records a Trello-shaped
+action so incremental sync code can be exercised end to end.
+
+Usage::
+
+    stub = TrelloStub()
+    board = stub.add_board("Sprint board")
+    async with StubServer(stub) as server:
+        async with TrelloClient("k", "t", base_url=server.base_url) as trello:
+            ...
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import time
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import aiohttp
+from aiohttp import web
+
+_id_counter = itertools.count(1)
+
+
+def new_id(ts: float | None = None) -> str:
+    """Return a 24-hex Trello-style id whose first 8 digits encode ``ts``.
+
+    Like real Trello ids, ids created later sort after ids created earlier.
+    """
+    return f"{int(ts if ts is not None else time.time()):08x}{next(_id_counter):016x}"
+
+
+def iso_now(ts: float | None = None) -> str:
+    moment = datetime.fromtimestamp(ts if ts is not None else time.time(), tz=timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _ref(obj: Mapping[str, Any]) -> dict[str, Any]:
+    return {"id": obj["id"], "name": obj.get("name", "")}
+
+
+class TrelloStub:
+    """Mutable in-memory Trello account.
+
+    ``requests`` counts every HTTP request served, keyed by ``METHOD path``,
+    so callers can assert on round trips.
+    """
+
+    def __init__(self) -> None:
+        self.boards: dict[str, dict[str, Any]] = {}
+        self.lists: dict[str, dict[str, Any]] = {}
+        self.cards: dict[str, dict[str, Any]] = {}
+        self.labels: dict[str, dict[str, Any]] = {}
+        self.members: dict[str, dict[str, Any]] = {}
+        self.checklists: dict[str, dict[str, Any]] = {}
+        self.actions: list[dict[str, Any]] = []
+        self.webhooks: dict[str, dict[str, Any]] = {}
+        self.outbox: list[tuple[str, dict[str, Any]]] = []
+        self.requests: Counter[str] = Counter()
+        self.clock: float | None = None
+
+    # -- fixtures ---------------------------------------------------------
+
+    def _now(self) -> float:
+        return self.clock if self.clock is not None else time.time()
+
+    def add_member(self, full_name: str, username: str | None = None) -> dict[str, Any]:
+        member = {
+            "id": new_id(self._now()),
+            "fullName": full_name,
+            "username": username or full_name.lower().replace(" ", ""),
+        }
+        self.members[member["id"]] = member
+        return member
+
+    def add_board(self, name: str, *, member_ids: list[str] | None = None) -> dict[str, Any]:
+        board = {
+            "id": new_id(self._now()),
+            "name": name,
+            "closed": False,
+            "dateLastActivity": iso_now(self._now()),
+            "idMembers": list(member_ids or []),
+        }
+        self.boards[board["id"]] = board
+        return board
+
+    def add_label(self, board_id: str, name: str, color: str | None = None) -> dict[str, Any]:
+        label = {"id": new_id(self._now()), "idBoard": board_id, "name": name, "color": color}
+        self.labels[label["id"]] = label
+        return label
+
+    def add_list(self, board_id: str, name: str) -> dict[str, Any]:
+        pos = 1 + sum(1 for lst in self.lists.values() if lst["idBoard"] == board_id)
+        lst = {"id": new_id(self._now()), "idBoard": board_id, "name": name, "closed": False, "pos": pos * 1024}
+        self.lists[lst["id"]] = lst
+        self._record("createList", board_id, {"list": _ref(lst)})
+        return lst
+
+    def add_card(
+        self,
+        list_id: str,
+        name: str,
+        *,
+        desc: str = "",
+        label_ids: list[str] | None = None,
+        member_ids: list[str] | None = None,
+        due: str | None = None,
+    ) -> dict[str, Any]:
+        lst = self.lists[list_id]
+        now = self._now()
+        card_id = new_id(now)
+        card = {
+            "id": card_id,
+            "shortLink": card_id[-8:],
+            "idBoard": lst["idBoard"],
+            "idList": list_id,
+            "name": name,
+            "desc": desc,
+            "closed": False,
+            "idLabels": list(label_ids or []),
+            "idMembers": list(member_ids or []),
+            "due": due,
+            "dueComplete": False,
+            "pos": 1024 * (1 + sum(1 for c in self.cards.values() if c["idList"] == list_id)),
+            "dateLastActivity": iso_now(now),
+        }
+        self.cards[card["id"]] = card
+        ref = {**_ref(card), "shortLink": card["shortLink"]}
+        self._record("createCard", lst["idBoard"], {"card": ref, "list": _ref(lst)})
+        return card
+
+    def add_checklist(self, card_id: str, name: str, items: Sequence[str] = ()) -> dict[str, Any]:
+        card = self.cards[card_id]
+        checklist = {
+            "id": new_id(self._now()),
+            "idBoard": card["idBoard"],
+            "idCard": card_id,
+            "name": name,
+            "pos": 1024 * (1 + sum(1 for c in self.checklists.values() if c["idCard"] == card_id)),
+            "checkItems": [],
+        }
+        self.checklists[checklist["id"]] = checklist
+        self._record("addChecklistToCard", card["idBoard"], {"card": _ref(card), "checklist": _ref(checklist)})
+        for item_name in items:
+            item = {
+                "id": new_id(self._now()),
+                "name": item_name,
+                "state": "incomplete",
+                "pos": 1024 * (1 + len(checklist["checkItems"])),
+            }
+            checklist["checkItems"].append(item)
+            self._record(
+                "createCheckItem",
+                card["idBoard"],
+                {"card": _ref(card), "checklist": _ref(checklist), "checkItem": dict(item)},
+            )
+        return checklist
+
+    def set_check_item(self, checklist_id: str, item_id: str, complete: bool = True) -> dict[str, Any]:
+        checklist = self.checklists[checklist_id]
+        item = next(i for i in checklist["checkItems"] if i["id"] == item_id)
+        item["state"] = "complete" if complete else "incomplete"
+        card = self.cards[checklist["idCard"]]
+        return self._record(
+            "updateCheckItemStateOnCard",
+            card["idBoard"],
+            {
+                "card": _ref(card),
+                "checklist": _ref(checklist),
+                "checkItem": {"id": item_id, "name": item["name"], "state": item["state"]},
+            },
+        )
+
+    # -- mutations --------------------------------------------------------
+
+    def _record(
+        self,
+        action_type: str,
+        board_id: str,
+        data: dict[str, Any],
+        *,
+        member_id: str | None = None,
+    ) -> dict[str, Any]:
+        now = self._now()
+        board = self.boards[board_id]
+        board["dateLastActivity"] = iso_now(now)
+        action = {
+            "id": new_id(now),
+            "idMemberCreator": member_id,
+            "type": action_type,
+            "date": iso_now(now),
+            "data": {"board": _ref(board), **data},
+        }
+        self.actions.append(action)
+        for hook in self.webhooks.values():
+            if hook["idModel"] == board_id and hook["active"]:
+                self.outbox.append((hook["callbackURL"], {"action": action, "model": _ref(board)}))
+        return action
+
+    def update_card(self, card_id: str, changes: Mapping[str, Any], *, member_id: str | None = None) -> dict[str, Any]:
+        card = self.cards[card_id]
+        old = {key: card.get(key) for key in changes}
+        card.update(changes)
+        card["dateLastActivity"] = iso_now(self._now())
+        data: dict[str, Any] = {"card": {**_ref(card), **{k: card[k] for k in changes}}, "old": old}
+        if "idList" in changes and old["idList"] != card["idList"]:
+            data["listBefore"] = _ref(self.lists[old["idList"]])
+            data["listAfter"] = _ref(self.lists[card["idList"]])
+        else:
+            data["list"] = _ref(self.lists[card["idList"]])
+        self._record("updateCard", card["idBoard"], data, member_id=member_id)
+        return card
+
+    def comment(self, card_id: str, text: str, *, member_id: str | None = None) -> dict[str, Any]:
+        card = self.cards[card_id]
+        card["dateLastActivity"] = iso_now(self._now())
+        return self._record("commentCard", card["idBoard"], {"card": _ref(card), "text": text}, member_id=member_id)
+
+    def add_label_to_card(self, card_id: str, label_id: str) -> dict[str, Any]:
+        card = self.cards[card_id]
+        if label_id not in card["idLabels"]:
+            card["idLabels"].append(label_id)
+        label = self.labels[label_id]
+        return self._record(
+            "addLabelToCard",
+            card["idBoard"],
+            {"card": _ref(card), "label": {**_ref(label), "color": label["color"]}},
+        )
+
+    def remove_label_from_card(self, card_id: str, label_id: str) -> dict[str, Any]:
+        card = self.cards[card_id]
+        if label_id in card["idLabels"]:
+            card["idLabels"].remove(label_id)
+        label = self.labels[label_id]
+        return self._record(
+            "removeLabelFromCard",
+            card["idBoard"],
+            {"card": _ref(card), "label": {**_ref(label), "color": label["color"]}},
+        )
+
+    # -- read side --------------------------------------------------------
+
+    def board_payload(self, board_id: str, query: Mapping[str, str]) -> dict[str, Any]:
+        board = dict(self.boards[board_id])
+        if query.get("lists") not in (None, "none"):
+            board["lists"] = [l for l in self.lists.values() if l["idBoard"] == board_id]
+        if query.get("cards") not in (None, "none"):
+            board["cards"] = [c for c in self.cards.values() if c["idBoard"] == board_id]
+        if query.get("labels") not in (None, "none"):
+            board["labels"] = [l for l in self.labels.values() if l["idBoard"] == board_id]
+        if query.get("members") not in (None, "none"):
+            board["members"] = [self.members[m] for m in board["idMembers"] if m in self.members]
+        if query.get("checklists") not in (None, "none"):
+            board["checklists"] = [c for c in self.checklists.values() if c["idBoard"] == board_id]
+        return board
+
+    def board_actions(self, board_id: str, query: Mapping[str, str]) -> list[dict[str, Any]]:
+        since = query.get("since")
+        before = query.get("before")
+        limit = int(query.get("limit", 50))
+        matching = [
+            a
+            for a in self.actions
+            if a["data"]["board"]["id"] == board_id
+            and (since is None or a["id"] > since)
+            and (before is None or a["id"] < before)
+        ]
+        # Trello returns the newest actions first; ``limit`` keeps the newest.
+        return list(reversed(matching))[:limit]
+
+    def resolve(self, method: str, path: str, query: Mapping[str, str], body: Any = None) -> tuple[int, Any]:
+        """Answer one API call and return ``(status, payload)``."""
+        parts = [p for p in path.split("/") if p]
+        if parts and parts[0] == "1":
+            parts = parts[1:]
+        try:
+            return 200, self._dispatch(method, parts, query, body or {})
+        except KeyError as exc:
+            return 404, f"not found: {exc.args[0]}"
+        except LookupError:
+            return 404, "unknown route"
+
+    def _dispatch(self, method: str, parts: list[str], query: Mapping[str, str], body: Mapping[str, Any]) -> Any:
+        match (method, parts):
+            case ("GET", ["boards", board_id]):
+                return self.board_payload(board_id, query)
+            case ("GET", ["boards", board_id, "actions"]) if board_id in self.boards:
+                return self.board_actions(board_id, query)
+            case ("GET", ["boards", board_id, "cards"]) if board_id in self.boards:
+                return [c for c in self.cards.values() if c["idBoard"] == board_id]
+            case ("GET", ["boards", board_id, "lists"]) if board_id in self.boards:
+                return [l for l in self.lists.values() if l["idBoard"] == board_id]
+            case ("GET", ["cards", card_id]):
+                return self.cards[card_id]
+            case ("GET", ["cards", card_id, "actions"]) if card_id in self.cards:
+                kinds = set(query.get("filter", "all").split(","))
+                matching = [
+                    a
+                    for a in self.actions
+                    if (a["data"].get("card") or {}).get("id") == card_id and ("all" in kinds or a["type"] in kinds)
+                ]
+                return list(reversed(matching))[: int(query.get("limit", 50))]
+            case ("GET", ["lists", list_id, "cards"]) if list_id in self.lists:
+                return [c for c in self.cards.values() if c["idList"] == list_id]
+            case ("GET", ["tokens", _, "webhooks"]):
+                return list(self.webhooks.values())
+            case ("POST", ["webhooks"]):
+                params = {**query, **body}
+                hook = {
+                    "id": new_id(self._now()),
+                    "idModel": params["idModel"],
+                    "callbackURL": params["callbackURL"],
+                    "description": params.get("description", ""),
+                    "active": True,
+                }
+                self.webhooks[hook["id"]] = hook
+                return hook
+            case ("PUT", ["cards", card_id]):
+                allowed = ("idList", "name", "desc", "closed", "due", "dueComplete", "pos")
+                changes = {k: v for k, v in {**query, **body}.items() if k in allowed}
+                return self.update_card(card_id, changes)
+            case ("POST", ["cards", card_id, "actions", "comments"]):
+                return self.comment(card_id, str(body.get("text") or query.get("text", "")))
+            case ("POST", ["cards", card_id, "idLabels"]):
+                self.add_label_to_card(card_id, str(body.get("value") or query["value"]))
+                return self.cards[card_id]["idLabels"]
+            case ("DELETE", ["cards", card_id, "idLabels", label_id]):
+                self.remove_label_from_card(card_id, label_id)
+                return self.cards[card_id]["idLabels"]
+        raise LookupError(parts)
+
+    def resolve_batch(self, urls: str) -> list[Any]:
+        results: list[Any] = []
+        for raw in urls.split(","):
+            split = urlsplit(raw)
+            status, payload = self.resolve("GET", split.path, dict(parse_qsl(split.query)))
+            if status == 200:
+                results.append({"200": payload})
+            else:
+                results.append({"name": "Error", "message": payload, "statusCode": status})
+        return results
+
+
+class StubServer:
+    """Serve a :class:`TrelloStub` on an ephemeral local port."""
+
+    def __init__(self, stub: TrelloStub, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.stub = stub
+        self.host = host
+        self.port = port
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/1"
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/1/{tail:.*}", self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        return await self.respond(request)
+
+    async def respond(self, request: web.Request) -> web.StreamResponse:
+        """Turn one HTTP request into a stub response."""
+        query = {k: v for k, v in request.query.items() if k not in ("key", "token")}
+        body: Any = None
+        if request.can_read_body:
+            body = await request.json()
+        self.stub.requests[f"{request.method} {request.path}"] += 1
+        if request.path.rstrip("/") == "/1/batch":
+            return web.json_response(self.stub.resolve_batch(query.get("urls", "")))
+        status, payload = self.stub.resolve(request.method, request.path, query, body)
+        if status != 200:
+            return web.Response(status=status, text=json.dumps(payload) if not isinstance(payload, str) else payload)
+        return web.json_response(payload)
+
+    async def deliver_webhooks(self, secret: str = "stub-secret") -> int:
+        """POST every queued webhook delivery to its callback url.
+
+        Deliveries are signed like Trello's (``X-Trello-Webhook``) with
+        ``secret``. Returns the number of deliveries sent.
+        """
+        outbox, self.stub.outbox = self.stub.outbox, []
+        async with aiohttp.ClientSession() as session:
+            for callback_url, payload in outbox:
+                body = json.dumps(payload).encode()
+                digest = hmac.new(secret.encode(), body + callback_url.encode(), hashlib.sha1).digest()
+                headers = {"X-Trello-Webhook": base64.b64encode(digest).decode(), "Content-Type": "application/json"}
+                async with session.post(callback_url, data=body, headers=headers) as response:
+                    response.raise_for_status()
+        return len(outbox)
+
+    async def start(self) -> StubServer:
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> StubServer:
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
@@ -0,0 +1,390 @@
+"""Durable queue for Trello writes decided by the agent.
+
+Card updates and moves, comments and label changes are first committed to a
+local SQLite queue and then delivered by :meth:`WriteQueue.run`. A crash or a
+burst of 429s therefore never loses a write:
+
+* **at-least-once** – a job is claimed with a lease; jobs whose worker died
+  are claimed again after the lease runs out,
+* **backoff** – failed deliveries retry with exponential backoff and jitter,
+  honouring ``Retry-After``; 4xx answers other than 429 are permanent,
+* **idempotency keys** – enqueueing the same key twice yields the same job,
+  and a comment retried after an ambiguous failure is first looked up on the
+  card so it is not posted twice,
+* **coalescing** – pending writes to the same target merge: three moves of a
+  card become one ``PUT`` with the final list, and adding then removing a
+  label leaves only the final state.
+
+Writes to the same card are delivered one at a time, in order.
+
+Usage::
+
+    queue = WriteQueue(trello, "var/writes.sqlite")
+    queue.move_card(card_id, done_list_id, key=f"{event_id}:move")
+    queue.comment(card_id, "Moved to Done after the release.", key=f"{event_id}:comment")
+    asyncio.create_task(queue.run())
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import time
+import uuid
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+from agenticagile.errors import APIError, RateLimitedError
+from agenticagile.telemetry import CALL_RETRIES, track_queue
+from agenticagile.trello.client import TrelloClient
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    card_id TEXT NOT NULL,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    params TEXT NOT NULL,
+    coalesce_key TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, next_at);
+CREATE INDEX IF NOT EXISTS jobs_coalesce ON jobs (coalesce_key, state);
+CREATE TABLE IF NOT EXISTS idempotency (
+    key TEXT PRIMARY KEY,
+    job_id INTEGER NOT NULL
+);
+"""
+
+PENDING, INFLIGHT, DONE, DEAD = "pending", "inflight", "done", "dead"
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    card_id: str
+    method: str
+    path: str
+    params: dict[str, Any]
+    attempts: int
+
+
+@dataclass
+class QueueStats:
+    enqueued: int = 0
+    coalesced: int = 0
+    duplicates: int = 0
+    delivered: int = 0
+    retried: int = 0
+    dead: int = 0
+
+
+class WriteQueue:
+    """Persistent, coalescing queue of Trello writes.
+
+    Args:
+        client: Client used for delivery.
+        path: SQLite file, or ``":memory:"`` (not durable; for tests).
+        concurrency: Jobs delivered at the same time (never two for one card).
+        max_attempts: Attempts before a job is marked dead.
+        base_delay: First retry delay in seconds; doubles per attempt.
+        max_delay: Upper bound for the retry delay.
+        lease: Seconds a claimed job stays reserved for its worker.
+    """
+
+    def __init__(
+        self,
+        client: TrelloClient,
+        path: str | Path = ":memory:",
+        *,
+        concurrency: int = 4,
+        max_attempts: int = 8,
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+        lease: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self._clock = clock
+        self.conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        if str(path) != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.stats = QueueStats()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    # -- enqueueing -------------------------------------------------------
+
+    def enqueue(
+        self,
+        kind: str,
+        card_id: str,
+        method: str,
+        path: str,
+        params: Mapping[str, Any],
+        *,
+        coalesce: str | None = None,
+        merge: bool = False,
+        key: str | None = None,
+    ) -> int:
+        """Queue one write and return its job id.
+
+        Args:
+            coalesce: Pending jobs with the same value are combined with this one.
+            merge: Combine by merging ``params`` into the pending job's
+                (field updates); otherwise the pending job is replaced.
+            key: Idempotency key; a key seen before returns the earlier job.
+        """
+        key = key or uuid.uuid4().hex
+        now = self._clock()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT job_id FROM idempotency WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.stats.duplicates += 1
+                return row[0]
+            pending = None
+            if coalesce is not None:
+                pending = conn.execute(
+                    "SELECT id, params FROM jobs WHERE coalesce_key = ? AND state = ? ORDER BY id DESC LIMIT 1",
+                    (coalesce, PENDING),
+                ).fetchone()
+            if pending is not None:
+                job_id = pending[0]
+                merged = {**json.loads(pending[1]), **params} if merge else dict(params)
+                conn.execute(
+                    "UPDATE jobs SET method = ?, path = ?, params = ?, kind = ? WHERE id = ?",
+                    (method, path, json.dumps(merged), kind, job_id),
+                )
+                self.stats.coalesced += 1
+            else:
+                job_id = conn.execute(
+                    "INSERT INTO jobs (kind, card_id, method, path, params, coalesce_key, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (kind, card_id, method, path, json.dumps(dict(params)), coalesce, now),
+                ).lastrowid
+                self.stats.enqueued += 1
+            conn.execute("INSERT INTO idempotency (key, job_id) VALUES (?, ?)", (key, job_id))
+        self._wakeup.set()
+        return int(job_id)
+
+    def update_card(self, card_id: str, *, key: str | None = None, **fields: Any) -> int:
+        """Change card fields (``name``, ``desc``, ``idList``, ``pos``, ``due``, ``closed`` ...)."""
+        return self.enqueue(
+            "update", card_id, "PUT", f"/cards/{card_id}", fields, coalesce=f"update:{card_id}", merge=True, key=key
+        )
+
+    def move_card(self, card_id: str, list_id: str, *, pos: str | float = "bottom", key: str | None = None) -> int:
+        return self.update_card(card_id, idList=list_id, pos=pos, key=key)
+
+    def comment(self, card_id: str, text: str, *, key: str | None = None) -> int:
+        return self.enqueue("comment", card_id, "POST", f"/cards/{card_id}/actions/comments", {"text": text}, key=key)
+
+    def set_label(self, card_id: str, label_id: str, present: bool = True, *, key: str | None = None) -> int:
+        """Add (``present``) or remove a label; only the last pending choice is sent."""
+        if present:
+            method, path, params = "POST", f"/cards/{card_id}/idLabels", {"value": label_id}
+        else:
+            method, path, params = "DELETE", f"/cards/{card_id}/idLabels/{label_id}", {}
+        return self.enqueue("label", card_id, method, path, params, coalesce=f"label:{card_id}:{label_id}", key=key)
+
+    # -- inspection -------------------------------------------------------
+
+    def state(self, job_id: int) -> str | None:
+        row = self.conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> dict[str, int]:
+        return dict(self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def depth(self) -> int:
+        """Jobs not yet delivered nor given up on."""
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE state IN (?, ?)", (PENDING, INFLIGHT)).fetchone()[0]
+
+    def purge(self, older_than: float = 7 * 86400) -> int:
+        """Delete finished jobs (and their idempotency keys) older than ``older_than`` seconds."""
+        cutoff = self._clock() - older_than
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM idempotency WHERE job_id IN "
+                "(SELECT id FROM jobs WHERE state IN (?, ?) AND finished < ?)",
+                (DONE, DEAD, cutoff),
+            )
+            return conn.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?) AND finished < ?", (DONE, DEAD, cutoff)
+            ).rowcount
+
+    # -- delivery ---------------------------------------------------------
+
+    def _claim(self, limit: int) -> list[Job]:
+        """Reserve up to ``limit`` due jobs, at most one per card, oldest first."""
+        now = self._clock()
+        with self._transaction() as conn:
+            # Expired leases belong to a crashed or stalled worker. The lost
+            # delivery counts as an attempt: it may have reached Trello.
+            conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1 WHERE state = ? AND lease_until <= ?",
+                (PENDING, INFLIGHT, now),
+            )
+            busy = {row[0] for row in conn.execute("SELECT card_id FROM jobs WHERE state = ?", (INFLIGHT,))}
+            # Only the oldest unfinished job of each card may run.
+            rows = conn.execute(
+                "SELECT j.id, j.kind, j.card_id, j.method, j.path, j.params, j.attempts FROM jobs j "
+                "WHERE j.state = ? AND j.next_at <= ? AND j.id = "
+                "(SELECT MIN(id) FROM jobs WHERE card_id = j.card_id AND state IN (?, ?)) "
+                "ORDER BY j.id LIMIT ?",
+                (PENDING, now, PENDING, INFLIGHT, limit + len(busy)),
+            ).fetchall()
+            jobs = [Job(r[0], r[1], r[2], r[3], r[4], json.loads(r[5]), r[6]) for r in rows if r[2] not in busy][:limit]
+            conn.executemany(
+                "UPDATE jobs SET state = ?, lease_until = ?, coalesce_key = NULL WHERE id = ?",
+                [(INFLIGHT, now + self.lease, job.id) for job in jobs],
+            )
+        return jobs
+
+    def _finish(self, job: Job, state: str, error: str | None = None) -> None:
+        self.conn.execute(
+            "UPDATE jobs SET state = ?, attempts = ?, last_error = ?, finished = ? WHERE id = ?",
+            (state, job.attempts + 1, error, self._clock(), job.id),
+        )
+
+    def _retry(self, job: Job, error: str, delay: float | None) -> None:
+        attempts = job.attempts + 1
+        if attempts >= self.max_attempts:
+            logger.error("giving up on Trello write %s %s after %d attempts: %s", job.method, job.path, attempts, error)
+            self._finish(job, DEAD, error)
+            self.stats.dead += 1
+            return
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** job.attempts)
+            delay *= random.uniform(0.5, 1.0)
+        self.conn.execute(
+            "UPDATE jobs SET state = ?, attempts = ?, last_error = ?, next_at = ? WHERE id = ?",
+            (PENDING, attempts, error, self._clock() + delay, job.id),
+        )
+        self.stats.retried += 1
+        CALL_RETRIES.inc(service="trello_writes")
+
+    async def _already_commented(self, job: Job) -> bool:
+        actions = await self.client.get(f"/cards/{job.card_id}/actions", filter="commentCard", limit=50)
+        return any((action.get("data") or {}).get("text") == job.params["text"] for action in actions)
+
+    async def _deliver(self, job: Job) -> None:
+        try:
+            if job.kind == "comment" and job.attempts and await self._already_commented(job):
+                # An earlier attempt (failed or lost in a crash) reached Trello.
+                self._finish(job, DONE)
+                self.stats.delivered += 1
+                return
+            if job.method == "PUT":
+                await self.client.put(job.path, json=job.params)
+            elif job.method == "POST":
+                await self.client.post(job.path, json=job.params)
+            else:
+                await self.client.delete(job.path, **job.params)
+        except RateLimitedError as exc:
+            self._retry(job, str(exc), exc.retry_after)
+        except APIError as exc:
+            if exc.status >= 500:
+                self._retry(job, str(exc), None)
+            elif job.kind == "label" and exc.status == 400:
+                # Label already present / already absent: the desired state holds.
+                self._finish(job, DONE, str(exc))
+                self.stats.delivered += 1
+            else:
+                logger.warning("Trello rejected %s %s: %s", job.method, job.path, exc)
+                self._finish(job, DEAD, str(exc))
+                self.stats.dead += 1
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            self._retry(job, f"{type(exc).__name__}: {exc}", None)
+        except Exception as exc:
+            # Anything else is a bug or a malformed answer; retrying keeps run() alive.
+            logger.exception("delivering Trello write %s %s failed", job.method, job.path)
+            self._retry(job, f"{type(exc).__name__}: {exc}", None)
+        else:
+            self._finish(job, DONE)
+            self.stats.delivered += 1
+
+    def _next_due(self) -> float | None:
+        row = self.conn.execute("SELECT MIN(next_at) FROM jobs WHERE state = ?", (PENDING,)).fetchone()
+        return row[0]
+
+    async def run_once(self) -> int:
+        """Claim and deliver one round of due jobs; returns how many were attempted."""
+        jobs = self._claim(self.concurrency)
+        if jobs:
+            await asyncio.gather(*(self._deliver(job) for job in jobs))
+        return len(jobs)
+
+    async def drain(self, *, timeout: float | None = None) -> None:
+        """Deliver until no pending job is left (retries included)."""
+        async def loop() -> None:
+            while True:
+                if await self.run_once():
+                    continue
+                due = self._next_due()
+                if due is None:
+                    if not self.counts().get(INFLIGHT):
+                        return
+                    due = self._clock() + 0.05
+                await asyncio.sleep(max(0.0, due - self._clock()))
+
+        await asyncio.wait_for(loop(), timeout)
+
+    async def run(self) -> None:
+        """Deliver forever, sleeping until the next job is due or one is enqueued."""
+        self._stopping = False
+        untrack = track_queue("trello_writes", self.depth)
+        try:
+            while not self._stopping:
+                if await self.run_once():
+                    continue
+                due = self._next_due()
+                wait = 5.0 if due is None else max(0.0, min(5.0, due - self._clock()))
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            untrack()
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
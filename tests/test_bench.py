@@ -0,0 +1,28 @@
+import asyncio
+import time
+
+from agenticagile.ratelimit import RateLimiter
+from agenticagile.sim.bench import Benchmark, FakeLLM, synthesize_day
+from agenticagile.sim.faults import Faults
+
+
+def test_shuts_down_with_replies_pending():
+    # 429s with Retry-After and a slow model leave replies outstanding when
+    # the reply timeout expires; the run must still stop promptly.
+    traffic = synthesize_day(messages=20, trello_actions=20, hours=0.2, seed=1)
+    benchmark = Benchmark(
+        trello_faults=Faults(rate_limit=0.5, retry_after=1.0, seed=1),
+        slack_faults=Faults(rate_limit=0.5, retry_after=1.0, seed=1),
+        llm=FakeLLM(latency=0.8, seed=1),
+        speed=600.0,
+        boards=2,
+        cards_per_board=10,
+        limiter=RateLimiter.for_agenticagile(),
+        reply_timeout=0.5,
+    )
+    started = time.monotonic()
+    report = asyncio.run(asyncio.wait_for(benchmark.run(traffic), 30))
+    assert time.monotonic() - started < 15
+    assert report.events == 20
+    assert report.injected_429 > 0
+    assert report.answered < report.events
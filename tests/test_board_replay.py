@@ -0,0 +1,42 @@
+"""BoardReplay checkpoints taken from a live mirror synced from the stub."""
+
+from __future__ import annotations
+
+import asyncio
+
+from agenticagile.board.eventlog import EventLog
+from agenticagile.board.mirror import BoardMirror
+from agenticagile.board.replay import BoardReplay
+from agenticagile.board.sync import MirrorSync
+from agenticagile.trello.client import TrelloClient
+from agenticagile.trello.stub import StubServer, TrelloStub
+
+T0 = 1_790_000_000.0
+
+
+def test_snapshot_checkpoint_sits_at_the_head_action_and_replays(tmp_path):
+    stub = TrelloStub()
+    stub.clock = T0
+    board = stub.add_board("Sprint")
+    todo = stub.add_list(board["id"], "To Do")
+    done = stub.add_list(board["id"], "Done")
+    card = stub.add_card(todo["id"], "Checkout flow")
+    head = stub.actions[-1]
+    mirror = BoardMirror()
+    log = EventLog(tmp_path / "events")
+    log.attach(mirror)
+    replay = BoardReplay(log, every=1000, clock=lambda: T0 + 10**6)
+    replay.attach(mirror)
+
+    async def scenario():
+        async with StubServer(stub) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            sync = MirrorSync(trello, mirror, [board["id"]])
+            await sync.sync()
+            stub.clock = T0 + 3600
+            stub.update_card(card["id"], {"idList": done["id"]})
+            await sync.sync()
+
+    asyncio.run(scenario())
+    assert replay.checkpoints(board["id"]) == [(T0, head["id"])]
+    assert replay.board_at(board["id"], T0 + 60).card(card["id"]).list_id == todo["id"]
+    assert replay.board_at(board["id"], T0 + 7200).card(card["id"]).list_id == done["id"]
@@ -0,0 +1,71 @@
+"""MirrorSync against the in-memory stub: snapshots, action feeds and refetches."""
+
+from __future__ import annotations
+
+import asyncio
+
+from agenticagile.board.mirror import BoardMirror
+from agenticagile.board.sync import MirrorSync
+from agenticagile.trello.client import TrelloClient
+from agenticagile.trello.stub import StubServer, TrelloStub
+
+CARD_TABLES = ("card_labels", "card_members", "checklists", "check_items", "comments")
+
+
+def rows(mirror: BoardMirror, card_id: str) -> dict[str, int]:
+    counts = {"cards": mirror.conn.execute("SELECT COUNT(*) FROM cards WHERE id = ?", (card_id,)).fetchone()[0]}
+    for table in CARD_TABLES:
+        counts[table] = mirror.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE card_id = ?", (card_id,)).fetchone()[0]
+    return counts
+
+
+def busy_card(stub: TrelloStub) -> tuple[dict, dict]:
+    member = stub.add_member("Ann Lee")
+    board = stub.add_board("Sprint", member_ids=[member["id"]])
+    label = stub.add_label(board["id"], "bug", "red")
+    lst = stub.add_list(board["id"], "Doing")
+    card = stub.add_card(lst["id"], "Fix login", label_ids=[label["id"]], member_ids=[member["id"]])
+    stub.add_checklist(card["id"], "Steps", ["repro", "patch"])
+    return board, card
+
+
+def test_feed_applies_new_actions_after_snapshot():
+    stub = TrelloStub()
+    board, card = busy_card(stub)
+    mirror = BoardMirror()
+
+    async def scenario():
+        async with StubServer(stub) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            sync = MirrorSync(trello, mirror, [board["id"]])
+            first = await sync.sync()
+            stub.comment(card["id"], "on it")
+            done = stub.add_list(board["id"], "Done")
+            stub.update_card(card["id"], {"idList": done["id"]})
+            return first, await sync.sync(), done
+
+    first, second, done = asyncio.run(scenario())
+    assert first.snapshots == [board["id"]] and second.snapshots == []
+    assert second.actions_applied == 3
+    assert mirror.card(card["id"]).list_id == done["id"]
+    assert [c["text"] for c in mirror.comments(card["id"])] == ["on it"]
+
+
+def test_refetch_of_a_deleted_card_removes_its_rows():
+    stub = TrelloStub()
+    board, card = busy_card(stub)
+    mirror = BoardMirror()
+
+    async def scenario():
+        async with StubServer(stub) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            sync = MirrorSync(trello, mirror, [board["id"]])
+            await sync.sync()
+            stub.comment(card["id"], "on it")
+            await sync.sync()
+            before = rows(mirror, card["id"])
+            del stub.cards[card["id"]]
+            return before, await sync.refetch_cards([card["id"]])
+
+    before, refreshed = asyncio.run(scenario())
+    assert all(before.values()), before
+    assert refreshed == 0
+    assert not any(rows(mirror, card["id"]).values())
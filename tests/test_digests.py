@@ -0,0 +1,40 @@
+"""Cron parsing and matching used by the digest scheduler."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from agenticagile.digests import Cron
+
+UTC = ZoneInfo("UTC")
+
+
+def test_fields_support_lists_ranges_and_steps():
+    cron = Cron.parse("5/15 9-17/4 * * 1-5")
+    assert cron.minute == {5, 20, 35, 50}
+    assert cron.hour == {9, 13, 17}
+    assert cron.weekday == {1, 2, 3, 4, 5}
+    assert Cron.parse("*/20 0,12 * * *").minute == {0, 20, 40}
+
+
+@pytest.mark.parametrize("expression", ["60 * * * *", "5-1 * * * *", "*/0 * * * *", "* * *"])
+def test_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ValueError):
+        Cron.parse(expression)
+
+
+def test_restricted_day_and_weekday_are_or_ed():
+    cron = Cron.parse("0 9 1 * 1")
+    # 2026-06-01 is a Monday, 2026-06-08 a Monday, 2026-06-02 a Tuesday.
+    assert cron.matches_day(datetime(2026, 6, 8, tzinfo=UTC))
+    assert cron.matches_day(datetime(2026, 7, 1, tzinfo=UTC))
+    assert not cron.matches_day(datetime(2026, 6, 2, tzinfo=UTC))
+
+
+def test_next_after_skips_to_the_next_matching_minute():
+    cron = Cron.parse("30 9 * * 1-5")
+    friday = datetime(2026, 10, 16, 9, 30, tzinfo=UTC)
+    assert cron.next_after(friday) == datetime(2026, 10, 19, 9, 30, tzinfo=UTC)
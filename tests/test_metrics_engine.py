@@ -0,0 +1,43 @@
+"""MetricsEngine over actions recorded by the Trello stub."""
+
+from __future__ import annotations
+
+from agenticagile.metrics.engine import MetricsEngine, Sprint
+from agenticagile.trello.stub import TrelloStub
+
+T0 = 1_790_000_000.0
+
+
+def sprint_board() -> tuple[TrelloStub, dict, dict, dict]:
+    stub = TrelloStub()
+    stub.clock = T0
+    board = stub.add_board("Sprint")
+    todo = stub.add_list(board["id"], "To Do")
+    staging = stub.add_list(board["id"], "Staging")
+    card = stub.add_card(todo["id"], "(3) Checkout flow")
+    return stub, board, staging, card
+
+
+def test_velocity_counts_cards_reaching_done():
+    stub, board, staging, card = sprint_board()
+    done = stub.add_list(board["id"], "Done")
+    stub.clock = T0 + 3600
+    stub.update_card(card["id"], {"idList": done["id"]})
+    engine = MetricsEngine(clock=lambda: T0 + 7200)
+    engine.ingest(stub.actions)
+    report = engine.report(Sprint(board["id"], T0 - 60, T0 + 86400))
+    assert report.velocity == 3 and report.completed_cards == [card["id"]]
+
+
+def test_renaming_a_list_into_done_refreshes_the_cached_view():
+    stub, board, staging, card = sprint_board()
+    stub.clock = T0 + 3600
+    stub.update_card(card["id"], {"idList": staging["id"]})
+    engine = MetricsEngine(clock=lambda: T0 + 7200)
+    engine.ingest(stub.actions)
+    sprint = Sprint(board["id"], T0 - 60, T0 + 86400)
+    assert engine.report(sprint).velocity == 0
+    staging["name"] = "Done"
+    rename = stub._record("updateList", board["id"], {"list": {"id": staging["id"], "name": "Done"}})
+    engine.ingest([rename])
+    assert engine.report(sprint).velocity == 3
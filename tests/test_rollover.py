@@ -0,0 +1,63 @@
+import asyncio
+
+from agenticagile.errors import APIError
+from agenticagile.rollover import CardRollover, RolloverPlan, execute_rollover, retry_plan
+
+
+class FlakyClient:
+    """Records calls and fails each path listed in ``fail`` once."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    async def _call(self, method, path, json):
+        if path in self.fail:
+            self.fail.discard(path)
+            raise APIError(503, f"{method} {path} failed")
+        self.calls.append((method, path, json))
+
+    async def put(self, path, json=None):
+        await self._call("PUT", path, json)
+
+    async def post(self, path, json=None):
+        await self._call("POST", path, json)
+
+
+def make_plan():
+    card = CardRollover(
+        "c1", "Card", "Doing", move_to="l2", pos=16384.0, add_labels=["lab1"], comment="Rolled over."
+    )
+    return RolloverPlan("b1", "l2", "Sprint 2", cards=[card])
+
+
+def test_failed_comment_is_remaining_and_retried():
+    async def scenario():
+        plan = make_plan()
+        client = FlakyClient(fail=["/cards/c1/actions/comments"])
+        report = await execute_rollover(client, plan)
+        assert report.completed["c1"] == ["move"]
+        assert report.remaining["c1"] == ["comment", "label+lab1"]
+
+        retry = retry_plan(plan, report)
+        assert [card.card_id for card in retry.cards] == ["c1"]
+        assert retry.cards[0].move_to is None
+        client.calls.clear()
+        report = await execute_rollover(client, retry)
+        assert report.succeeded == ["c1"] and not report.remaining
+        assert client.calls == [
+            ("POST", "/cards/c1/actions/comments", {"text": "Rolled over."}),
+            ("POST", "/cards/c1/idLabels", {"value": "lab1"}),
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_retry_plan_skips_finished_cards():
+    async def scenario():
+        plan = make_plan()
+        report = await execute_rollover(FlakyClient(), plan)
+        assert report.succeeded == ["c1"]
+        assert retry_plan(plan, report).cards == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,112 @@
+"""VectorIndex storage and search, and CardIndexer's incremental re-embedding."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from agenticagile.board.actions import apply_actions
+from agenticagile.board.mirror import BoardMirror
+from agenticagile.search import CardIndexer, HashingEmbedder, VectorIndex
+from agenticagile.search.embedders import normalize_rows
+
+
+def unit(*rows: list[float]) -> np.ndarray:
+    return normalize_rows(np.array(rows, dtype=np.float32))
+
+
+def axes(dim: int = 4) -> np.ndarray:
+    return np.eye(dim, dtype=np.float32)
+
+
+def test_remove_moves_last_row_into_the_gap():
+    index = VectorIndex(4, capacity=2)
+    index.upsert(["a", "b", "c", "d"], axes())
+    index.remove(["b"])
+    assert len(index) == 3 and "b" not in index
+    for item, axis in (("a", 0), ("c", 2), ("d", 3)):
+        assert index.search(axes()[axis], k=1)[0].id == item
+    np.testing.assert_array_equal(index.vector("d"), axes()[3])
+    index.remove(["d", "missing"])
+    assert sorted(h.id for h in index.search(axes()[0], k=10)) == ["a", "c"]
+
+
+def test_upsert_replaces_existing_rows():
+    index = VectorIndex(4)
+    index.upsert(["a", "b"], axes()[:2], ["f1", "f2"])
+    index.upsert(["a"], axes()[2:3], ["f3"])
+    assert len(index) == 2 and index.fingerprints == {"a": "f3", "b": "f2"}
+    assert index.search(axes()[2], k=1)[0].id == "a"
+
+
+def test_search_honours_exclude_among_and_min_score():
+    index = VectorIndex(2)
+    index.upsert(["a", "b", "c"], unit([1, 0], [1, 0.2], [0, 1]))
+    query = unit([1, 0])[0]
+    assert [h.id for h in index.search(query, k=2)] == ["a", "b"]
+    assert [h.id for h in index.search(query, k=2, exclude=["a"])] == ["b", "c"]
+    assert [h.id for h in index.search(query, k=2, among=["b", "c", "unknown"])] == ["b", "c"]
+    assert [h.id for h in index.search(query, min_score=0.5)] == ["a", "b"]
+    assert index.search(query, among=[]) == []
+
+
+def test_mmapped_index_copies_on_first_write(tmp_path):
+    index = VectorIndex(4)
+    index.upsert(["a", "b", "c"], axes()[:3], ["fa", "fb", "fc"])
+    index.save(tmp_path / "cards")
+    loaded = VectorIndex.load(tmp_path / "cards")
+    assert not loaded.vectors.flags.writeable and loaded.fingerprints["b"] == "fb"
+    loaded.remove(["a"])
+    loaded.upsert(["d"], axes()[3:])
+    assert sorted(h.id for h in loaded.search(axes()[3], k=4, min_score=0.5)) == ["d"]
+    assert loaded.search(axes()[2], k=1)[0].id == "c"
+    assert len(VectorIndex.load(tmp_path / "cards")) == 3  # the file is untouched
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self) -> None:
+        super().__init__(dim=64)
+        self.texts: list[str] = []
+
+    def embed(self, texts):
+        self.texts += texts
+        return super().embed(texts)
+
+
+def board(mirror: BoardMirror) -> None:
+    mirror.load_snapshot(
+        {
+            "id": "b1",
+            "name": "Sprint",
+            "lists": [{"id": "l1", "name": "Doing", "idBoard": "b1"}],
+            "cards": [
+                {"id": f"c{i}", "name": name, "idBoard": "b1", "idList": "l1"}
+                for i, name in enumerate(["Fix login timeout", "Login page times out", "Quarterly report"])
+            ],
+        }
+    )
+
+
+def test_indexer_re_embeds_only_changed_cards():
+    mirror = BoardMirror()
+    embedder = CountingEmbedder()
+    indexer = CardIndexer(mirror, embedder)
+    board(mirror)
+    assert len(embedder.texts) == 3 and len(indexer.index) == 3
+    board(mirror)
+    assert len(embedder.texts) == 3
+    apply_actions(
+        mirror,
+        [
+            {
+                "id": "a1",
+                "type": "commentCard",
+                "date": "2026-10-01T00:00:00.000Z",
+                "data": {"board": {"id": "b1"}, "card": {"id": "c2"}, "text": "numbers are in"},
+            }
+        ],
+    )
+    assert len(embedder.texts) == 4 and "numbers are in" in embedder.texts[-1]
+    assert [h.id for h in indexer.similar_cards("c0", min_score=0.1)][:1] == ["c1"]
+    mirror.delete_card("c1")
+    indexer.refresh(["c1"])
+    assert "c1" not in indexer.index and len(indexer.index) == 2
@@ -0,0 +1,80 @@
+"""EventDispatcher ordering, deduplication and shutdown."""
+
+from __future__ import annotations
+
+import asyncio
+
+from agenticagile.slack.dispatch import EventDispatcher
+
+
+def envelope(event_id: str, channel: str) -> dict:
+    return {"event_id": event_id, "team_id": "T1", "event": {"type": "message", "channel": channel}}
+
+
+def test_events_of_one_channel_keep_their_order():
+    seen: list[str] = []
+
+    async def handle(env):
+        await asyncio.sleep(0.01 if env["event_id"].endswith("0") else 0)
+        seen.append(env["event_id"])
+
+    async def scenario():
+        async with EventDispatcher(handle, workers=4) as dispatcher:
+            for i in range(5):
+                dispatcher.submit_nowait(envelope(f"a{i}", "C1"))
+                dispatcher.submit_nowait(envelope(f"b{i}", "C2"))
+            assert not dispatcher.submit_nowait(envelope("a0", "C1"))
+            await dispatcher.join()
+            return dispatcher.stats
+
+    stats = asyncio.run(scenario())
+    assert [e for e in seen if e[0] == "a"] == [f"a{i}" for i in range(5)]
+    assert [e for e in seen if e[0] == "b"] == [f"b{i}" for i in range(5)]
+    assert stats.processed == 10 and stats.duplicates == 1
+
+
+def test_stop_without_drain_then_stop_again_returns():
+    async def handle(env):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        dispatcher = EventDispatcher(handle, workers=1)
+        await dispatcher.start()
+        dispatcher.submit_nowait(envelope("e1", "C1"))
+        dispatcher.submit_nowait(envelope("e2", "C1"))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(dispatcher.stop(drain=False), 1)
+        await asyncio.wait_for(dispatcher.stop(), 1)
+        await asyncio.wait_for(dispatcher.join(), 1)
+        return dispatcher.pending
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_drain_gives_up_after_timeout():
+    async def handle(env):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        dispatcher = EventDispatcher(handle, workers=1)
+        await dispatcher.start()
+        dispatcher.submit_nowait(envelope("e1", "C1"))
+        await asyncio.wait_for(dispatcher.stop(timeout=0.05), 1)
+        return dispatcher.pending
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_join_without_workers_returns():
+    async def handle(env):
+        pass
+
+    async def scenario():
+        dispatcher = EventDispatcher(handle)
+        dispatcher.submit_nowait(envelope("e1", "C1"))
+        await asyncio.wait_for(dispatcher.join(), 1)
+        async with dispatcher:
+            await dispatcher.join()
+        return dispatcher.stats.processed
+
+    assert asyncio.run(scenario()) == 1
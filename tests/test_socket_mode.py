@@ -0,0 +1,101 @@
+"""SocketModeClient against FakeSocketModeServer: acks, reconnects and backpressure."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+
+from agenticagile.slack import socket_mode
+from agenticagile.slack.client import SlackClient
+from agenticagile.slack.dispatch import EventDispatcher
+from agenticagile.slack.fake_socket import FakeSocketModeServer
+from agenticagile.slack.socket_mode import SocketModeClient
+
+
+@contextlib.asynccontextmanager
+async def connected(handler, *, ack_timeout: float = 3.0, max_pending: int = 100):
+    async with FakeSocketModeServer(ack_timeout=ack_timeout) as server, SlackClient("xapp-test", base_url=server.api_url) as web:
+        dispatcher = EventDispatcher(handler, workers=2, max_pending=max_pending)
+        client = SocketModeClient(web, dispatcher, max_backoff=0.2)
+        task = asyncio.create_task(client.run())
+        try:
+            await server.wait_connected()
+            yield server, client, dispatcher
+        finally:
+            await client.stop()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await dispatcher.stop(drain=False)
+
+
+async def wait_for(predicate, timeout: float = 5.0) -> None:
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_envelopes_are_acked_within_the_deadline():
+    seen: list[str] = []
+
+    async def handle(env):
+        seen.append(env["event"]["text"])
+
+    async def scenario():
+        async with connected(handle) as (server, client, dispatcher):
+            for i in range(20):
+                await server.push_event({"type": "message", "channel": "C1", "text": str(i)})
+            await wait_for(lambda: client.stats.acked == 20 and not server.unacked)
+            await dispatcher.join()
+            return server.ack_latencies
+
+    latencies = asyncio.run(scenario())
+    assert seen == [str(i) for i in range(20)]
+    assert len(latencies) == 20 and max(latencies) < socket_mode.ACK_DEADLINE
+
+
+def test_client_reconnects_after_disconnect_and_drop():
+    seen: list[str] = []
+
+    async def handle(env):
+        seen.append(env["event"]["text"])
+
+    async def scenario():
+        async with connected(handle) as (server, client, dispatcher):
+            await server.disconnect()
+            await wait_for(lambda: server.connections == 2 and server.sockets)
+            await server.push_event({"type": "message", "channel": "C1", "text": "after refresh"})
+            await server.drop()
+            await wait_for(lambda: server.connections == 3 and server.sockets)
+            await server.push_event({"type": "message", "channel": "C1", "text": "after drop"})
+            await wait_for(lambda: len(seen) == 2)
+            return client.stats.connections
+
+    assert asyncio.run(scenario()) == 3
+    assert seen == ["after refresh", "after drop"]
+
+
+def test_full_dispatcher_leaves_envelope_for_redelivery(monkeypatch):
+    monkeypatch.setattr(socket_mode, "ACK_DEADLINE", 0.25)
+    release = asyncio.Event()
+    seen: list[str] = []
+
+    async def handle(env):
+        await release.wait()
+        seen.append(env["event"]["text"])
+
+    async def scenario():
+        release.clear()
+        async with connected(handle, ack_timeout=0.4, max_pending=1) as (server, client, dispatcher):
+            await server.push_event({"type": "message", "channel": "C1", "text": "first"})
+            await server.push_event({"type": "message", "channel": "C1", "text": "second"})
+            await wait_for(lambda: client.stats.deferred == 1)
+            release.set()
+            await wait_for(lambda: len(seen) == 2 and not server.unacked)
+            return client.stats, server
+
+    stats, server = asyncio.run(scenario())
+    assert seen == ["first", "second"]
+    assert stats.acked == 2 and stats.envelopes == 3
+    assert not server.expired
@@ -0,0 +1,53 @@
+"""SlackMessageStream: coalesced edits and continuation messages."""
+
+from __future__ import annotations
+
+import asyncio
+
+from agenticagile.errors import SlackError
+from agenticagile.slack.streaming import MAX_MESSAGE_CHARS, stream_to_slack
+
+
+class RecordingSlack:
+    """Just enough of SlackClient: messages by ts, optionally failing posts."""
+
+    def __init__(self, fail_posts: int = 0) -> None:
+        self.messages: dict[str, str] = {}
+        self.fail_posts = fail_posts
+        self.posts = 0
+
+    async def post_message(self, channel, text, **kwargs):
+        self.posts += 1
+        if self.posts > 1 and self.fail_posts:
+            self.fail_posts -= 1
+            raise SlackError("internal_error", status=500)
+        ts = f"{len(self.messages) + 1}.0"
+        self.messages[ts] = text
+        return {"ok": True, "ts": ts}
+
+    async def update_message(self, channel, ts, text, **kwargs):
+        self.messages[ts] = text
+        return {"ok": True, "ts": ts}
+
+
+async def words(count: int):
+    for i in range(count):
+        yield f"word{i} "
+        if i % 50 == 0:
+            await asyncio.sleep(0)
+
+
+def test_long_reply_continues_in_new_messages():
+    slack = RecordingSlack()
+    result = asyncio.run(stream_to_slack(slack, "C1", words(1500), interval=0.01, min_gap=0))
+    assert len(result.message_ts) >= 3
+    assert all(len(slack.messages[ts]) <= MAX_MESSAGE_CHARS for ts in result.message_ts)
+    assert " ".join(slack.messages[ts] for ts in result.message_ts).split() == [f"word{i}" for i in range(1500)]
+
+
+def test_failed_continuation_post_keeps_editing_the_current_message():
+    slack = RecordingSlack(fail_posts=100)
+    result = asyncio.run(stream_to_slack(slack, "C1", words(800), interval=0.01, min_gap=0))
+    assert result.message_ts == ["1.0"]
+    assert slack.messages["1.0"].split() == [f"word{i}" for i in range(800)]
+    assert result.text.split() == [f"word{i}" for i in range(800)]
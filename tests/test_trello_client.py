@@ -0,0 +1,109 @@
+"""TrelloClient against the in-memory stub: batching, ordering and errors."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from agenticagile.errors import RateLimitedError, TrelloError
+from agenticagile.sim.faults import Faults
+from agenticagile.sim.trello import FakeTrello
+from agenticagile.trello.client import BATCH_LIMIT, TrelloClient
+from agenticagile.trello.stub import StubServer, TrelloStub
+
+
+def board_with_cards(count: int) -> tuple[TrelloStub, list[dict]]:
+    stub = TrelloStub()
+    board = stub.add_board("Sprint")
+    lst = stub.add_list(board["id"], "To Do")
+    return stub, [stub.add_card(lst["id"], f"card {i}") for i in range(count)]
+
+
+def test_get_many_keeps_order_across_batches():
+    stub, cards = board_with_cards(2 * BATCH_LIMIT + 3)
+
+    async def scenario():
+        async with StubServer(stub) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            return await trello.get_many(f"/cards/{card['id']}" for card in reversed(cards))
+
+    results = asyncio.run(scenario())
+    assert [r["name"] for r in results] == [c["name"] for c in reversed(cards)]
+    assert stub.requests["GET /1/batch"] == 3
+
+
+def test_batch_item_errors_stay_in_place():
+    stub, cards = board_with_cards(2)
+    paths = [f"/cards/{cards[0]['id']}", "/cards/missing", f"/cards/{cards[1]['id']}"]
+
+    async def scenario():
+        async with StubServer(stub) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            kept = await trello.get_many(paths, raise_errors=False)
+            with pytest.raises(TrelloError) as raised:
+                await trello.get_many(paths)
+            return kept, raised.value
+
+    kept, raised = asyncio.run(scenario())
+    assert kept[0]["id"] == cards[0]["id"] and kept[2]["id"] == cards[1]["id"]
+    assert isinstance(kept[1], TrelloError) and kept[1].status == 404 and kept[1].url == "/cards/missing"
+    assert raised.status == 404
+
+
+def test_single_url_error_is_returned_without_raise_errors():
+    stub, _ = board_with_cards(0)
+
+    async def scenario():
+        async with StubServer(stub) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            return await trello.get_many(["/cards/missing"], raise_errors=False)
+
+    [result] = asyncio.run(scenario())
+    assert isinstance(result, TrelloError) and result.status == 404
+    assert stub.requests["GET /1/batch"] == 0
+
+
+def test_batch_escapes_commas_inside_urls():
+    stub = TrelloStub()
+    boards = [stub.add_board(f"board {i}") for i in range(2)]
+    for board in boards:
+        stub.add_list(board["id"], "Doing")
+    paths = [f"/boards/{board['id']}?fields=name,closed&lists=all" for board in boards]
+
+    async def scenario():
+        async with StubServer(stub) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            return await trello.batch(paths)
+
+    results = asyncio.run(scenario())
+    assert [r["id"] for r in results] == [b["id"] for b in boards]
+    assert all(r["lists"][0]["name"] == "Doing" for r in results)
+    assert stub.requests["GET /1/batch"] == 1
+
+
+@pytest.mark.parametrize("count", [1, 3])
+def test_rate_limit_fails_the_whole_call(count):
+    stub, cards = board_with_cards(count)
+
+    async def scenario():
+        faults = Faults(rate_limit=1.0, retry_after=7)
+        async with FakeTrello(stub, faults=faults) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            await trello.get_many([f"/cards/{card['id']}" for card in cards], raise_errors=False)
+
+    with pytest.raises(RateLimitedError) as raised:
+        asyncio.run(scenario())
+    assert raised.value.retry_after == 7
+    assert not isinstance(raised.value, TrelloError)
+
+
+def test_writes_record_actions():
+    stub, cards = board_with_cards(1)
+    done = stub.add_list(cards[0]["idBoard"], "Done")
+
+    async def scenario():
+        async with StubServer(stub) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            await trello.put(f"/cards/{cards[0]['id']}", json={"idList": done["id"]})
+            await trello.post(f"/cards/{cards[0]['id']}/actions/comments", json={"text": "shipped"})
+            return await trello.get(f"/cards/{cards[0]['id']}/actions", filter="commentCard")
+
+    comments = asyncio.run(scenario())
+    assert stub.cards[cards[0]["id"]]["idList"] == done["id"]
+    assert [c["data"]["text"] for c in comments] == ["shipped"]
+    assert stub.actions[-2]["data"]["listAfter"]["id"] == done["id"]
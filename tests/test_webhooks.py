@@ -0,0 +1,69 @@
+"""TrelloChangeFeed: webhook deliveries and gap repair against the fake Trello."""
+
+from __future__ import annotations
+
+import asyncio
+
+from agenticagile.board.mirror import BoardMirror
+from agenticagile.board.sync import MirrorSync
+from agenticagile.board.webhooks import TrelloChangeFeed
+from agenticagile.sim.faults import Faults
+from agenticagile.sim.trello import FakeTrello
+from agenticagile.trello.client import TrelloClient
+from agenticagile.trello.stub import TrelloStub
+
+
+async def wait_for(predicate, timeout: float = 5.0) -> None:
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_run_survives_rate_limits_and_catches_up_later():
+    stub = TrelloStub()
+    board = stub.add_board("Sprint")
+    lst = stub.add_list(board["id"], "Doing")
+    card = stub.add_card(lst["id"], "Fix login")
+    mirror = BoardMirror()
+
+    async def scenario():
+        server = FakeTrello(stub, faults=Faults(rate_limit=1.0, retry_after=0))
+        async with server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            sync = MirrorSync(trello, mirror, [board["id"]])
+            feed = TrelloChangeFeed(mirror, sync, secret=None, callback_url="http://local/hook", reconcile_interval=0.2)
+            task = asyncio.create_task(feed.run())
+            await wait_for(lambda: server.faults.injected >= 3)
+            assert not task.done() and board["id"] in feed.gaps
+            server.faults = Faults()
+            await wait_for(lambda: mirror.card(card["id"]) is not None and not feed.gaps)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert mirror.card(card["id"]).name == "Fix login"
+
+
+def test_deliveries_apply_in_order_and_late_ones_mark_a_gap():
+    stub = TrelloStub()
+    board = stub.add_board("Sprint")
+    lst = stub.add_list(board["id"], "Doing")
+    card = stub.add_card(lst["id"], "Fix login")
+    mirror = BoardMirror()
+
+    async def scenario():
+        async with FakeTrello(stub) as server, TrelloClient("k", "t", base_url=server.base_url) as trello:
+            sync = MirrorSync(trello, mirror, [board["id"]])
+            feed = TrelloChangeFeed(mirror, sync, secret=None, callback_url="http://local/hook")
+            await feed.catch_up([board["id"]])
+            stub.update_card(card["id"], {"name": "Fix login page"})
+            early = stub.actions[-1]
+            late = stub.comment(card["id"], "done")
+            await feed.handle({"action": late})
+            await feed.handle({"action": early})
+            return feed
+
+    feed = asyncio.run(scenario())
+    assert feed.applied == 1 and feed.gaps == {board["id"]}
+    assert [c["text"] for c in mirror.comments(card["id"])] == ["done"]